@@ -0,0 +1,621 @@
+"""Synthetic vaults and reproducible benchmarks.
+
+``generate_vault`` fills a vault created by ``initialize_vault`` with notes
+rendered from the twelve built-in templates: papers, models, repos,
+datasets, spaces, websites and videos with plausible frontmatter, one daily
+note per day with tasks and reading links, projects (project, PRD, system
+design and a Cardboard kanban board) and MOCs over a topic. Tags follow a
+Zipf distribution, wikilinks grow by preferential attachment (so a few
+notes collect most backlinks) and body text is drawn from a Zipf
+vocabulary. The same seed always produces the same vault, dated relative
+to ``ANCHOR_DATE`` rather than today.
+
+``run_benchmarks`` generates a vault per size and times each entry of
+``BENCHMARKS`` on it. Every benchmark runs in a fresh interpreter: its
+setup (e.g. dropping ``.slatekore/`` for a cold build) runs before each
+timed repetition, and one extra run under ``tracemalloc`` records the peak
+of Python allocations. Results are plain JSON; ``compare_results`` lines up
+two of them, e.g. from two versions of slatekore.
+
+New vault-scanning commands register a benchmark with ``@benchmark``.
+"""
+
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from . import __version__
+from .check import check_startup
+from .context import build_context
+from .daily import create_daily
+from .fields import query_notes
+from .frontmatter import scan_frontmatter
+from .graph import load_graph
+from .identity import load_identity
+from .importer import FOLDERS
+from .index import Catalog, refresh_catalog
+from .init import initialize_vault
+from .journal import build_digest
+from .moc import suggest_mocs
+from .related import related_notes
+from .render import default_values, fill_section, get_template
+from .router import sanitize_filename
+from .search import search_vault
+from .tags import query_tags
+from .tasks import PROJECTS_FOLDER, find_tasks
+from .vault import STATE_DIR
+from .vectors import semantic_search, similar_notes
+from .watch import DERIVED_INDEXES
+
+# Generated vaults are dated relative to this day, so a seed always
+# yields the same files
+ANCHOR_DATE = datetime.date(2025, 6, 1)
+
+# Share of the notes of each template; a project is four notes (project,
+# PRD, system design and kanban board), daily notes are one per day
+TYPE_SHARES = {
+    "paper": 0.40, "model": 0.10, "repo": 0.08, "dataset": 0.06, "space": 0.04,
+    "website": 0.08, "video": 0.05, "moc": 0.03, "daily": 0.10, "project": 0.06,
+}
+
+# Mean body length in words (log-normally spread)
+WORDS_PER_NOTE = 250
+
+# Share of papers already read, and of links pointing at missing notes
+READ_SHARE = 0.4
+DANGLING_SHARE = 0.01
+
+TOPICS = [
+    "nlp", "vision", "transformers", "diffusion", "rl", "retrieval", "alignment", "multimodal",
+    "agents", "efficiency", "evaluation", "speech", "robotics", "graphs", "optimization",
+    "interpretability", "safety", "theory", "datasets", "recsys", "audio", "video", "3d", "medical",
+]
+SUBTOPICS = ["survey", "benchmark", "scaling", "finetuning", "pretraining", "inference", "distillation"]
+TERMS = (
+    "model attention transformer layer training data loss gradient token embedding network "
+    "learning representation inference benchmark dataset language image diffusion policy reward "
+    "retrieval context sequence encoder decoder parameter scaling optimization evaluation task "
+    "feature prompt alignment fine tuning pretraining architecture sampling noise latent vision "
+    "graph memory agent planning reasoning search distribution objective regularization batch "
+    "convolution recurrent generative contrastive supervised unsupervised reinforcement"
+).split()
+VENUES = ["NeurIPS", "ICML", "ICLR", "ACL", "EMNLP", "CVPR", "ICCV", "AAAI", "arXiv", "TMLR"]
+ORGS = ["openai", "google", "meta", "deepmind", "anthropic", "mistralai", "allenai", "stanford", "huggingface", "nvidia"]
+ARCHITECTURES = ["transformer", "llama", "bert", "t5", "vit", "unet", "mamba", "moe", "resnet", "clip"]
+LANGUAGES = ["Python", "Rust", "C++", "Jupyter Notebook", "TypeScript", "Go", "Julia"]
+LICENSES = ["apache-2.0", "mit", "cc-by-4.0", "llama3", "openrail", "cc-by-nc-4.0"]
+COLUMNS = ["Backlog", "To Do", "In Progress", "Done"]
+
+
+def _zipf(n: int, exponent: float = 1.1) -> List[float]:
+    """Cumulative Zipf weights of ``n`` ranks (for ``random.choices``)."""
+    return list(accumulate(1.0 / (rank + 1) ** exponent for rank in range(n)))
+
+
+class VaultGenerator:
+    """Deterministic source of synthetic notes for one seed."""
+
+    def __init__(self, seed: int = 0, words: int = WORDS_PER_NOTE):
+        self.rng = random.Random(seed)
+        self.words = words
+        rng = self.rng
+        syllables = [c + v for c in "bdfgklmnprstvz" for v in "aeiou"]
+        invented = sorted({"".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) for _ in range(6000)})
+        rng.shuffle(invented)
+        self.vocabulary = TERMS + invented
+        self._vocabulary_weights = _zipf(len(self.vocabulary))
+        self._topic_weights = _zipf(len(TOPICS), 0.9)
+        self._names: set = set()
+
+    def text(self, count: int) -> str:
+        """Paragraphs of about ``count`` words."""
+        rng = self.rng
+        words = rng.choices(self.vocabulary, cum_weights=self._vocabulary_weights, k=max(count, 1))
+        sentences = []
+        i = 0
+        while i < len(words):
+            n = rng.randint(6, 18)
+            sentence = " ".join(words[i:i + n])
+            sentences.append(sentence[:1].upper() + sentence[1:] + ".")
+            i += n
+        paragraphs = []
+        for start in range(0, len(sentences), 5):
+            paragraphs.append(" ".join(sentences[start:start + 5]))
+        return "\n\n".join(paragraphs)
+
+    def title(self) -> str:
+        rng = self.rng
+        words = rng.choices(self.vocabulary[:400], cum_weights=self._vocabulary_weights[:400], k=rng.randint(3, 7))
+        return " ".join(dict.fromkeys(words)).capitalize()
+
+    def name(self, title: str) -> str:
+        """A vault-unique note name for a title."""
+        base = name = sanitize_filename(title)
+        n = 2
+        while name in self._names:
+            name = f"{base}-{n}"
+            n += 1
+        self._names.add(name)
+        return name
+
+    def topics(self) -> List[str]:
+        rng = self.rng
+        picked = set(rng.choices(TOPICS, cum_weights=self._topic_weights, k=rng.choice((1, 1, 2, 2, 3))))
+        tags = sorted(picked)
+        if rng.random() < 0.3:
+            tags.append(f"{tags[0]}/{rng.choice(SUBTOPICS)}")
+        return tags
+
+    def fields(self, note_type: str, title: str, name: str, date: datetime.date) -> Dict[str, Any]:
+        """Frontmatter values for the keys a template declares."""
+        rng = self.rng
+        org = rng.choice(ORGS)
+        if note_type == "paper":
+            n = len(self._names)
+            return {
+                "arxiv_id": f"{date.year % 100:02d}{date.month:02d}.{n % 100000:05d}",
+                "title": title,
+                "authors": [f"{rng.choice(TERMS).capitalize()} {rng.choice(self.vocabulary[50:500]).capitalize()}"
+                            for _ in range(rng.randint(1, 6))],
+                "year": rng.randint(max(2012, date.year - 8), date.year),
+                "venue": rng.choice(VENUES),
+                "citations": int(rng.lognormvariate(3, 1.6)),
+            }
+        if note_type == "model":
+            return {"model_id": f"{org}/{name}", "architecture": rng.choice(ARCHITECTURES),
+                    "task": rng.choice(["text-generation", "image-classification", "text-to-image",
+                                        "feature-extraction", "automatic-speech-recognition"]),
+                    "license": rng.choice(LICENSES), "downloads": int(rng.lognormvariate(8, 2.5))}
+        if note_type == "repo":
+            return {"repo_url": f"https://github.com/{org}/{name}", "language": rng.choice(LANGUAGES),
+                    "stars": int(rng.lognormvariate(5, 2))}
+        if note_type == "space":
+            return {"space_id": f"{org}/{name}", "sdk": rng.choice(["gradio", "streamlit", "docker"])}
+        if note_type == "dataset":
+            return {"dataset_id": f"{org}/{name}", "size": rng.choice(["1K<n<10K", "10K<n<100K", "100K<n<1M", "1M<n<10M"]),
+                    "format": rng.choice(["parquet", "json", "csv", "webdataset"]), "license": rng.choice(LICENSES)}
+        if note_type == "website":
+            return {"category": rng.choice(["blog", "docs", "tutorial", "news"]), "org": org,
+                    "url": f"https://{org}.com/blog/{name}"}
+        if note_type == "video":
+            alphabet = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_"
+            return {"video_id": "".join(rng.choice(alphabet) for _ in range(11)), "title": title,
+                    "channel": org, "duration": f"{rng.randint(3, 90)}:{rng.randint(0, 59):02d}",
+                    "published": date.isoformat()}
+        return {}
+
+
+def _plan_counts(notes: int) -> Dict[str, int]:
+    counts = {t: int(notes * share) for t, share in TYPE_SHARES.items()}
+    counts["project"] //= 4
+    counts["daily"] = max(counts["daily"], 1)
+    counts["paper"] += notes - sum(counts.values()) - 3 * counts["project"]
+    return counts
+
+
+def generate_vault(root: Path, notes: int, seed: int = 0, words: int = WORDS_PER_NOTE) -> Dict[str, Any]:
+    """Create a vault at ``root`` holding about ``notes`` synthetic notes.
+
+    Returns:
+        dict with the number of 'notes' written, their total 'bytes', the
+        'counts' per template and the elapsed time in 'seconds'
+    """
+    start = time.perf_counter()
+    root = Path(root)
+    initialize_vault(root)
+    gen = VaultGenerator(seed, words)
+    rng = gen.rng
+    counts = _plan_counts(notes)
+    days = counts["daily"]
+    first_day = ANCHOR_DATE - datetime.timedelta(days=days - 1)
+
+    # Every note gets a creation day; links only point back in time
+    planned: List[Tuple[datetime.date, str]] = []
+    for note_type in ("paper", "model", "repo", "dataset", "space", "website", "video", "moc", "project"):
+        for _ in range(counts[note_type]):
+            planned.append((first_day + datetime.timedelta(days=rng.randrange(days)), note_type))
+    planned += [(first_day + datetime.timedelta(days=i), "daily") for i in range(days)]
+    planned.sort(key=lambda item: (item[0], item[1]))
+
+    plans = {note_type: get_template(root, note_type) for note_type in
+             ("paper", "model", "repo", "dataset", "space", "website", "video", "moc", "daily",
+              "project", "prd", "system-design")}
+    pool: List[str] = []  # one entry per note plus one per backlink
+    by_topic: Dict[str, List[str]] = {}
+    papers: List[str] = []
+    written = 0
+    size = 0
+
+    def links(count: int) -> List[str]:
+        targets = {rng.choice(pool) for _ in range(min(count, len(pool)))}
+        if rng.random() < DANGLING_SHARE * max(count, 1):
+            targets.add(gen.name(gen.title()) + "-missing")
+        targets = sorted(targets)
+        pool.extend(targets)
+        return targets
+
+    def body(count: int, targets: List[str]) -> str:
+        text = gen.text(int(rng.lognormvariate(0, 0.5) * count))
+        if targets:
+            text += "\n\nSee also " + ", ".join(f"[[{t}]]" for t in targets) + "."
+        return text
+
+    def write(path: str, text: str, date: datetime.date):
+        nonlocal written, size
+        target = root / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        data = text.encode("utf-8")
+        target.write_bytes(data)
+        stamp = time.mktime(date.timetuple()) + rng.randrange(86400)
+        os.utime(target, (stamp, stamp))
+        written += 1
+        size += len(data)
+
+    for date, note_type in planned:
+        values = default_values(date)
+        if note_type == "daily":
+            text = plans["daily"].render(values)
+            read = rng.sample(papers[-30:], min(len(papers[-30:]), rng.randint(0, 3)))
+            text = fill_section(text, "## Papers Read", [f"- [[{p}]]" for p in read])
+            text = fill_section(text, "## Tasks Due", [
+                f"- [{'x' if rng.random() < 0.5 else ' '}] {gen.text(rng.randint(3, 8)).rstrip('.')}"
+                for _ in range(rng.randint(0, 4))])
+            text = fill_section(text, "## Open Questions", [f"- {gen.text(rng.randint(5, 12))}"])
+            text = fill_section(text, "## Key Insights", [f"- {gen.text(rng.randint(8, 20))}"])
+            write(f"07-Daily/{date.isoformat()}.md", text, date)
+            continue
+
+        topics = gen.topics()
+        if note_type == "project":
+            title = gen.title()
+            name = gen.name(title)
+            folder = f"{PROJECTS_FOLDER}/{name}"
+            values = dict(values, project_name=title, name=name)
+            related = links(rng.randint(2, 6))
+            write(f"{folder}/project.md", plans["project"].render(values, tags=topics) + body(gen.words, related), date)
+            for kind in ("prd", "system-design"):
+                text = plans[kind].render(values, fields={"project": name}) + body(gen.words // 2, [])
+                write(f"{folder}/{kind}.md", text, date)
+            board = ["---", "kanban-plugin: cardboard", "---", ""]
+            for column in COLUMNS:
+                board += [f"## {column}"]
+                for _ in range(rng.randint(2, 5)):
+                    due = date + datetime.timedelta(days=rng.randint(-10, 40))
+                    mark = "x" if column == "Done" else " "
+                    due_text = f" @due({due.isoformat()})" if rng.random() < 0.6 else ""
+                    board.append(f"- [{mark}] {gen.text(rng.randint(3, 8)).rstrip('.')} #{name}{due_text}")
+                board.append("")
+            write(f"{folder}/kanban.md", "\n".join(board), date)
+            continue
+
+        if note_type == "moc":
+            topic = topics[0]
+            title = f"{topic.capitalize()} {gen.title().lower()}"
+            name = gen.name(title)
+            members = by_topic.get(topic, [])
+            targets = sorted(set(rng.sample(members, min(len(members), rng.randint(10, 40)))))
+            text = plans["moc"].render(dict(values, topic=topic), fields={"topic": topic}, tags=[topic])
+            text = fill_section(text, "## Overview", [gen.text(rng.randint(20, 60))], replace=True)
+            text = fill_section(text, "## Core Concepts", [f"- [[{t}]]" for t in targets], replace=True)
+            write(f"08-Maps/{name}.md", text, date)
+            pool.extend(targets)
+            continue
+
+        title = gen.title()
+        name = gen.name(title)
+        text = plans[note_type].render(dict(values, title=title), fields=gen.fields(note_type, title, name, date),
+                                       tags=topics)
+        if note_type == "paper" and rng.random() < READ_SHARE:
+            text = text.replace("#to-read", "#read", 1)
+        folder = "00-Inbox/papers" if note_type == "paper" and rng.random() < 0.05 else FOLDERS[note_type]
+        write(f"{folder}/{name}.md", text + "\n" + body(gen.words, links(rng.choice((0, 1, 1, 2, 2, 3, 3, 4, 5, 8)))),
+              date)
+        pool.append(name)
+        for topic in topics:
+            by_topic.setdefault(topic.split("/")[0], []).append(name)
+        if note_type == "paper":
+            papers.append(name)
+
+    return {"notes": written, "bytes": size, "counts": counts,
+            "seconds": round(time.perf_counter() - start, 3)}
+
+
+# ----------------------------------------------------------------------
+# Benchmarks
+# ----------------------------------------------------------------------
+
+# name -> (setup run before each repetition, or None; the timed function)
+BENCHMARKS: Dict[str, Tuple[Optional[Callable[[Path], Any]], Callable[[Path], Any]]] = {}
+
+
+def benchmark(name: str, setup: Optional[Callable[[Path], Any]] = None):
+    """Register a benchmark: a function of the vault root."""
+    def register(run: Callable[[Path], Any]):
+        BENCHMARKS[name] = (setup, run)
+        return run
+    return register
+
+
+def _cold(root: Path):
+    """Drop every index, cache and the journal."""
+    shutil.rmtree(root / STATE_DIR, ignore_errors=True)
+
+
+def _warm(root: Path):
+    """Bring the catalog and every derived index up to date."""
+    catalog = refresh_catalog(root)
+    for cls in DERIVED_INDEXES:
+        cls.load(root).update(catalog)
+
+
+def _catalog_only(root: Path):
+    _cold(root)
+    refresh_catalog(root)
+
+
+def _init_target(root: Path) -> Path:
+    target = root.parent / (root.name + "-init")
+    shutil.rmtree(target, ignore_errors=True)
+    return target
+
+
+def _sample_note(root: Path) -> str:
+    """The most linked-to paper (deterministic for a generated vault)."""
+    graph = load_graph(root)
+    papers = [p for p in Catalog.load(root) if p.startswith(FOLDERS["paper"] + "/")]
+    return max(papers, key=lambda p: (len(graph.backlinks(p)), p))
+
+
+@benchmark("init", setup=_init_target)
+def _bench_init(root: Path):
+    initialize_vault(_init_target(root))
+
+
+@benchmark("index-cold", setup=_cold)
+def _bench_index_cold(root: Path):
+    Catalog.load(root).refresh()
+
+
+@benchmark("index-warm", setup=_warm)
+def _bench_index_warm(root: Path):
+    Catalog.load(root).refresh()
+
+
+@benchmark("frontmatter-scan")
+def _bench_frontmatter_scan(root: Path):
+    sum(1 for meta in scan_frontmatter(root) if "to-read" in meta.tags)
+
+
+@benchmark("indexes-build", setup=_catalog_only)
+def _bench_indexes_build(root: Path):
+    catalog = Catalog.load(root)
+    for cls in DERIVED_INDEXES:
+        cls.load(root).update(catalog)
+
+
+@benchmark("search", setup=_warm)
+def _bench_search(root: Path):
+    search_vault(root, "attention transformer")
+
+
+@benchmark("search-phrase", setup=_warm)
+def _bench_search_phrase(root: Path):
+    search_vault(root, '"language model" train*')
+
+
+@benchmark("query-tags", setup=_warm)
+def _bench_query_tags(root: Path):
+    query_tags(root, "#paper & (#nlp | #vision) & !#read", stats=True)
+
+
+@benchmark("query-fields", setup=_warm)
+def _bench_query_fields(root: Path):
+    query_notes(root, "type=paper year>=2020 citations>50 sort:-citations limit:20")
+
+
+@benchmark("tasks", setup=_warm)
+def _bench_tasks(root: Path):
+    find_tasks(root, due=ANCHOR_DATE.isoformat(), overdue=True, today=ANCHOR_DATE.isoformat())
+
+
+@benchmark("graph", setup=_warm)
+def _bench_graph(root: Path):
+    graph = load_graph(root)
+    graph.orphans()
+    graph.dangling()
+
+
+@benchmark("exists", setup=_warm)
+def _bench_exists(root: Path):
+    load_identity(root).lookup("https://arxiv.org/abs/1706.03762")
+
+
+@benchmark("digest", setup=_warm)
+def _bench_digest(root: Path):
+    build_digest(root, 0.0)
+
+
+@benchmark("context", setup=_warm)
+def _bench_context(root: Path):
+    build_context(root, "attention transformer", use_cache=False)
+
+
+@benchmark("daily", setup=_warm)
+def _bench_daily(root: Path):
+    create_daily(root, ANCHOR_DATE, dry_run=True)
+
+
+@benchmark("related", setup=_warm)
+def _bench_related(root: Path):
+    related_notes(root, _sample_note(root))
+
+
+@benchmark("similar", setup=_warm)
+def _bench_similar(root: Path):
+    similar_notes(root, _sample_note(root))
+
+
+@benchmark("semantic-search", setup=_warm)
+def _bench_semantic_search(root: Path):
+    semantic_search(root, "aligning language models with human feedback")
+
+
+@benchmark("moc-suggest", setup=_warm)
+def _bench_moc_suggest(root: Path):
+    suggest_mocs(root)
+
+
+def _max_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return round(rss / (2 ** 20 if sys.platform == "darwin" else 2 ** 10), 1)
+
+
+def measure(name: str, root: Path, repeat: int = 3) -> Dict[str, Any]:
+    """Time one benchmark in this process (see ``run_benchmark``).
+
+    Returns:
+        dict with the 'seconds' of each repetition, the 'best' and
+        'median', the 'peak_mb' of Python allocations during one run and
+        the process's 'max_rss_mb'; or an 'error' if the benchmark cannot
+        run here (e.g. NumPy is missing)
+    """
+    setup, run = BENCHMARKS[name]
+    times = []
+    try:
+        for _ in range(repeat):
+            if setup is not None:
+                setup(root)
+            start = time.perf_counter()
+            run(root)
+            times.append(time.perf_counter() - start)
+        if setup is not None:
+            setup(root)
+        tracemalloc.start()
+        try:
+            run(root)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    except RuntimeError as e:
+        return {"error": e.args[0]}
+    return {
+        "seconds": [round(t, 6) for t in times],
+        "best": round(min(times), 6),
+        "median": round(statistics.median(times), 6),
+        "peak_mb": round(peak / 2 ** 20, 2),
+        "max_rss_mb": _max_rss_mb(),
+    }
+
+
+def run_benchmark(name: str, root: Path, repeat: int = 3) -> Dict[str, Any]:
+    """Run ``measure`` in a fresh interpreter, so no benchmark warms another's caches."""
+    proc = subprocess.run(
+        [sys.executable, "-m", "slatekore.bench", name, str(root), str(repeat)],
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        return {"error": lines[-1] if lines else f"exit status {proc.returncode}"}
+    return json.loads(proc.stdout)
+
+
+def run_benchmarks(sizes: Iterable[int], seed: int = 0, repeat: int = 3, only: Optional[List[str]] = None,
+                   workdir: Optional[Path] = None, words: int = WORDS_PER_NOTE,
+                   progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """Generate a vault per size and run the benchmarks on it.
+
+    Args:
+        sizes: Note counts of the vaults to generate
+        seed: Seed of the generated vaults
+        repeat: Timed repetitions per benchmark
+        only: Names of the benchmarks to run (default: all)
+        workdir: Keep the generated vaults here (default: a temporary
+            directory, removed afterwards)
+        words: Mean words per note
+        progress: Called with a line of text as each step finishes
+
+    Raises:
+        ValueError: if ``only`` names an unknown benchmark
+    """
+    names = list(only or BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"unknown benchmark {unknown[0]!r} (choose from {', '.join(BENCHMARKS)})")
+    report: Dict[str, Any] = {
+        "slatekore": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "repeat": repeat,
+        "words": words,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "vaults": [],
+    }
+    base = Path(workdir) if workdir else Path(tempfile.mkdtemp(prefix="slatekore-bench-"))
+    try:
+        for notes in sizes:
+            root = base / f"vault-{notes}"
+            shutil.rmtree(root, ignore_errors=True)
+            generated = generate_vault(root, notes, seed=seed, words=words)
+            if progress:
+                progress(f"generated {generated['notes']} notes ({generated['bytes'] / 2 ** 20:.1f} MB) "
+                         f"in {generated['seconds']:.1f} s")
+            results = {}
+            for name in names:
+                results[name] = run_benchmark(name, root, repeat)
+                if progress:
+                    progress(f"{notes:>8} {name:<16} " + (
+                        results[name]["error"] if "error" in results[name]
+                        else f"{results[name]['best'] * 1000:10.1f} ms  {results[name]['peak_mb']:8.1f} MB"))
+            _warm(root)
+            startup = {r["command"]: r["import_ms"] for r in check_startup(root)}
+            report["vaults"].append(dict(generated, benchmarks=results, startup_ms=startup))
+    finally:
+        if workdir is None:
+            shutil.rmtree(base, ignore_errors=True)
+    return report
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Line up the benchmarks two reports have in common.
+
+    Returns:
+        one dict per (vault size, benchmark): 'notes', 'name', the
+        'baseline' and 'current' best times (s) and their 'ratio'
+    """
+    before = {v["notes"]: v["benchmarks"] for v in baseline["vaults"]}
+    rows = []
+    for vault in current["vaults"]:
+        old = before.get(vault["notes"], {})
+        for name, result in vault["benchmarks"].items():
+            previous = old.get(name)
+            if previous is None or "best" not in previous or "best" not in result:
+                continue
+            rows.append({
+                "notes": vault["notes"], "name": name,
+                "baseline": previous["best"], "current": result["best"],
+                "ratio": round(result["best"] / previous["best"], 3) if previous["best"] else None,
+            })
+    return rows
+
+
+if __name__ == "__main__":
+    # Child process of run_benchmark: NAME ROOT REPEAT
+    print(json.dumps(measure(sys.argv[1], Path(sys.argv[2]), int(sys.argv[3]))))
@@ -2,7 +2,11 @@
 
 import shutil
 import subprocess
-from typing import Dict, Any
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+from .vault import VAULT_FOLDERS
 
 
 def check_prerequisites() -> Dict[str, Any]:
@@ -57,3 +61,106 @@ def _check_gemini_cli() -> Dict[str, Any]:
         "message": "Not found in PATH",
         "help": "Install Gemini CLI: https://ai.google.dev/gemini-api/docs/ai-studio-quickstart"
     }
+
+
+# Import-time budgets in ms (as measured by ``python -X importtime``): the
+# CLI module alone, and each query command an agent may call in a loop
+CLI_BUDGET_MS = 120
+QUERY_BUDGET_MS = 180
+
+# Query commands held to the budget (run with --vault and --json)
+QUERY_COMMANDS = [
+    ["search", "attention"],
+    ["query", "#paper & #to-read"],
+    ["tags"],
+    ["tasks", "--due", "today"],
+    ["graph", "orphans"],
+    ["exists", "1706.03762"],
+    ["digest"],
+]
+
+# Modules only interactive output or ``init`` need
+HEAVY_MODULES = ("rich", "slatekore.init")
+
+
+def import_profile(args: List[str]) -> Dict[str, Any]:
+    """Run ``python -X importtime -m slatekore.cli ARGS`` and total its imports.
+
+    Returns:
+        dict with the 'import_ms' of every module the run imported, the
+        number of 'modules' and the 'heavy' ones (see ``HEAVY_MODULES``)
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "slatekore.cli"] + list(args),
+        capture_output=True, text=True,
+    )
+    total = 0
+    modules = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            modules.append(name.strip())
+            if not name[1:].startswith(" "):
+                # Top-level import: its cumulative time includes its children
+                total += int(cumulative)
+    heavy = sorted({m for m in modules if m.split(".")[0] in HEAVY_MODULES or m in HEAVY_MODULES})
+    return {"import_ms": round(total / 1000, 1), "modules": len(modules), "heavy": heavy}
+
+
+def check_startup(vault: Path) -> List[Dict[str, Any]]:
+    """Measure the import cost of the CLI and its query commands on a vault.
+
+    Returns:
+        one dict per command: its 'command', 'budget_ms', whether it is
+        'ok' (within budget and loading none of ``HEAVY_MODULES``) and the
+        ``import_profile`` fields
+    """
+    runs = [(["--version"], CLI_BUDGET_MS)]
+    runs += [(args + ["--vault", str(vault), "--json"], QUERY_BUDGET_MS) for args in QUERY_COMMANDS]
+    results = []
+    for args, budget in runs:
+        profile = import_profile(args)
+        results.append(dict(
+            profile,
+            command=" ".join(args[:args.index("--vault")] if "--vault" in args else args),
+            budget_ms=budget,
+            ok=profile["import_ms"] <= budget and not profile["heavy"],
+        ))
+    return results
+
+
+def check_vault(root: Path) -> Dict[str, Any]:
+    """Check that a vault is initialized and its shipped files are current.
+
+    Returns:
+        dict with the 'missing' vault folders, the files ``slatekore
+        upgrade`` would change ('outdated') or cannot track ('untracked'),
+        the files still holding 'unresolved' conflict markers, and whether
+        all is 'ok'
+    """
+    from .init import plan_init, shipped_files
+    from .upgrade import CONFLICT_START, upgrade_vault
+    root = Path(root)
+    if not root.is_dir():
+        raise FileNotFoundError(f"{root} is not a directory")
+    folders, _, _, _ = plan_init(root)
+    missing = [folder for folder in folders if folder in VAULT_FOLDERS]
+    pending = upgrade_vault(root, dry_run=True)
+    outdated = sorted(pending["created"] + pending["updated"] + pending["merged"] + pending["conflicts"])
+    unresolved = []
+    for rel in shipped_files():
+        try:
+            text = (root / rel).read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            continue
+        if text.startswith(CONFLICT_START) or "\n" + CONFLICT_START in text:
+            unresolved.append(rel)
+    return {
+        "missing": missing,
+        "outdated": outdated,
+        "untracked": pending["untracked"],
+        "unresolved": unresolved,
+        "ok": not (missing or outdated or unresolved),
+    }
@@ -1,15 +1,36 @@
-"""Slatekore CLI - Initialize Obsidian vaults as AI research second brains."""
+"""Slatekore CLI - Initialize Obsidian vaults as AI research second brains.
+
+Commands import rich and the modules they use when they run, so that a
+query (``slatekore search ... --json``) or ``slatekore --version`` does not
+pay for loading every subsystem and the init templates.
+"""
 
 import click
+import json
+import sys
 from pathlib import Path
-from rich.console import Console
-from rich.panel import Panel
 
 from . import __version__
-from .init import initialize_vault
-from .check import check_prerequisites
+from .vault import note_name
+
+
+class _Console:
+    """Stand-in for the rich console, created on first use."""
+
+    def __getattr__(self, name):
+        global console
+        from rich.console import Console
+        console = Console()
+        return getattr(console, name)
+
 
-console = Console()
+console = _Console()
+
+
+def escape(text: str) -> str:
+    """Escape rich markup in note text."""
+    from rich.markup import escape as escape_markup
+    return escape_markup(text)
 
 
 @click.group()
@@ -25,10 +46,13 @@ def main():
 @main.command()
 @click.argument("path", type=click.Path(), default=".")
 @click.option("--force", "-f", is_flag=True, help="Overwrite existing files")
-def init(path: str, force: bool):
+@click.option("--dry-run", is_flag=True, help="Show what would be written without touching the vault")
+def init(path: str, force: bool, dry_run: bool):
     """Initialize an Obsidian vault with Slatekore.
     
-    PATH is the target directory (defaults to current directory).
+    PATH is the target directory (defaults to current directory). Files
+    already identical to the shipped ones are not rewritten, and every
+    write goes through a temp file and rename.
     
     Examples:
     
@@ -37,33 +61,56 @@ def init(path: str, force: bool):
         slatekore init ./my-vault       # Initialize specific directory
         
         slatekore init . --force        # Overwrite existing config
+        
+        slatekore init . --force --dry-run
     """
+    from rich.panel import Panel
+    from .init import initialize_vault
     target = Path(path).resolve()
     
     console.print(Panel.fit(
         f"[bold blue]🧠 Slatekore v{__version__}[/bold blue]\n"
-        f"Initializing vault at: [cyan]{target}[/cyan]",
+        f"{'Planning' if dry_run else 'Initializing'} vault at: [cyan]{target}[/cyan]",
         border_style="blue"
     ))
     
     try:
-        result = initialize_vault(target, force=force)
+        result = initialize_vault(target, force=force, dry_run=dry_run)
         
         console.print()
-        console.print("[bold green]✅ Vault initialized successfully![/bold green]")
+        if dry_run:
+            console.print("[bold]Dry run, nothing written.[/bold]")
+        elif not result["created"] and not result["updated"]:
+            console.print("[bold green]✅ Vault already up to date.[/bold green]")
+        else:
+            console.print("[bold green]✅ Vault initialized successfully![/bold green]")
         console.print()
         
         # Show what was created
-        console.print("[bold]Created:[/bold]")
-        for item in result["created"]:
-            console.print(f"  [green]•[/green] {item}")
+        verb = "Would create" if dry_run else "Created"
+        if result["created"]:
+            console.print(f"[bold]{verb}:[/bold]")
+            for item in result["created"]:
+                console.print(f"  [green]•[/green] {item}")
+        
+        if result["updated"]:
+            console.print()
+            console.print(f"[bold]{'Would overwrite' if dry_run else 'Overwritten'}:[/bold]")
+            for item in result["updated"]:
+                console.print(f"  [cyan]•[/cyan] {item}")
         
         if result.get("skipped"):
             console.print()
-            console.print("[bold yellow]Skipped (already exists):[/bold yellow]")
+            console.print("[bold yellow]Skipped (customized, use --force to overwrite):[/bold yellow]")
             for item in result["skipped"]:
                 console.print(f"  [yellow]•[/yellow] {item}")
         
+        if result["unchanged"]:
+            console.print()
+            console.print(f"[dim]{len(result['unchanged'])} files already up to date[/dim]")
+        
+        if dry_run or (not result["created"] and not result["updated"]):
+            return
         console.print()
         console.print(Panel(
             "[bold]Next steps:[/bold]\n\n"
@@ -81,13 +128,31 @@ def init(path: str, force: bool):
 
 
 @main.command()
-def check():
+@click.option("--startup", is_flag=True, help="Measure CLI import time against the startup budget instead")
+@click.option("--vault", type=click.Path(exists=True, file_okay=False), default=".",
+              help="Vault the query commands run on (with --startup)")
+@click.option("--json", "as_json", is_flag=True, help="Print startup measurements as JSON")
+def check(startup: bool, vault: str, as_json: bool):
     """Check if prerequisites are installed.
     
     Verifies:
     - Gemini CLI is installed and accessible
     - Obsidian plugins are recommended
+    
+    With --startup, runs the query commands on --vault under
+    python -X importtime and exits with status 1 if any of them exceeds its
+    import-time budget or loads rich or the init templates.
+    
+    Examples:
+    
+        slatekore check
+        
+        slatekore check --startup --vault ~/vault
     """
+    if startup:
+        _check_startup(Path(vault).resolve(), as_json)
+        return
+    from .check import check_prerequisites
     console.print("[bold]Checking prerequisites...[/bold]")
     console.print()
     
@@ -110,14 +175,1046 @@ def check():
         console.print("[bold yellow]Some prerequisites missing. See above for details.[/bold yellow]")
 
 
+def _check_startup(vault: Path, as_json: bool):
+    from .check import check_startup
+    results = check_startup(vault)
+    if as_json:
+        click.echo(json.dumps(results))
+    else:
+        for result in results:
+            mark = "[green]✓[/green]" if result["ok"] else "[red]✗[/red]"
+            heavy = f" [red]loads {', '.join(result['heavy'])}[/red]" if result["heavy"] else ""
+            console.print(f"{mark} {escape(result['command']):<24} {result['import_ms']:>6.1f} ms "
+                          f"[dim](budget {result['budget_ms']} ms, {result['modules']} modules)[/dim]{heavy}")
+    if not all(result["ok"] for result in results):
+        raise SystemExit(1)
+
+
 @main.command()
-def upgrade():
+@click.argument("path", type=click.Path(exists=True, file_okay=False), default=".")
+@click.option("--dry-run", is_flag=True, help="Show what would change without writing")
+@click.option("--force", "-f", is_flag=True, help="Replace customized files instead of merging")
+@click.option("--json", "as_json", is_flag=True, help="Print the upgrade report as JSON")
+def upgrade(path: str, dry_run: bool, force: bool, as_json: bool):
     """Upgrade templates to the latest version.
     
-    Updates templates and workflows while preserving your notes.
+    Updates templates, GEMINI.md and workflows while preserving your notes
+    and your edits: files you have not touched are replaced, customized
+    ones are merged with the new version. Overlapping edits are left with
+    conflict markers and the command exits with status 1.
+    
+    Examples:
+    
+        slatekore upgrade
+        
+        slatekore upgrade ~/vault --dry-run
+    """
+    from .upgrade import upgrade_vault
+    result = upgrade_vault(Path(path).resolve(), dry_run=dry_run, force=force)
+    if as_json:
+        click.echo(json.dumps(result))
+    else:
+        prefix = "Would " if dry_run else ""
+        for key, label, colour in (
+            ("created", "create", "green"), ("updated", "update", "green"), ("merged", "merge", "cyan"),
+            ("conflicts", "merge with conflicts", "red"), ("untracked", "keep (customized, not in manifest)", "yellow"),
+            ("deleted", "keep deleted", "dim"), ("obsolete", "keep (no longer shipped)", "dim"),
+        ):
+            for rel in result[key]:
+                verb = (prefix + label) if dry_run else label.capitalize()
+                console.print(f"[{colour}]{verb}:[/{colour}] {escape(rel)}")
+        changed = sum(len(result[key]) for key in ("created", "updated", "merged", "conflicts"))
+        if not changed:
+            console.print(f"[green]✓ Up to date[/green] [dim]({len(result['unchanged'])} files, {result['ms']:.1f} ms)[/dim]")
+        if result["untracked"]:
+            console.print("[dim]Run with --force to replace untracked files with the shipped version.[/dim]")
+        if result["conflicts"] and not dry_run:
+            console.print("[bold red]Resolve the conflict markers in the files above.[/bold red]")
+    if result["conflicts"]:
+        raise SystemExit(1)
+
+
+@main.command()
+@click.argument("path", type=click.Path(exists=True, file_okay=False), default=".")
+@click.option("--rebuild", is_flag=True, help="Re-read every note instead of only changed ones")
+@click.option("--workers", "-j", type=int, help="Scanner threads (default: SLATEKORE_SCAN_WORKERS or CPUs + 4)")
+@click.option("--json", "as_json", is_flag=True, help="Print the refresh summary as JSON")
+def index(path: str, rebuild: bool, workers: int, as_json: bool):
+    """Build or refresh the vault catalog in .slatekore/.
+    
+    Only notes whose size or mtime changed are re-read, and only notes
+    whose content hash changed are re-parsed.
+    
+    Examples:
+    
+        slatekore index                 # Refresh the current vault
+        
+        slatekore index . --rebuild     # Re-index every note
+    """
+    from .index import Catalog
+    catalog = Catalog.load(Path(path).resolve())
+    result = catalog.refresh(rebuild=rebuild, workers=workers)
+    
+    if as_json:
+        click.echo(json.dumps(dict(result, notes=len(catalog))))
+        return
+    
+    console.print(
+        f"[bold green]Indexed {len(catalog)} notes[/bold green] in "
+        f"{result['seconds'] * 1000:.0f} ms "
+        f"([green]+{len(result['added'])}[/green] "
+        f"[yellow]~{len(result['updated'])}[/yellow] "
+        f"[red]-{len(result['removed'])}[/red])"
+    )
+
+
+@main.command()
+@click.argument("query", nargs=-1, required=True)
+@click.option("--vault", type=click.Path(exists=True, file_okay=False), default=".", help="Vault directory")
+@click.option("--type", "note_type", help="Only notes of this type (paper, model, dataset, ...)")
+@click.option("--folder", help="Only notes under this folder (02-Papers, 09-Models, ...)")
+@click.option("--limit", "-n", default=10, show_default=True, help="Maximum number of results")
+@click.option("--semantic", is_flag=True, help="Rank by n-gram vector similarity instead of BM25")
+@click.option("--json", "as_json", is_flag=True, help="Print results as JSON")
+def search(query, vault: str, note_type: str, folder: str, limit: int, semantic: bool, as_json: bool):
+    """Full-text search of the vault with BM25 ranking.
+    
+    QUERY supports plain terms, "quoted phrases" and prefix* patterns.
+    With --semantic, QUERY is free text matched against hashed word and
+    character n-gram vectors, which also finds notes using related word
+    forms; this needs NumPy (pip install "slatekore[similarity]").
+    
+    Examples:
+    
+        slatekore search diffusion models
+        
+        slatekore search '"multi-head attention"' --folder 02-Papers
+        
+        slatekore search transform* --type model --json
+        
+        slatekore search --semantic "aligning language models with human feedback"
+    """
+    if semantic:
+        from .vectors import semantic_search as run
+    else:
+        from .search import search_vault as run
+    try:
+        response = run(
+            Path(vault).resolve(), " ".join(query),
+            note_type=note_type, folder=folder, limit=limit,
+        )
+    except RuntimeError as e:
+        console.print(f"[bold red]Error:[/bold red] {e.args[0]}")
+        raise SystemExit(1)
+    
+    if as_json:
+        click.echo(json.dumps(response))
+        return
+    
+    if not response["results"]:
+        console.print("[yellow]No matching notes.[/yellow]")
+        return
+    for hit in response["results"]:
+        console.print(
+            f"[bold cyan]{hit['score']:>8.3f}[/bold cyan]  {hit['path']}  "
+            f"[dim]{hit['title']}[/dim]"
+        )
+    console.print(f"[dim]{len(response['results'])} results in {response['ms']:.1f} ms[/dim]")
+
+
+@main.command()
+@click.argument("query", nargs=-1, required=True)
+@click.option("--vault", type=click.Path(exists=True, file_okay=False), default=".", help="Vault directory")
+@click.option("--budget", "-b", default=8000, show_default=True, help="Token budget for the pack")
+@click.option("--notes", "max_notes", default=12, show_default=True, help="Maximum notes to draw on")
+@click.option("--no-cache", is_flag=True, help="Rebuild the pack even if a cached one is valid")
+@click.option("--json", "as_json", is_flag=True, help="Print the pack and its metadata as JSON")
+def context(query, vault: str, budget: int, max_notes: int, no_cache: bool, as_json: bool):
+    """Pack the notes most relevant to QUERY into one markdown bundle.
+    
+    QUERY is a topic or a note (path or wikilink name). The pack keeps the
+    key sections of each note (TL;DR, Core Contribution, Method, ...) and
+    stays under --budget estimated tokens.
+    
+    Examples:
+    
+        slatekore context diffusion transformers --budget 4000
+        
+        slatekore context attention-is-all-you-need > context.md
+    """
+    from .context import build_context
+    result = build_context(
+        Path(vault).resolve(), " ".join(query),
+        budget=budget, max_notes=max_notes, use_cache=not no_cache,
+    )
+    if as_json:
+        click.echo(json.dumps(result))
+    else:
+        click.echo(result["pack"])
+
+
+@main.command()
+@click.argument("path", type=click.Path(exists=True, file_okay=False), default=".")
+@click.option("--poll", is_flag=True, help="Poll for changes instead of using inotify")
+@click.option("--interval", default=2.0, show_default=True, help="Seconds between polls")
+@click.option("--debounce", default=0.5, show_default=True, help="Quiet period before applying a burst of changes")
+def watch(path: str, poll: bool, interval: float, debounce: float):
+    """Keep the vault catalog and indexes current as notes change.
+    
+    Uses inotify on Linux and falls back to polling elsewhere. While the
+    watcher runs, query commands skip their own rescan of the vault.
+    
+    Examples:
+    
+        slatekore watch                 # Watch the current vault
+        
+        slatekore watch ~/vault --poll  # Poll (e.g. on network mounts)
+    """
+    import signal
+    import time
+    from .watch import VaultWatcher
+    target = Path(path).resolve()
+    
+    def report(result):
+        console.print(
+            f"[dim]{time.strftime('%H:%M:%S')}[/dim] "
+            f"[green]+{len(result['added'])}[/green] "
+            f"[yellow]~{len(result['updated'])}[/yellow] "
+            f"[red]-{len(result['removed'])}[/red] "
+            f"[dim]({result['seconds'] * 1000:.0f} ms)[/dim]"
+        )
+    
+    watcher = VaultWatcher(target, debounce=debounce, poll=poll, interval=interval, on_batch=report)
+    signal.signal(signal.SIGTERM, lambda signum, frame: watcher.stop())
+    console.print(
+        f"[bold blue]Watching[/bold blue] [cyan]{target}[/cyan] "
+        f"[dim]({watcher.backend}, Ctrl+C to stop)[/dim]"
+    )
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        console.print("[dim]Stopped.[/dim]")
+
+
+@main.command()
+@click.argument("note")
+@click.option("--vault", type=click.Path(exists=True, file_okay=False), default=".", help="Vault directory")
+@click.option("--limit", "-k", default=5, show_default=True, help="Maximum number of related notes")
+@click.option("--json", "as_json", is_flag=True, help="Print results as JSON")
+def related(note: str, vault: str, limit: int, as_json: bool):
+    """Suggest notes related to NOTE that it does not link to yet.
+    
+    Notes are related by shared vocabulary, shared tags and shared link
+    neighbours. Requires NumPy (pip install "slatekore[similarity]").
+    
+    Examples:
+    
+        slatekore related attention-is-all-you-need
+        
+        slatekore related 02-Papers/bert.md -k 10 --json
+    """
+    from .related import related_notes
+    try:
+        result = related_notes(Path(vault).resolve(), note, k=limit)
+    except (KeyError, RuntimeError) as e:
+        console.print(f"[bold red]Error:[/bold red] {e.args[0]}")
+        raise SystemExit(1)
+    if as_json:
+        click.echo(json.dumps(result))
+        return
+    if not result["related"]:
+        console.print("[yellow]No related notes found.[/yellow]")
+    source = note_name(result["note"])
+    for item in result["related"]:
+        click.echo(f"[[{source}]] ↔ [[{note_name(item['path'])}]]: {item['reason']}")
+
+
+@main.command()
+@click.argument("note")
+@click.option("--vault", type=click.Path(exists=True, file_okay=False), default=".", help="Vault directory")
+@click.option("--limit", "-k", default=10, show_default=True, help="Maximum number of similar notes")
+@click.option("--json", "as_json", is_flag=True, help="Print results as JSON")
+def similar(note: str, vault: str, limit: int, as_json: bool):
+    """List the notes whose text is most similar to NOTE.
+    
+    Unlike related, this compares text only (hashed n-gram vectors) and
+    includes notes NOTE already links to. Requires NumPy (pip install
+    "slatekore[similarity]").
+    
+    Examples:
+    
+        slatekore similar attention-is-all-you-need
+        
+        slatekore similar 02-Papers/bert.md -k 20 --json
+    """
+    from .vectors import similar_notes
+    try:
+        result = similar_notes(Path(vault).resolve(), note, k=limit)
+    except (KeyError, RuntimeError) as e:
+        console.print(f"[bold red]Error:[/bold red] {e.args[0]}")
+        raise SystemExit(1)
+    if as_json:
+        click.echo(json.dumps(result))
+        return
+    if not result["similar"]:
+        console.print("[yellow]No similar notes found.[/yellow]")
+        return
+    for item in result["similar"]:
+        console.print(f"[bold cyan]{item['score']:>6.3f}[/bold cyan]  {item['path']}  [dim]{escape(item['title'])}[/dim]")
+
+
+@main.command()
+@click.argument("urls", nargs=-1)
+@click.option("--batch", "batch", type=click.File("r", encoding="utf-8"),
+              help="Route every URL in this file ('-' for stdin), one per line")
+@click.option("--title", help="Source title, used for the file name of papers, videos and websites")
+@click.option("--json", "as_json", is_flag=True, help="Print routes as JSON")
+def route(urls, batch, title: str, as_json: bool):
+    """Show where captured URLS go: type, folder, template and file name.
+    
+    With --batch, routes are streamed as JSON lines; a line of the input
+    may carry the source title after a tab, and a URL that cannot be
+    routed gets an {"url", "error"} line instead of stopping the stream.
+    
+    Examples:
+    
+        slatekore route https://arxiv.org/abs/1706.03762 --title "Attention Is All You Need"
+        
+        slatekore route --batch urls.txt > routes.jsonl
+    """
+    from .router import route_url, routes_jsonl
+    if batch is not None:
+        for line in routes_jsonl(batch):
+            sys.stdout.write(line + "\n")
+        return
+    if not urls:
+        raise click.UsageError("Give at least one URL, or --batch FILE.")
+    try:
+        routes = [route_url(url, title) for url in urls]
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="URLS")
+    if as_json:
+        click.echo(json.dumps([r.as_dict() for r in routes]))
+        return
+    for r in routes:
+        console.print(f"[cyan]{r.type:<8}[/cyan] {r.path} [dim]({r.template})[/dim]")
+
+
+@main.command(name="import")
+@click.argument("files", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option("--vault", type=click.Path(exists=True, file_okay=False), default=".", help="Vault directory")
+@click.option("--format", "fmt", type=click.Choice(["bib", "csv", "jsonl"]), help="Input format (default: from the file extension)")
+@click.option("--workers", "-j", type=int, help="Writer processes (default: CPU count)")
+@click.option("--dry-run", is_flag=True, help="Show what would be created without writing notes")
+@click.option("--json", "as_json", is_flag=True, help="Print the import summary as JSON")
+def import_(files, vault: str, fmt: str, workers: int, dry_run: bool, as_json: bool):
+    """Create notes from BibTeX, CSV or JSON Lines exports.
+    
+    Each record becomes a paper, model, dataset, space, repo, website or
+    video note from its template. Records already in the vault (same arXiv
+    id, HuggingFace id, repository or URL) are skipped.
+    
+    Examples:
+    
+        slatekore import refs.bib
+        
+        slatekore import models.jsonl --vault ~/vault --dry-run
     """
-    console.print("[yellow]Upgrade command coming soon![/yellow]")
-    console.print("For now, re-run [cyan]slatekore init --force[/cyan] to update templates.")
+    from .importer import import_records, read_records
+    def records():
+        for file in files:
+            yield from read_records(Path(file), fmt)
+    
+    try:
+        result = import_records(Path(vault).resolve(), records(), workers=workers, dry_run=dry_run)
+    except ValueError as e:
+        console.print(f"[bold red]Error:[/bold red] {e}")
+        raise SystemExit(1)
+    if as_json:
+        click.echo(json.dumps(result))
+        return
+    verb = "Would create" if dry_run else "Created"
+    console.print(f"[green]{verb} {len(result['created'])} notes[/green]")
+    for path in result["created"][:20]:
+        console.print(f"  [green]+[/green] {path}")
+    if len(result["created"]) > 20:
+        console.print(f"  [dim]... and {len(result['created']) - 20} more[/dim]")
+    if result["duplicates"]:
+        skipped = sum(len(titles) for titles in result["duplicates"].values())
+        console.print(f"[yellow]Skipped {skipped} already captured[/yellow]")
+    if result["skipped"]:
+        console.print(f"[yellow]Skipped {result['skipped']} records without a title, id or URL[/yellow]")
+
+
+@main.command()
+@click.argument("urls", nargs=-1, required=True)
+@click.option("--vault", type=click.Path(exists=True, file_okay=False), default=".", help="Vault directory")
+@click.option("--json", "as_json", is_flag=True, help="Print results as JSON")
+def exists(urls, vault: str, as_json: bool):
+    """Check whether URLS (or arXiv/HuggingFace ids) are already captured.
+    
+    Exits with status 1 if any of them is not in the vault yet.
+    
+    Examples:
+    
+        slatekore exists https://arxiv.org/pdf/1706.03762v5
+        
+        slatekore exists 1810.04805 https://huggingface.co/google-bert/bert-base-uncased
+    """
+    from .identity import load_identity
+    index = load_identity(Path(vault).resolve())
+    results = []
+    for url in urls:
+        key, notes = index.lookup(url)
+        results.append({"url": url, "key": key, "notes": notes})
+    if as_json:
+        click.echo(json.dumps(results))
+    else:
+        for result in results:
+            if result["notes"]:
+                console.print(f"[green]✓[/green] {result['url']} → " + ", ".join(result["notes"]))
+            else:
+                console.print(f"[yellow]✗[/yellow] {result['url']} [dim]({result['key']})[/dim]")
+    if not all(result["notes"] for result in results):
+        raise SystemExit(1)
+
+
+@main.command()
+@click.option("--vault", type=click.Path(exists=True, file_okay=False), default=".", help="Vault directory")
+@click.option("--threshold", default=0.8, show_default=True, help="Minimum estimated text similarity")
+@click.option("--json", "as_json", is_flag=True, help="Print results as JSON")
+def duplicates(vault: str, threshold: float, as_json: bool):
+    """Find sources captured more than once.
+    
+    Reports notes declaring the same source (arXiv id, model/space/dataset
+    id, repository or URL) and notes with near-identical text filed under
+    different names.
+    """
+    from .identity import load_identity
+    index = load_identity(Path(vault).resolve())
+    collisions = index.collisions()
+    similar = index.near_duplicates(threshold)
+    if as_json:
+        click.echo(json.dumps({
+            "collisions": collisions,
+            "near_duplicates": [{"a": a, "b": b, "similarity": s} for a, b, s in similar],
+        }))
+        return
+    if not collisions and not similar:
+        console.print("[green]No duplicate captures.[/green]")
+    for key, notes in collisions.items():
+        console.print(f"[bold]{key}[/bold]")
+        for note in notes:
+            console.print(f"  [red]•[/red] {note}")
+    for a, b, similarity in similar:
+        console.print(f"[yellow]~{similarity:.0%}[/yellow] {a} ≈ {b}")
+
+
+@main.command()
+@click.option("--vault", type=click.Path(exists=True, file_okay=False), default=".", help="Vault directory")
+@click.option("--date", "day", type=click.DateTime(formats=["%Y-%m-%d"]), help="Date of the note (default: today)")
+@click.option("--force", is_flag=True, help="Overwrite an existing daily note")
+@click.option("--dry-run", is_flag=True, help="Print the note instead of writing it")
+@click.option("--json", "as_json", is_flag=True, help="Print the gathered sections as JSON")
+def daily(vault: str, day, force: bool, dry_run: bool, as_json: bool):
+    """Create today's daily note in 07-Daily/.
+    
+    Fills Tasks Due (kanban tasks due today or overdue, unfinished tasks
+    from the previous daily note), Reading Queue (#to-read notes) and Open
+    Questions (carried over), leaving Focus Today for you.
+    
+    Examples:
+    
+        slatekore daily
+        
+        slatekore daily --date 2026-01-05 --dry-run
+    """
+    from .daily import create_daily
+    try:
+        result = create_daily(Path(vault).resolve(), day.date() if day else None, force=force, dry_run=dry_run)
+    except FileExistsError as e:
+        console.print(f"[bold red]Error:[/bold red] {e}")
+        raise SystemExit(1)
+    if as_json:
+        click.echo(json.dumps(result))
+        return
+    if dry_run:
+        sys.stdout.write(result["text"])
+        return
+    console.print(f"[green]✅ Daily note created:[/green] {result['path']}")
+    console.print(f"  Tasks due: {len(result['tasks'])}")
+    console.print(f"  Reading queue: {result['queue_total']} items")
+    console.print(f"  Open questions from yesterday: {len(result['questions'])}")
+
+
+@main.command()
+@click.option("--vault", type=click.Path(exists=True, file_okay=False), default=".", help="Vault directory")
+@click.option("--due", help="Tasks due on a date: today, tomorrow, yesterday or YYYY-MM-DD")
+@click.option("--overdue", is_flag=True, help="Open tasks due before today")
+@click.option("--project", "-p", help="Tasks of a project (01-Projects folder or #tag)")
+@click.option("--tag", "-t", help="Tasks with a tag")
+@click.option("--all", "include_done", is_flag=True, help="Include completed tasks")
+@click.option("--limit", "-n", type=int, help="Maximum number of tasks")
+@click.option("--json", "as_json", is_flag=True, help="Print results as JSON")
+def tasks(vault: str, due: str, overdue: bool, project: str, tag: str, include_done: bool, limit: int,
+          as_json: bool):
+    """List tasks (- [ ] ... #tag @due(YYYY-MM-DD)) across the vault.
+    
+    --due and --overdue combine: tasks matching either are listed.
+    
+    Examples:
+    
+        slatekore tasks --due today --overdue
+        
+        slatekore tasks --project my-project --tag paper
+    """
+    from .tasks import find_tasks, parse_day
+    try:
+        due = parse_day(due) if due else None
+    except ValueError:
+        raise click.BadParameter(f"{due!r} is not today, tomorrow, yesterday or YYYY-MM-DD", param_hint="--due")
+    result = find_tasks(Path(vault).resolve(), due=due, overdue=overdue, project=project, tag=tag,
+                        include_done=include_done, limit=limit)
+    if as_json:
+        click.echo(json.dumps(result))
+        return
+    if not result["tasks"]:
+        console.print("[yellow]No matching tasks.[/yellow]")
+        return
+    today = parse_day("today")
+    for task in result["tasks"]:
+        box = "[green]✓[/green]" if task["done"] else "☐"
+        due_text = ""
+        if task["due"]:
+            color = "red" if task["due"] < today and not task["done"] else "cyan"
+            due_text = f"[{color}]{task['due']}[/{color}] "
+        console.print(f"{box} {due_text}{escape(task['text'])} [dim]{task['path']}:{task['line']}[/dim]")
+    console.print(f"[dim]{len(result['tasks'])} tasks in {result['ms']:.1f} ms[/dim]")
+
+
+@main.command()
+@click.option("--vault", type=click.Path(exists=True, file_okay=False), default=".", help="Vault directory")
+@click.option("--since", default="today", show_default=True,
+              help="today, yesterday, YYYY-MM-DD or a duration (12h, 7d, 2w)")
+@click.option("--refresh", is_flag=True, help="Sweep the vault for outside edits first")
+@click.option("--json", "as_json", is_flag=True, help="Print the digest as JSON")
+def digest(vault: str, since: str, refresh: bool, as_json: bool):
+    """Summarize the notes created and modified since a date.
+    
+    Reads only the tail of the change journal (.slatekore/journal.jsonl),
+    which every catalog update appends to; without a running watcher, use
+    --refresh to pick up edits made since the last slatekore command.
+    
+    Examples:
+    
+        slatekore digest
+        
+        slatekore digest --since 7d --json
+    """
+    from .index import refresh_catalog
+    from .journal import build_digest, parse_since
+    root = Path(vault).resolve()
+    try:
+        start = parse_since(since)
+    except ValueError:
+        raise click.BadParameter(f"{since!r} is not a date or duration", param_hint="--since")
+    if refresh:
+        refresh_catalog(root)
+    result = build_digest(root, start)
+    if as_json:
+        click.echo(json.dumps(result))
+        return
+    counts = {op: len(result[op]) for op in ("created", "modified", "renamed", "deleted")}
+    console.print(f"[bold]📊 Digest since {result['since'].replace('T', ' ')}[/bold]")
+    console.print("  ".join(f"{op.capitalize()}: {n}" for op, n in counts.items()))
+    marks = {note["path"]: "[green]+[/green]" for note in result["created"]}
+    marks.update({note["path"]: "[yellow]→[/yellow]" for note in result["renamed"]})
+    titles = {note["path"]: note["title"] for op in ("created", "modified", "renamed") for note in result[op]}
+    for group, paths in result["groups"].items():
+        if not paths:
+            continue
+        console.print(f"\n[bold cyan]{group.capitalize()}[/bold cyan] ({len(paths)})")
+        for path in paths:
+            link = escape(f"[[{note_name(path)}]]")
+            console.print(f"  {marks.get(path, '[blue]~[/blue]')} {link} [dim]{escape(titles[path])}[/dim]")
+    if result["deleted"]:
+        console.print(f"\n[bold red]Deleted[/bold red] ({len(result['deleted'])})")
+        for note in result["deleted"]:
+            console.print(f"  [red]-[/red] {note['path']}")
+
+
+@main.command()
+@click.argument("expression")
+@click.option("--vault", type=click.Path(exists=True, file_okay=False), default=".", help="Vault directory")
+@click.option("--count", "count_only", is_flag=True, help="Only print the number of matching notes")
+@click.option("--stats", is_flag=True, help="Also list the tags co-occurring in the result")
+@click.option("--explain", is_flag=True, help="Show the steps the query planner ran")
+@click.option("--limit", "-n", type=int, help="Maximum number of notes to list")
+@click.option("--json", "as_json", is_flag=True, help="Print results as JSON")
+def query(expression: str, vault: str, count_only: bool, stats: bool, explain: bool, limit: int, as_json: bool):
+    """Find notes by their tags and frontmatter fields.
+    
+    Tags combine with & (or AND, or just a space), | (OR), ! or - (NOT)
+    and parentheses; a trailing * matches every tag with that prefix.
+    Field terms (field=value, != > >= < <=, field~text, has:field) must
+    all hold; sort:[-]field, limit:N and fields:a,b shape the table.
+    
+    Examples:
+    
+        slatekore query "#paper & #to-read & !#archived"
+        
+        slatekore query "(#nlp | #ml/*) -#archived" --stats
+        
+        slatekore query "type=paper year>=2022 citations>100 sort:-citations limit:20"
+    """
+    from .tags import query_tags
+    root = Path(vault).resolve()
+    try:
+        # Field terms and directives all need one of these characters, so
+        # tag queries skip loading the field index (and NumPy)
+        if any(c in expression for c in "=<>~:") and _is_field_query(expression):
+            from .fields import query_notes
+            result = query_notes(root, expression, limit=limit, stats=stats)
+        else:
+            result = query_tags(root, expression, stats=stats, limit=limit)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="EXPRESSION")
+    if as_json:
+        click.echo(json.dumps(result))
+        return
+    if not count_only and "columns" in result:
+        if result["notes"]:
+            from rich.table import Table
+            table = Table(box=None, header_style="bold cyan")
+            for column in result["columns"]:
+                table.add_column(column, no_wrap=column == "path", overflow="fold")
+            for note in result["notes"]:
+                cells = [note["path"]] + ["" if note[c] is None else str(note[c]) for c in result["columns"][1:]]
+                table.add_row(*(escape(cell) for cell in cells))
+            console.print(table)
+    elif not count_only:
+        for path in result["notes"]:
+            console.print(escape(f"[[{note_name(path)}]]") + f" [dim]{path}[/dim]")
+    if not count_only and result["count"] > len(result["notes"]):
+        console.print(f"[dim]... and {result['count'] - len(result['notes'])} more[/dim]")
+    if "tags" in result:
+        console.print(" ".join(f"#{tag} [dim]{n}[/dim]" for tag, n in result["tags"]))
+    if explain and "plan" in result:
+        for step in result["plan"]:
+            console.print(f"[dim]{step['step']:<7} {escape(step['term'])} → {step['notes']} notes[/dim]")
+    console.print(f"[dim]{result['count']} notes in {result['ms']:.3f} ms[/dim]")
+
+
+def _is_field_query(expression: str) -> bool:
+    from .fields import is_field_query
+    return is_field_query(expression)
+
+
+@main.command(name="tags")
+@click.argument("tag", required=False)
+@click.option("--vault", type=click.Path(exists=True, file_okay=False), default=".", help="Vault directory")
+@click.option("--limit", "-n", default=30, show_default=True, help="Maximum number of tags")
+@click.option("--json", "as_json", is_flag=True, help="Print counts as JSON")
+def tags_(tag: str, vault: str, limit: int, as_json: bool):
+    """Count notes per tag, or the tags co-occurring with TAG.
+    
+    Examples:
+    
+        slatekore tags
+        
+        slatekore tags paper
+    """
+    from .frontmatter import normalize_tag
+    from .tags import load_tags
+    index = load_tags(Path(vault).resolve())
+    bits = index.evaluate(("tag", normalize_tag(tag))) if tag else None
+    pairs = index.cooccurrence(bits, limit=limit)
+    if as_json:
+        click.echo(json.dumps(dict(pairs)))
+        return
+    if not pairs:
+        console.print("[yellow]No tagged notes.[/yellow]")
+        return
+    width = max(len(t) for t, _ in pairs) + 1
+    for name, n in pairs:
+        click.echo(f"#{name:<{width}} {n}")
+
+
+@main.group()
+def moc():
+    """Maps of Content: find clusters of notes that deserve one."""
+    pass
+
+
+@moc.command()
+@click.option("--vault", type=click.Path(exists=True, file_okay=False), default=".", help="Vault directory")
+@click.option("--min-size", default=8, show_default=True, help="Notes a cluster needs")
+@click.option("--resolution", default=1.0, show_default=True, help="Higher values give smaller clusters")
+@click.option("--limit", "-n", default=10, show_default=True, help="Maximum number of suggestions")
+@click.option("--write", is_flag=True, help="Create the suggested MOCs in 08-Maps/")
+@click.option("--json", "as_json", is_flag=True, help="Print suggestions (with skeletons) as JSON")
+def suggest(vault: str, min_size: int, resolution: float, limit: int, write: bool, as_json: bool):
+    """Suggest MOCs for clusters of related notes no MOC covers yet.
+    
+    Clusters come from community detection over the wikilink graph,
+    weighted by shared tags and text similarity; raise --resolution for
+    smaller, more specific clusters. Requires NumPy (pip install
+    "slatekore[similarity]").
+    
+    Examples:
+    
+        slatekore moc suggest
+        
+        slatekore moc suggest --min-size 12 --write
+    """
+    from .moc import suggest_mocs, write_mocs
+    root = Path(vault).resolve()
+    try:
+        result = suggest_mocs(root, min_size=min_size, limit=limit, resolution=resolution)
+    except RuntimeError as e:
+        console.print(f"[bold red]Error:[/bold red] {e.args[0]}")
+        raise SystemExit(1)
+    created = write_mocs(root, result["suggestions"]) if write else []
+    if as_json:
+        result["created"] = created
+        click.echo(json.dumps(result))
+        return
+    if not result["suggestions"]:
+        console.print(f"[green]No uncovered clusters of {min_size}+ notes.[/green]")
+        return
+    for cluster in result["suggestions"]:
+        tags = " ".join(f"#{t}" for t in cluster["tags"])
+        mark = "[green]+[/green] " if cluster["path"] in created else ""
+        console.print(f"{mark}[bold cyan]{escape(cluster['topic'])}[/bold cyan] "
+                      f"({len(cluster['notes'])} notes) {tags} → {cluster['path']}")
+        for path in cluster["notes"][:5]:
+            console.print(f"    {escape(f'[[{note_name(path)}]]')}")
+        if len(cluster["notes"]) > 5:
+            console.print(f"    [dim]... and {len(cluster['notes']) - 5} more[/dim]")
+        if cluster["covered_by"]:
+            console.print(f"    [dim]{cluster['coverage']:.0%} linked from {cluster['covered_by']}[/dim]")
+
+
+@main.group()
+def graph():
+    """Query the wikilink graph (backlinks, orphans, neighbourhoods, paths)."""
+    pass
+
+
+def _vault_option(command):
+    return click.option(
+        "--vault", type=click.Path(exists=True, file_okay=False), default=".",
+        help="Vault directory",
+    )(command)
+
+
+def _print_notes(notes, as_json: bool, empty: str):
+    if as_json:
+        click.echo(json.dumps(notes))
+    elif not notes:
+        console.print(f"[yellow]{empty}[/yellow]")
+    else:
+        for note in notes:
+            console.print(f"  [green]•[/green] {note}")
+
+
+def _open_graph(vault: str):
+    from .graph import load_graph
+    return load_graph(Path(vault).resolve())
+
+
+def _graph_lookup(func, *args):
+    try:
+        return func(*args)
+    except KeyError as e:
+        console.print(f"[bold red]Error:[/bold red] {e.args[0]}")
+        raise SystemExit(1)
+
+
+@graph.command()
+@click.argument("note")
+@_vault_option
+@click.option("--json", "as_json", is_flag=True, help="Print results as JSON")
+def backlinks(note: str, vault: str, as_json: bool):
+    """List notes linking to NOTE (a path or wikilink name)."""
+    g = _open_graph(vault)
+    _print_notes(_graph_lookup(g.backlinks, note), as_json, "No backlinks.")
+
+
+@graph.command()
+@click.argument("note")
+@_vault_option
+@click.option("--json", "as_json", is_flag=True, help="Print results as JSON")
+def outlinks(note: str, vault: str, as_json: bool):
+    """List notes that NOTE links to."""
+    g = _open_graph(vault)
+    _print_notes(_graph_lookup(g.outlinks, note), as_json, "No outlinks.")
+
+
+@graph.command()
+@_vault_option
+@click.option("--json", "as_json", is_flag=True, help="Print results as JSON")
+def orphans(vault: str, as_json: bool):
+    """List notes with no links in or out."""
+    _print_notes(_open_graph(vault).orphans(), as_json, "No orphan notes.")
+
+
+@graph.command()
+@_vault_option
+@click.option("--json", "as_json", is_flag=True, help="Print results as JSON")
+def dangling(vault: str, as_json: bool):
+    """List links that do not resolve to any note."""
+    result = _open_graph(vault).dangling()
+    if as_json:
+        click.echo(json.dumps(result))
+        return
+    if not result:
+        console.print("[green]All links resolve.[/green]")
+    for note, targets in result.items():
+        console.print(f"{note}: " + ", ".join(f"[red][[{t}]][/red]" for t in targets))
+
+
+@graph.command()
+@click.argument("note")
+@_vault_option
+@click.option("--hops", "-k", default=2, show_default=True, help="Maximum link distance")
+@click.option("--direction", type=click.Choice(["both", "out", "in"]), default="both", show_default=True)
+@click.option("--json", "as_json", is_flag=True, help="Print results as JSON")
+def neighbours(note: str, vault: str, hops: int, direction: str, as_json: bool):
+    """List notes within --hops links of NOTE."""
+    g = _open_graph(vault)
+    result = _graph_lookup(g.neighbourhood, note, hops, direction)
+    if as_json:
+        click.echo(json.dumps(result))
+        return
+    if not result:
+        console.print("[yellow]No linked notes.[/yellow]")
+    for path, distance in result.items():
+        console.print(f"  [cyan]{distance}[/cyan]  {path}")
+
+
+@graph.command(name="path")
+@click.argument("source")
+@click.argument("target")
+@_vault_option
+@click.option("--direction", type=click.Choice(["both", "out", "in"]), default="both", show_default=True)
+@click.option("--json", "as_json", is_flag=True, help="Print results as JSON")
+def shortest_path(source: str, target: str, vault: str, direction: str, as_json: bool):
+    """Show the shortest chain of links from SOURCE to TARGET."""
+    g = _open_graph(vault)
+    chain = _graph_lookup(g.shortest_path, source, target, direction)
+    if as_json:
+        click.echo(json.dumps(chain))
+    elif chain is None:
+        console.print("[yellow]No path between these notes.[/yellow]")
+    else:
+        console.print(" → ".join(f"[[{p}]]" for p in chain))
+
+
+@main.group()
+def fleet():
+    """Init, upgrade or check many vaults at once."""
+    pass
+
+
+def _fleet_options(command):
+    command = click.argument("vaults", nargs=-1, type=click.Path(file_okay=False))(command)
+    command = click.option("--from", "vault_list", type=click.File("r"),
+                           help="File listing one vault per line ('-' for stdin)")(command)
+    command = click.option("--workers", "-j", type=int,
+                           help="Vaults processed at once (default: SLATEKORE_FLEET_WORKERS or CPUs + 4)")(command)
+    command = click.option("--output", "-o", type=click.Path(dir_okay=False),
+                           help="Write the JSON summary to this file")(command)
+    command = click.option("--json", "as_json", is_flag=True, help="Print the JSON summary")(command)
+    return command
+
+
+def _run_fleet(action: str, vaults: tuple, vault_list, workers: int, output: str, as_json: bool, **options):
+    from .fleet import read_vault_list, run_fleet
+    paths = [Path(v).resolve() for v in vaults]
+    if vault_list is not None:
+        base = Path.cwd() if vault_list.name == "<stdin>" else Path(vault_list.name).resolve().parent
+        paths += read_vault_list(vault_list.read(), base)
+    paths = list(dict.fromkeys(paths))
+    if not paths:
+        raise click.UsageError("No vaults given (pass VAULTS or --from FILE)")
+    
+    def progress(result):
+        mark = "[green]✓[/green]" if result["ok"] else "[red]✗[/red]"
+        detail = escape(result["error"]) if "error" in result else _fleet_detail(action, result["result"])
+        console.print(f"{mark} {escape(result['vault'])} [dim]({result['ms']:.0f} ms)[/dim] {detail}")
+    
+    summary = run_fleet(action, paths, workers=workers, progress=None if as_json else progress, **options)
+    if output:
+        Path(output).write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+    if as_json:
+        click.echo(json.dumps(summary))
+    else:
+        colour = "green" if not summary["failed"] else "red"
+        console.print(f"[bold {colour}]{summary['ok']}/{summary['vaults']} vaults ok[/bold {colour}] "
+                      f"[dim]in {summary['seconds']:.1f} s[/dim]")
+    if summary["failed"]:
+        raise SystemExit(1)
+
+
+def _fleet_detail(action: str, result: dict) -> str:
+    if action == "check":
+        problems = [f"{len(result[key])} {key}" for key in ("missing", "outdated", "unresolved", "untracked")
+                    if result[key]]
+        return ", ".join(problems) or "up to date"
+    keys = ("created", "updated", "skipped") if action == "init" else ("created", "updated", "merged", "conflicts")
+    counts = [f"{len(result[key])} {key}" for key in keys if result[key]]
+    return ", ".join(counts) or "up to date"
+
+
+@fleet.command(name="init")
+@_fleet_options
+@click.option("--force", "-f", is_flag=True, help="Overwrite existing files")
+@click.option("--dry-run", is_flag=True, help="Show what would be written without touching the vaults")
+def fleet_init(vaults: tuple, vault_list, workers: int, output: str, as_json: bool, force: bool, dry_run: bool):
+    """Initialize every vault (see `slatekore init`).
+    
+    Examples:
+    
+        slatekore fleet init --from vaults.txt
+        
+        slatekore fleet init /srv/vaults/* -j 16
+    """
+    _run_fleet("init", vaults, vault_list, workers, output, as_json, force=force, dry_run=dry_run)
+
+
+@fleet.command(name="upgrade")
+@_fleet_options
+@click.option("--force", "-f", is_flag=True, help="Replace customized files instead of merging")
+@click.option("--dry-run", is_flag=True, help="Show what would change without writing")
+def fleet_upgrade(vaults: tuple, vault_list, workers: int, output: str, as_json: bool, force: bool, dry_run: bool):
+    """Upgrade every vault's templates (see `slatekore upgrade`).
+    
+    Vaults left with merge conflicts count as failed.
+    
+    Examples:
+    
+        slatekore fleet upgrade --from vaults.txt -o upgrade.json
+    """
+    _run_fleet("upgrade", vaults, vault_list, workers, output, as_json, force=force, dry_run=dry_run)
+
+
+@fleet.command(name="check")
+@_fleet_options
+def fleet_check(vaults: tuple, vault_list, workers: int, output: str, as_json: bool):
+    """Check that every vault is initialized and up to date.
+    
+    A vault fails if folders are missing, `slatekore upgrade` would change
+    files or conflict markers are left unresolved.
+    
+    Examples:
+    
+        slatekore fleet check --from vaults.txt --json
+    """
+    _run_fleet("check", vaults, vault_list, workers, output, as_json)
+
+
+@main.group()
+def bench():
+    """Generate synthetic vaults and benchmark slatekore on them."""
+    pass
+
+
+@bench.command(name="generate")
+@click.argument("path", type=click.Path(file_okay=False))
+@click.option("--notes", "-n", default=1000, show_default=True, help="Number of notes")
+@click.option("--seed", default=0, show_default=True, help="Random seed (same seed, same vault)")
+@click.option("--words", default=250, show_default=True, help="Mean words per note")
+def bench_generate(path: str, notes: int, seed: int, words: int):
+    """Create a synthetic vault at PATH from the built-in templates.
+    
+    PATH must not exist or be empty. The vault holds papers, models, repos,
+    datasets, spaces, websites and videos with realistic frontmatter,
+    daily notes, projects with kanban boards and MOCs, tagged and linked
+    like a real one.
+    
+    Examples:
+    
+        slatekore bench generate /tmp/vault-10k --notes 10000
+    """
+    from .bench import generate_vault
+    root = Path(path).resolve()
+    if root.exists() and any(root.iterdir()):
+        raise click.BadParameter(f"{path} is not empty", param_hint="PATH")
+    result = generate_vault(root, notes, seed=seed, words=words)
+    console.print(f"[green]✓[/green] {result['notes']} notes "
+                  f"({result['bytes'] / 2 ** 20:.1f} MB) in {result['seconds']:.1f} s → {root}")
+
+
+@bench.command(name="run")
+@click.option("--notes", "-n", "sizes", multiple=True, type=int, help="Vault size (repeatable; default 1000)")
+@click.option("--seed", default=0, show_default=True, help="Random seed of the generated vaults")
+@click.option("--repeat", default=3, show_default=True, help="Timed runs per benchmark")
+@click.option("--only", multiple=True, help="Run only this benchmark (repeatable)")
+@click.option("--keep", type=click.Path(file_okay=False), help="Keep the generated vaults in this directory")
+@click.option("--output", "-o", type=click.Path(dir_okay=False), help="Write the JSON results to this file")
+@click.option("--json", "as_json", is_flag=True, help="Print the JSON results")
+def bench_run(sizes: tuple, seed: int, repeat: int, only: tuple, keep: str, output: str, as_json: bool):
+    """Time slatekore's vault-scanning commands on synthetic vaults.
+    
+    Each benchmark runs in a fresh Python process; the best of --repeat
+    runs is reported with the peak memory Python allocated. Save the JSON
+    with --output and compare two versions with `slatekore bench compare`.
+    
+    Examples:
+    
+        slatekore bench run
+        
+        slatekore bench run -n 1000 -n 10000 -o bench-0.3.json
+        
+        slatekore bench run --only search --only query-tags --repeat 5
+    """
+    from .bench import run_benchmarks
+    progress = None if as_json else lambda line: console.print(escape(line))
+    try:
+        report = run_benchmarks(sizes or (1000,), seed=seed, repeat=repeat, only=list(only),
+                                workdir=Path(keep).resolve() if keep else None, progress=progress)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--only")
+    if output:
+        Path(output).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    if as_json:
+        click.echo(json.dumps(report))
+        return
+    if output:
+        console.print(f"[green]✓[/green] Results written to {output}")
+
+
+@bench.command(name="compare")
+@click.argument("baseline", type=click.Path(exists=True, dir_okay=False))
+@click.argument("current", type=click.Path(exists=True, dir_okay=False))
+@click.option("--threshold", default=1.25, show_default=True,
+              help="Slowdown ratio counted as a regression")
+@click.option("--json", "as_json", is_flag=True, help="Print the comparison as JSON")
+def bench_compare(baseline: str, current: str, threshold: float, as_json: bool):
+    """Compare two `bench run --output` files.
+    
+    Exits with status 1 if any benchmark got slower than --threshold
+    times its BASELINE time.
+    
+    Examples:
+    
+        slatekore bench compare bench-0.2.json bench-0.3.json
+    """
+    from .bench import compare_results
+    rows = compare_results(json.loads(Path(baseline).read_text(encoding="utf-8")),
+                           json.loads(Path(current).read_text(encoding="utf-8")))
+    regressions = [r for r in rows if r["ratio"] is not None and r["ratio"] > threshold]
+    if as_json:
+        click.echo(json.dumps({"benchmarks": rows, "regressions": regressions}))
+    else:
+        for row in rows:
+            colour = "red" if row in regressions else "green" if row["ratio"] and row["ratio"] < 1 / threshold else "dim"
+            ratio = f"{row['ratio']:.2f}x" if row["ratio"] is not None else "-"
+            console.print(f"{row['notes']:>8} {row['name']:<16} {row['baseline'] * 1000:>10.1f} ms → "
+                          f"{row['current'] * 1000:>10.1f} ms  [{colour}]{ratio}[/{colour}]")
+    if regressions:
+        raise SystemExit(1)
 
 
 if __name__ == "__main__":
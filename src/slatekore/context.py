@@ -0,0 +1,274 @@
+"""Token-budgeted context packs for the Gemini agent.
+
+``build_context`` picks the notes most relevant to a topic (or to a note
+and its link neighbourhood), keeps the most useful sections of each (the
+TL;DR, Core Contribution and Method of a paper, for example), drops
+template sections that were never filled in, and packs the result into a
+single markdown bundle under a token budget.
+
+Packs are cached in ``.slatekore/context.json`` by query and budget, and
+stay valid as long as none of the notes they draw on has changed, so a
+repeated prompt costs a handful of ``stat`` calls.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from .frontmatter import split_frontmatter
+from .graph import LinkGraph
+from .index import Catalog, refresh_catalog
+from .render import template_text
+from .search import SearchIndex, tokenize
+from .vault import atomic_write_bytes, note_name, state_path
+
+CONTEXT_CACHE_FILE = "context.json"
+MAX_CACHED_PACKS = 64
+
+# Approximate characters per token; no tokenizer is needed for budgeting
+CHARS_PER_TOKEN = 4
+
+# Sections worth the most tokens for each note type, best first
+KEY_SECTIONS = {
+    "paper": ("TL;DR", "Core Contribution", "Method", "Results", "Relevance to My Work"),
+    "model": ("Quick Facts", "Capabilities", "Architecture Notes", "Performance"),
+    "repo": ("Overview", "Novel Techniques", "Architecture", "Code Patterns Worth Stealing"),
+    "space": ("What It Does", "Implementation Highlights", "Code Analysis"),
+    "dataset": ("Overview", "Schema/Structure", "Statistics", "Data Quality"),
+    "website": ("Key Takeaways", "Technical Details", "Novel Ideas"),
+    "video": ("Overview", "Key Insights & Learnings", "Technical Content"),
+    "project": ("Goal", "Status", "Approach", "Next Steps"),
+    "prd": ("1. Executive Summary", "2. Problem Statement", "7. Requirements"),
+    "system-design": ("1. Overview", "3. System Architecture", "4. Component Breakdown"),
+    "moc": ("Overview", "Core Concepts", "Key Patterns"),
+    "daily": ("Focus Today", "Key Insights", "Open Questions"),
+}
+
+_SECTION = re.compile(r"^##\s+(.+?)\s*$", re.MULTILINE)
+# Lines a template leaves behind when a section was never filled in: bare
+# bullets and checkboxes, italic prompts, ### headings, empty table rows and
+# labels with nothing after them ("- Code:", "- **Actor**:", "**Method**:")
+_PLACEHOLDER = re.compile(
+    r"^\s*(?:[-*]\s*(?:\[ \]\s*)?|\*[^*]+\*|#{3,}.*|\|[-\s|]*\||"
+    r"(?:[-*]\s+)?\*\*[^*]+\*\*:|[-*]\s+[^\s:\[\]][^:\[\]]{0,40}:|)\s*$")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+# Code lines a template puts in a fence as a prompt ("# How to load")
+_CODE_PROMPT = re.compile(r"^\s*(?:(?:#|//|--).*)?$")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of LLM tokens in ``text``."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def split_sections(body: str, scaffold: FrozenSet[str] = frozenset()) -> List[Tuple[str, str]]:
+    """Split a note body into ``(heading, text)`` pairs at ``##`` headings.
+
+    Text before the first ``##`` heading (minus the H1 title) is returned
+    under an empty heading. Sections holding nothing but template prompts
+    and ``scaffold`` lines (see ``template_lines``) are left out.
+    """
+    sections = []
+    matches = list(_SECTION.finditer(body))
+    intro = body[:matches[0].start()] if matches else body
+    intro = "\n".join(line for line in intro.splitlines() if not line.startswith("# "))
+    sections.append(("", intro.strip()))
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(body)
+        sections.append((match.group(1), body[match.end():end].strip()))
+    return [(heading, text) for heading, text in sections if _is_filled(text, scaffold)]
+
+
+def template_lines(root: Optional[Path], note_type: str) -> FrozenSet[str]:
+    """Return the body lines a note type's template fills in verbatim
+    (``- Paper: [arxiv](https://arxiv.org/abs/)``), stripped."""
+    try:
+        _, body = split_frontmatter(template_text(root, note_type))
+    except KeyError:
+        return frozenset()
+    return frozenset(line.strip() for line in body.splitlines() if line.strip() and "{{" not in line)
+
+
+def _is_filled(text: str, scaffold: FrozenSet[str] = frozenset()) -> bool:
+    """Check whether a section holds more than unfilled template prompts.
+
+    Code fences holding nothing but comments count as prompts too.
+    """
+    fenced = False
+    for line in text.splitlines():
+        if _FENCE.match(line):
+            fenced = not fenced
+        elif line.strip() not in scaffold and not (_CODE_PROMPT if fenced else _PLACEHOLDER).match(line):
+            return True
+    return False
+
+
+class ContextCache:
+    """Context packs keyed by query, validated against note mtimes."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.path = state_path(self.root, CONTEXT_CACHE_FILE)
+        try:
+            self.entries: Dict[str, Any] = json.loads(self.path.read_bytes())
+        except (OSError, ValueError):
+            self.entries = {}
+
+    @staticmethod
+    def key(query: str, budget: int, max_notes: int) -> str:
+        raw = json.dumps([query.strip().lower(), budget, max_notes])
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=12).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        for path, mtime in entry["mtimes"].items():
+            try:
+                if os.stat(self.root / path).st_mtime_ns != mtime:
+                    return None
+            except OSError:
+                return None
+        return entry
+
+    def put(self, key: str, entry: Dict[str, Any]):
+        self.entries[key] = entry
+        if len(self.entries) > MAX_CACHED_PACKS:
+            oldest = sorted(self.entries, key=lambda k: self.entries[k]["created"])
+            for stale in oldest[:len(self.entries) - MAX_CACHED_PACKS]:
+                del self.entries[stale]
+        state_path(self.root, CONTEXT_CACHE_FILE, create=True)
+        atomic_write_bytes(self.path, json.dumps(self.entries).encode("utf-8"))
+
+
+def _find_note(catalog: Catalog, query: str) -> Optional[str]:
+    """Return the note a query names (by path or wikilink name), if any."""
+    query = query.strip()
+    if query in catalog.notes:
+        return query
+    name = query[:-3] if query.endswith(".md") else query
+    if name + ".md" in catalog.notes:
+        return name + ".md"
+    matches = [p for p in catalog if note_name(p).lower() == name.lower()]
+    return min(matches, key=lambda p: (len(p), p)) if matches else None
+
+
+def _rank_notes(root: Path, catalog: Catalog, query: str, max_notes: int) -> List[Tuple[str, float]]:
+    """Return ``(path, relevance in 0..1)`` for the notes to draw on."""
+    ranked: Dict[str, float] = {}
+    seed = _find_note(catalog, query)
+    if seed is not None:
+        # A note: itself, its direct links, then notes about the same things
+        graph = LinkGraph.load(root)
+        graph.update(catalog)
+        ranked[seed] = 1.0
+        for path in graph.neighbourhood(seed, hops=1):
+            ranked[path] = 0.8
+        record = catalog.get(seed)
+        query = " ".join([record["title"]] + record["tags"])
+
+    index = SearchIndex.load(root)
+    index.update(catalog)
+    hits = index.search(query, limit=max_notes * 2)
+    if hits:
+        best = hits[0]["score"] or 1.0
+        for hit in hits:
+            ranked.setdefault(hit["path"], 0.7 * hit["score"] / best)
+    return sorted(ranked.items(), key=lambda item: -item[1])[:max_notes]
+
+
+def build_context(root: Path, query: str, budget: int = 8000, max_notes: int = 12,
+                  use_cache: bool = True) -> Dict[str, Any]:
+    """Build a markdown context pack for a topic or a note.
+
+    Args:
+        root: Vault directory
+        query: A topic ("diffusion transformers") or a note path/name
+        budget: Maximum size of the pack, in estimated tokens
+        max_notes: Maximum number of notes to draw on
+        use_cache: Reuse a cached pack if none of its notes changed
+
+    Returns:
+        dict with the markdown 'pack', the 'notes' it draws on, its
+        estimated 'tokens', whether it came from the 'cached' store and
+        the elapsed time in 'ms'
+    """
+    start = time.perf_counter()
+    root = Path(root)
+    cache = ContextCache(root)
+    key = cache.key(query, budget, max_notes)
+    if use_cache:
+        entry = cache.get(key)
+        if entry is not None:
+            return dict(entry, cached=True, ms=round((time.perf_counter() - start) * 1000, 2))
+
+    catalog = refresh_catalog(root)
+    ranked = _rank_notes(root, catalog, query, max_notes)
+    terms = set(tokenize(query))
+
+    # Score every filled-in section of every candidate note
+    candidates = []
+    notes: Dict[str, Dict[str, Any]] = {}
+    scaffolds: Dict[str, FrozenSet[str]] = {}
+    for rank, (path, relevance) in enumerate(ranked):
+        record = catalog.get(path)
+        try:
+            text = (root / path).read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            continue
+        _, body = split_frontmatter(text)
+        key_sections = KEY_SECTIONS.get(record["type"], ())
+        if record["type"] not in scaffolds:
+            scaffolds[record["type"]] = template_lines(root, record["type"])
+        notes[path] = {"rank": rank, "record": record}
+        for position, (heading, section) in enumerate(split_sections(body, scaffolds[record["type"]])):
+            if heading in key_sections:
+                weight = 1.0 - 0.1 * key_sections.index(heading)
+            else:
+                weight = 0.3 if heading else 0.5
+            overlap = len(terms & set(tokenize(heading + " " + section)))
+            score = relevance * (weight + 0.2 * min(overlap, 5))
+            candidates.append((score, path, position, heading, section))
+
+    # Greedy fill by score; every note used costs a small header
+    used = estimate_tokens(f"# Context: {query}\n\n")
+    chosen: Dict[str, List[Tuple[int, str, str]]] = {}
+    for score, path, position, heading, section in sorted(candidates, key=lambda c: -c[0]):
+        cost = estimate_tokens(f"### {heading}\n{section}\n\n")
+        if path not in chosen:
+            cost += estimate_tokens(_note_header(path, notes[path]["record"]))
+        if used + cost > budget:
+            continue
+        used += cost
+        chosen.setdefault(path, []).append((position, heading, section))
+
+    parts = [f"# Context: {query}\n"]
+    for path in sorted(chosen, key=lambda p: notes[p]["rank"]):
+        parts.append(_note_header(path, notes[path]["record"]))
+        # Sections keep their order within the note
+        for _, heading, section in sorted(chosen[path]):
+            parts.append(f"### {heading or 'Summary'}\n{section}\n")
+    pack = "\n".join(parts)
+
+    mtimes = {path: catalog.get(path)["mtime"] for path in chosen}
+    entry = {
+        "query": query,
+        "pack": pack,
+        "notes": sorted(chosen, key=lambda p: notes[p]["rank"]),
+        "tokens": estimate_tokens(pack),
+        "mtimes": mtimes,
+        "created": time.time(),
+    }
+    if use_cache:
+        cache.put(key, entry)
+    return dict(entry, cached=False, ms=round((time.perf_counter() - start) * 1000, 2))
+
+
+def _note_header(path: str, record: Dict[str, Any]) -> str:
+    tags = " ".join(f"#{t}" for t in record["tags"][:8])
+    line = f"## [[{note_name(path)}]] ({record['type'] or 'note'} · {path})\n"
+    return line + (f"tags: {tags}\n" if tags else "")
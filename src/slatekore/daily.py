@@ -0,0 +1,162 @@
+"""Daily note generation (the /daily-setup workflow, done locally).
+
+``slatekore daily`` renders the daily template for a date and fills the
+sections that only need the vault, from a single catalog refresh:
+
+    Tasks Due       open tasks due on or before the date (``@due(...)``),
+                    plus unfinished tasks of the previous daily note
+    Reading Queue   notes tagged #to-read, most recently edited first
+    Open Questions  carried over from the previous daily note
+
+Tasks come from the task index (``slatekore.tasks``) and everything else
+from the catalog; only the previous daily note is read from disk. "Focus
+Today" and the other narrative sections are left for the agent.
+"""
+
+import datetime
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .frontmatter import split_frontmatter
+from .index import Catalog, refresh_catalog
+from .render import default_values, fill_section, get_template
+from .tasks import TaskIndex
+
+# Folder holding the daily notes (07-Daily/YYYY-MM-DD.md)
+DAILY_FOLDER = "07-Daily"
+
+# Reading queue entries listed in the note
+QUEUE_LIMIT = 10
+
+_TASK = re.compile(r"^\s*[-*+] \[[ xX]\] ")
+_DATE_NAME = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+def daily_path(date: datetime.date) -> str:
+    """Vault-relative path of the daily note for a date."""
+    return f"{DAILY_FOLDER}/{date.isoformat()}.md"
+
+
+def section_items(body: str, heading: str) -> List[str]:
+    """Return the non-empty list items under a ``## heading``."""
+    items = []
+    inside = False
+    for line in body.splitlines():
+        if line.startswith("#"):
+            inside = line.lstrip("#").strip().lower() == heading.lower()
+            continue
+        if inside:
+            stripped = line.strip()
+            if stripped.startswith(("- ", "* ")) and not _TASK.match(line):
+                item = stripped[2:].strip()
+                if item:
+                    items.append(item)
+    return items
+
+
+def previous_daily(catalog: Catalog, date: datetime.date) -> Optional[str]:
+    """Return the most recent daily note before ``date``, if any."""
+    today = date.isoformat()
+    latest = None
+    for rel in catalog:
+        if not rel.startswith(DAILY_FOLDER + "/"):
+            continue
+        name = rel.rsplit("/", 1)[-1][:-3]
+        if _DATE_NAME.match(name) and name < today and (latest is None or name > latest[0]):
+            latest = (name, rel)
+    return latest[1] if latest else None
+
+
+def _read(root: Path, rel: str) -> str:
+    try:
+        return (root / rel).read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return ""
+
+
+def collect_daily(root: Path, date: Optional[datetime.date] = None, queue_limit: int = QUEUE_LIMIT,
+                  catalog: Optional[Catalog] = None) -> Dict[str, Any]:
+    """Gather what the daily note for ``date`` (today by default) lists.
+
+    Returns:
+        dict with 'date', 'path', 'previous' (path of the previous daily
+        note or None), 'tasks' (task dicts, see ``slatekore.tasks``),
+        'queue' (``{path, title}`` dicts), 'queue_total' and 'questions'
+    """
+    date = date or datetime.date.today()
+    today = date.isoformat()
+    if catalog is None:
+        catalog = refresh_catalog(root)
+    index = TaskIndex.load(root)
+    index.update(catalog)
+    tasks = index.query(due=today, overdue=True, today=today)
+
+    previous = previous_daily(catalog, date)
+    questions: List[str] = []
+    if previous is not None:
+        _, body = split_frontmatter(_read(root, previous))
+        questions = section_items(body, "Open Questions")
+        listed = {(task["path"], task["line"]) for task in tasks}
+        tasks += [task for task in index.tasks_of(previous)
+                  if not task["done"] and (task["path"], task["line"]) not in listed]
+
+    queue = [(catalog.notes[rel]["mtime"], rel, catalog.notes[rel]["title"])
+             for rel in catalog.tagged("to-read")]
+    queue.sort(key=lambda q: (-q[0], q[1]))
+    return {
+        "date": today,
+        "path": daily_path(date),
+        "previous": previous,
+        "tasks": tasks,
+        "queue": [{"path": rel, "title": title} for _, rel, title in queue[:queue_limit]],
+        "queue_total": len(queue),
+        "questions": questions,
+    }
+
+
+def render_daily(root: Path, daily: Dict[str, Any]) -> str:
+    """Render the daily note text for the result of ``collect_daily``."""
+    date = datetime.date.fromisoformat(daily["date"])
+    text = get_template(root, "daily").render(default_values(date))
+
+    tasks = []
+    for task in daily["tasks"]:
+        line = f"- [ ] {task['text']}"
+        if task["path"] == daily["previous"]:
+            line += f" (from [[{Path(task['path']).stem}]])"
+        tasks.append(line)
+    queue = [f"- [[{Path(q['path']).stem}]]" + (f" - {q['title']}" if q["title"] != Path(q["path"]).stem else "")
+             for q in daily["queue"]]
+    if daily["queue_total"] > len(queue):
+        queue.append(f"- ... and {daily['queue_total'] - len(queue)} more #to-read")
+
+    text = fill_section(text, "## Tasks Due", tasks)
+    text = fill_section(text, "## Reading Queue", queue)
+    return fill_section(text, "## Open Questions", [f"- {q}" for q in daily["questions"]])
+
+
+def create_daily(root: Path, date: Optional[datetime.date] = None, force: bool = False,
+                 dry_run: bool = False, queue_limit: int = QUEUE_LIMIT) -> Dict[str, Any]:
+    """Create the daily note for ``date`` (today by default).
+
+    Returns:
+        The ``collect_daily`` result, plus the note 'text' and 'created'
+        (False with ``dry_run``)
+
+    Raises:
+        FileExistsError: if the note exists and ``force`` is not set
+    """
+    catalog = refresh_catalog(root)
+    daily = collect_daily(root, date, queue_limit, catalog)
+    target = root / daily["path"]
+    if target.exists() and not force and not dry_run:
+        raise FileExistsError(f"{daily['path']} already exists (use --force to overwrite)")
+    daily["text"] = render_daily(root, daily)
+    daily["created"] = False
+    if not dry_run:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(daily["text"], encoding="utf-8")
+        catalog.update_paths([daily["path"]])
+        daily["created"] = True
+    return daily
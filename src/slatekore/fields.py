@@ -0,0 +1,623 @@
+"""Frontmatter queries over columnar field arrays.
+
+    type=paper year>=2022 citations>100 sort:-citations limit:20
+
+Terms (all of them must hold):
+
+    field=value  field!=value   equal / different (case-insensitive for text)
+    field>value  >=  <  <=      numbers compare as numbers, text (and
+                                YYYY-MM-DD dates) alphabetically
+    field~text                  case-insensitive substring
+    has:field                   the note sets the field
+    sort:field  sort:-field     order (default: path); missing values last
+    limit:N                     at most N notes
+    fields:a,b                  extra output columns
+
+Quote values with spaces (``title~"attention is"``). Any other words form
+a tag expression (see ``slatekore.tags``), so ``type=paper #to-read
+!#archived`` works too. Notes lacking a field never match a term on it.
+A number-like value is compared as text when no note holds the field as a
+number that matches, so ``arxiv_id=2503.00099`` finds the string id.
+
+``.slatekore/fields.bin`` holds each frontmatter field (plus the note
+``type`` and ``title``) as columns: numbers as float64 (NaN when missing)
+and everything else dictionary-encoded as int32 codes into the field's
+sorted list of values (-1 when missing), so comparing text is comparing
+codes. The common fields in ``INDEXED_FIELDS`` also get a secondary
+index, their note ids ordered by value, which turns an equality or range
+term into two bisects and a slice.
+
+The planner evaluates indexed terms and the tag expression first, most
+selective first, intersecting them as bitmaps. The remaining terms are
+checked note by note when few candidates are left, or by a vectorized scan
+of the whole column otherwise (NumPy when installed, plain loops when
+not). The index is rebuilt from the catalog, without reading any note,
+whenever the catalog changed.
+"""
+
+import bisect
+import hashlib
+import json
+import math
+import re
+import struct
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+from .index import Catalog, refresh_catalog
+from .tags import bits_to_ids, ids_to_bits, load_tags, parse_tag_query, popcount
+from .vault import atomic_write_bytes, state_path, watcher_running
+
+FIELDS_FILE = "fields.bin"
+FIELDS_MAGIC = b"SKFIELD1"
+
+# Fields with a secondary index (note ids sorted by value)
+INDEXED_FIELDS = ("type", "year", "citations", "venue", "source", "created")
+
+# Frontmatter keys not stored as columns (tags have their own index)
+SKIPPED_FIELDS = {"tags"}
+
+# Check remaining terms note by note below size / SCAN_FRACTION candidates
+SCAN_FRACTION = 16
+
+_TERM = re.compile(r"^([A-Za-z_][\w.-]*)(>=|<=|!=|=|>|<|~)(.*)$", re.S)
+_DIRECTIVE = re.compile(r"^(sort|limit|fields|has):(.*)$", re.S)
+_WORD = re.compile(r'(?:[^\s"]|"[^"]*")+')
+_NUMBER = re.compile(r"^[-+]?\d+(\.\d+)?$")
+
+# Terms matching more disjoint intervals (scattered text codes) use a lookup table
+MAX_INTERVALS = 8
+
+# An interval of column keys: (low, low inclusive, high, high inclusive)
+Interval = Tuple[float, bool, float, bool]
+
+
+def parse_query(expr: str) -> Dict[str, Any]:
+    """Split a query into field 'terms' (``(field, op, value)``), 'has'
+    fields, the 'tags' expression ('' if none), 'sort' (``(field,
+    descending)`` or None), 'limit' and extra output 'fields'.
+
+    Raises:
+        ValueError: if a term or directive is malformed
+    """
+    query: Dict[str, Any] = {"terms": [], "has": [], "tags": "", "sort": None, "limit": None, "fields": []}
+    rest = []
+    for word in _WORD.findall(expr):
+        directive = _DIRECTIVE.match(word)
+        term = _TERM.match(word) if directive is None else None
+        if directive:
+            name, value = directive.group(1), directive.group(2).strip('"')
+            if not value:
+                raise ValueError(f"{word!r} needs a value")
+            if name == "sort":
+                query["sort"] = (value.lstrip("-+"), value.startswith("-"))
+            elif name == "limit":
+                if not value.isdigit():
+                    raise ValueError(f"{word!r}: limit must be a number")
+                query["limit"] = int(value)
+            elif name == "fields":
+                query["fields"] += [f for f in value.split(",") if f]
+            else:
+                query["has"].append(value)
+        elif term:
+            field, op, value = term.groups()
+            value = value.strip('"')
+            if not value and op != "~":
+                raise ValueError(f"{word!r} needs a value")
+            query["terms"].append((field, op, value))
+        else:
+            rest.append(word)
+    query["tags"] = " ".join(rest)
+    if query["tags"]:
+        parse_tag_query(query["tags"])
+    return query
+
+
+def is_field_query(expr: str) -> bool:
+    """Whether a query uses field terms or directives (not just tags)."""
+    query = parse_query(expr)
+    return bool(query["terms"] or query["has"] or query["sort"] or query["fields"] or query["limit"] is not None)
+
+
+def _cell(value: Any) -> Optional[Any]:
+    """Column value of a frontmatter value: a float, a string or None."""
+    if value is None or isinstance(value, dict):
+        return None
+    if isinstance(value, bool):
+        return str(value).lower()
+    if isinstance(value, (int, float)):
+        return None if math.isnan(value) else float(value)
+    if isinstance(value, list):
+        value = ", ".join(str(v) for v in value if v is not None)
+    return str(value).replace("\n", " ")
+
+
+def _display(value: float) -> Any:
+    return int(value) if value.is_integer() else value
+
+
+def catalog_digest(catalog: Catalog) -> str:
+    """Fingerprint of the catalog's paths and content hashes."""
+    digest = hashlib.sha1()
+    for path in sorted(catalog.notes):
+        digest.update(f"{path}\0{catalog.notes[path]['hash']}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class FieldIndex:
+    """Columnar frontmatter of every note, with secondary indexes.
+
+    Note ids are positions in ``paths`` (sorted, so id order is path
+    order). ``fields`` maps each field to where its columns live in the
+    blob: 'num' (float64), 'str' (int32 codes) and 'dict' (the sorted
+    values the codes point into), and for indexed fields 'num_index' and
+    'str_index' (keys sorted ascending, then the matching uint32 ids).
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.size = 0
+        self.digest = ""
+        self.fields: Dict[str, Dict[str, list]] = {}
+        self._blob = b""
+        self._raw_paths = b""
+        self._paths: Optional[List[str]] = None
+        self._ids: Optional[Dict[str, int]] = None
+        self._cache: Dict[Tuple[str, str], Any] = {}
+
+    @property
+    def path(self) -> Path:
+        return state_path(self.root, FIELDS_FILE)
+
+    @classmethod
+    def load(cls, root: Path) -> "FieldIndex":
+        """Load a vault's field index (empty if none has been built yet)."""
+        index = cls(root)
+        try:
+            data = index.path.read_bytes()
+        except OSError:
+            return index
+        if not data.startswith(FIELDS_MAGIC):
+            return index
+        pos = len(FIELDS_MAGIC)
+        lengths = struct.unpack_from("<3Q", data, pos)
+        pos += 24
+        directory = json.loads(data[pos:pos + lengths[0]])
+        pos += lengths[0]
+        index._raw_paths = data[pos:pos + lengths[1]]
+        index._blob = data[pos + lengths[1]:pos + lengths[1] + lengths[2]]
+        index.size, index.digest, index.fields = directory["size"], directory["digest"], directory["fields"]
+        return index
+
+    def save(self):
+        """Persist the index atomically."""
+        state_path(self.root, FIELDS_FILE, create=True)
+        directory = json.dumps({"size": self.size, "digest": self.digest, "fields": self.fields},
+                               separators=(",", ":")).encode("utf-8")
+        paths = "\n".join(self.paths).encode("utf-8")
+        parts = [FIELDS_MAGIC, struct.pack("<3Q", len(directory), len(paths), len(self._blob)),
+                 directory, paths, self._blob]
+        atomic_write_bytes(self.path, b"".join(parts))
+
+    @property
+    def paths(self) -> List[str]:
+        if self._paths is None:
+            self._paths = self._raw_paths.decode("utf-8").split("\n") if self.size else []
+        return self._paths
+
+    def id_of(self, path: str) -> Optional[int]:
+        if self._ids is None:
+            self._ids = {p: i for i, p in enumerate(self.paths)}
+        return self._ids.get(path)
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def update(self, catalog: Catalog) -> Dict[str, int]:
+        """Rebuild the columns if the catalog changed since the last build.
+
+        Returns:
+            dict with the number of 'notes' and 'fields' indexed (zeros
+            when the index was already current)
+        """
+        digest = catalog_digest(catalog)
+        if digest == self.digest and self.path.exists():
+            return {"notes": 0, "fields": 0}
+        self.build(catalog)
+        self.digest = digest
+        self.save()
+        return {"notes": self.size, "fields": len(self.fields)}
+
+    def build(self, catalog: Catalog):
+        """Build every column and secondary index from catalog records."""
+        paths = sorted(catalog.notes)
+        numbers: Dict[str, Dict[int, float]] = {}
+        texts: Dict[str, Dict[int, str]] = {}
+        for i, path in enumerate(paths):
+            record = catalog.notes[path]
+            row = dict(record["frontmatter"])
+            row["type"], row["title"] = record["type"], record["title"]
+            for field, value in row.items():
+                if field in SKIPPED_FIELDS:
+                    continue
+                value = _cell(value)
+                if isinstance(value, float):
+                    numbers.setdefault(field, {})[i] = value
+                elif value is not None:
+                    texts.setdefault(field, {})[i] = value
+
+        size = len(paths)
+        blob = bytearray()
+
+        def put(data: bytes) -> List[int]:
+            offset = len(blob)
+            blob.extend(data)
+            return [offset, len(data)]
+
+        def put_index(keys: array, ids: array) -> List[int]:
+            return put(keys.tobytes()) + put(ids.tobytes())
+
+        fields: Dict[str, Dict[str, list]] = {}
+        for field, values in numbers.items():
+            column = array("d", [math.nan]) * size
+            for i, value in values.items():
+                column[i] = value
+            entry = fields.setdefault(field, {})
+            entry["num"] = put(column.tobytes())
+            if field in INDEXED_FIELDS:
+                ordered = sorted(values, key=values.__getitem__)
+                entry["num_index"] = put_index(array("d", (values[i] for i in ordered)), array("I", ordered))
+        for field, values in texts.items():
+            dictionary = sorted(set(values.values()), key=lambda s: (s.casefold(), s))
+            codes = {value: code for code, value in enumerate(dictionary)}
+            column = array("i", [-1]) * size
+            for i, value in values.items():
+                column[i] = codes[value]
+            entry = fields.setdefault(field, {})
+            entry["str"] = put(column.tobytes())
+            entry["dict"] = put("\n".join(dictionary).encode("utf-8"))
+            if field in INDEXED_FIELDS:
+                ordered = sorted(values, key=lambda i: column[i])
+                entry["str_index"] = put_index(array("i", (column[i] for i in ordered)), array("I", ordered))
+
+        self.size, self.fields, self._blob = size, fields, bytes(blob)
+        self._paths, self._ids, self._cache = paths, None, {}
+
+    # ------------------------------------------------------------------
+    # Columns
+    # ------------------------------------------------------------------
+
+    def _array(self, typecode: str, offset: int, length: int):
+        if np is not None:
+            dtype = np.dtype({"d": np.float64, "i": np.int32, "I": np.uint32}[typecode])
+            return np.frombuffer(self._blob, dtype=dtype, count=length // dtype.itemsize, offset=offset)
+        values = array(typecode)
+        values.frombytes(self._blob[offset:offset + length])
+        return values
+
+    def column(self, field: str, kind: str):
+        """Return a field's 'num' or 'str' column (None if it has none)."""
+        key = (field, kind)
+        if key not in self._cache:
+            where = self.fields.get(field, {}).get(kind)
+            self._cache[key] = None if where is None else self._array("d" if kind == "num" else "i", *where)
+        return self._cache[key]
+
+    def dictionary(self, field: str) -> List[str]:
+        """Return the sorted text values of a field."""
+        key = (field, "dict")
+        if key not in self._cache:
+            where = self.fields.get(field, {}).get("dict")
+            data = self._blob[where[0]:where[0] + where[1]].decode("utf-8") if where else ""
+            self._cache[key] = data.split("\n") if where else []
+        return self._cache[key]
+
+    def _folded(self, field: str) -> List[str]:
+        key = (field, "folded")
+        if key not in self._cache:
+            self._cache[key] = [value.casefold() for value in self.dictionary(field)]
+        return self._cache[key]
+
+    def _secondary(self, field: str, kind: str):
+        key = (field, kind + "_index")
+        if key not in self._cache:
+            where = self.fields.get(field, {}).get(kind + "_index")
+            if where is None:
+                self._cache[key] = None
+            else:
+                keys = self._array("d" if kind == "num" else "i", where[0], where[1])
+                self._cache[key] = (keys, self._array("I", where[2], where[3]))
+        return self._cache[key]
+
+    def value(self, field: str, i: int) -> Any:
+        """Return note ``i``'s value of a field (None if missing)."""
+        numbers = self.column(field, "num")
+        if numbers is not None and not math.isnan(numbers[i]):
+            return _display(float(numbers[i]))
+        codes = self.column(field, "str")
+        if codes is not None and codes[i] >= 0:
+            return self.dictionary(field)[codes[i]]
+        return None
+
+    # ------------------------------------------------------------------
+    # Terms
+    # ------------------------------------------------------------------
+
+    def intervals(self, field: str, op: str, value: str, text: bool = False) -> Tuple[str, List[Interval]]:
+        """Translate a term into the column it reads and the key intervals
+        that match it; ``text`` compares a number-like value as text."""
+        inf = math.inf
+        if not text and op != "~" and _NUMBER.match(value):
+            v = float(value)
+            return "num", {
+                "=": [(v, True, v, True)],
+                "!=": [(-inf, True, v, False), (v, False, inf, True)],
+                ">": [(v, False, inf, True)],
+                ">=": [(v, True, inf, True)],
+                "<": [(-inf, True, v, False)],
+                "<=": [(-inf, True, v, True)],
+            }[op]
+        folded = self._folded(field)
+        needle = value.casefold()
+        if op == "~":
+            ranges: List[List[int]] = []
+            for code, text in enumerate(folded):
+                if needle in text:
+                    if ranges and ranges[-1][1] == code - 1:
+                        ranges[-1][1] = code
+                    else:
+                        ranges.append([code, code])
+            return "str", [(lo, True, hi, True) for lo, hi in ranges]
+        lo, hi = bisect.bisect_left(folded, needle), bisect.bisect_right(folded, needle)
+        top = len(folded)
+        ranges = {
+            "=": [(lo, hi)],
+            "!=": [(0, lo), (hi, top)],
+            ">": [(hi, top)],
+            ">=": [(lo, top)],
+            "<": [(0, lo)],
+            "<=": [(0, hi)],
+        }[op]
+        return "str", [(a, True, b - 1, True) for a, b in ranges if a < b]
+
+    def _lookup(self, field: str, kind: str, intervals: List[Interval]) -> Optional[List[Tuple[int, int]]]:
+        """Slices of a secondary index matching some intervals (None if the
+        field has no index)."""
+        index = self._secondary(field, kind)
+        if index is None:
+            return None
+        keys, ids = index
+        slices = []
+        for lo, lo_inclusive, hi, hi_inclusive in intervals:
+            if np is not None:
+                start = int(np.searchsorted(keys, lo, "left" if lo_inclusive else "right"))
+                end = int(np.searchsorted(keys, hi, "right" if hi_inclusive else "left"))
+            else:
+                start = (bisect.bisect_left if lo_inclusive else bisect.bisect_right)(keys, lo)
+                end = (bisect.bisect_right if hi_inclusive else bisect.bisect_left)(keys, hi)
+            if start < end:
+                slices.append((start, end))
+        return slices
+
+    def _index_bits(self, field: str, kind: str, slices: List[Tuple[int, int]]) -> int:
+        _, ids = self._secondary(field, kind)
+        if np is not None:
+            mask = np.zeros(self.size, dtype=bool)
+            for start, end in slices:
+                mask[ids[start:end]] = True
+            return _mask_bits(mask)
+        return ids_to_bits((i for start, end in slices for i in ids[start:end]), self.size)
+
+    def _scan_bits(self, column, intervals: List[Interval]) -> int:
+        """Vectorized scan of a whole column."""
+        if len(intervals) > MAX_INTERVALS:
+            # Many scattered codes (a ~ term): look them up in a table
+            if np is not None:
+                table = np.zeros(int(column.max()) + 2, dtype=bool)
+                for lo, _, hi, _ in intervals:
+                    table[int(lo):int(hi) + 1] = True
+                return _mask_bits(table[column])
+            codes = _code_set(intervals)
+            return ids_to_bits((i for i, x in enumerate(column) if x in codes), self.size)
+        if np is not None:
+            mask = np.zeros(self.size, dtype=bool)
+            for lo, lo_inclusive, hi, hi_inclusive in intervals:
+                low = column >= lo if lo_inclusive else column > lo
+                high = column <= hi if hi_inclusive else column < hi
+                mask |= low & high
+            return _mask_bits(mask)
+        return ids_to_bits((i for i, x in enumerate(column) if _within(x, intervals)), self.size)
+
+    def _filter_bits(self, column, intervals: List[Interval], candidates: int) -> int:
+        """Check a few candidate notes one by one."""
+        if len(intervals) > MAX_INTERVALS:
+            codes = _code_set(intervals)
+            return ids_to_bits((i for i in bits_to_ids(candidates) if column[i] in codes), self.size)
+        return ids_to_bits((i for i in bits_to_ids(candidates) if _within(column[i], intervals)), self.size)
+
+    # ------------------------------------------------------------------
+    # Planning
+    # ------------------------------------------------------------------
+
+    def execute(self, query: Dict[str, Any], tag_bits: Optional[int] = None) -> Tuple[int, List[Dict[str, Any]]]:
+        """Run a parsed query (see ``parse_query``).
+
+        Args:
+            query: Parsed query
+            tag_bits: Notes matching its tag expression, as a bitmap of
+                this index's ids (None when there is none)
+
+        Returns:
+            the bitmap of matching notes and the executed plan, one
+            ``{step, term, notes}`` dict per step ('tags', 'index', 'scan'
+            or 'filter'), where 'notes' is the candidate count after it
+        """
+        everything = (1 << self.size) - 1
+        # (estimated notes, step, term, bitmap or index slices)
+        selective: List[Tuple[int, str, str, Any]] = []
+        # (term, [(column, intervals)]): a note matches if any column does
+        residual: List[Tuple[str, List[Tuple[Any, List[Interval]]]]] = []
+        if tag_bits is not None:
+            selective.append((popcount(tag_bits), "tags", query["tags"], tag_bits))
+        for field, op, value in query["terms"]:
+            term = f"{field}{op}{value}"
+            kind, intervals = self.intervals(field, op, value)
+            column = self.column(field, kind)
+            slices = None if column is None else self._lookup(field, kind, intervals)
+            scanned = None
+            if kind == "num" and column is not None and slices is None and self.column(field, "str") is not None:
+                # Mixed column: only a scan tells whether any number matches
+                scanned = self._scan_bits(column, intervals)
+            if kind == "num" and (column is None or slices == [] or scanned == 0):
+                # Number-like text such as arXiv ids (2503.00099) stays a string
+                kind, intervals = self.intervals(field, op, value, text=True)
+                column = self.column(field, kind)
+                slices = None if column is None else self._lookup(field, kind, intervals)
+                scanned = None
+            if column is None or not intervals:
+                return 0, [{"step": "index", "term": term, "notes": 0}]
+            if scanned is not None:
+                selective.append((popcount(scanned), "scan", term, scanned))
+            elif slices is None:
+                residual.append((term, [(column, intervals)]))
+            else:
+                estimate = sum(end - start for start, end in slices)
+                selective.append((estimate, "index", term, (field, kind, slices)))
+        for field in query["has"]:
+            specs = []
+            if self.column(field, "num") is not None:
+                specs.append((self.column(field, "num"), [(-math.inf, True, math.inf, True)]))
+            if self.column(field, "str") is not None:
+                specs.append((self.column(field, "str"), [(0, True, math.inf, True)]))
+            if not specs:
+                return 0, [{"step": "index", "term": f"has:{field}", "notes": 0}]
+            residual.append((f"has:{field}", specs))
+
+        plan = []
+        bits = everything
+        for _, step, term, payload in sorted(selective, key=lambda s: s[0]):
+            bits &= payload if step != "index" else self._index_bits(*payload)
+            plan.append({"step": step, "term": term, "notes": popcount(bits)})
+            if not bits:
+                return 0, plan
+        for term, specs in residual:
+            if bits != everything and popcount(bits) * SCAN_FRACTION < self.size:
+                step = "filter"
+                matched = 0
+                for column, intervals in specs:
+                    matched |= self._filter_bits(column, intervals, bits)
+            else:
+                step = "scan"
+                matched = 0
+                for column, intervals in specs:
+                    matched |= self._scan_bits(column, intervals)
+            bits &= matched
+            plan.append({"step": step, "term": term, "notes": popcount(bits)})
+            if not bits:
+                break
+        return bits, plan
+
+    def order(self, ids: List[int], field: str, descending: bool) -> List[int]:
+        """Sort note ids by a field; notes without it come last, by path."""
+        numbers = self.column(field, "num")
+        column = numbers if numbers is not None else self.column(field, "str")
+        if column is None:
+            return ids
+        if np is not None:
+            ids = np.asarray(ids, dtype=np.int64)
+            values = column[ids]
+            present = ~np.isnan(values) if column is numbers else values >= 0
+            ranked = np.argsort(-values[present] if descending else values[present], kind="stable")
+            return ids[present][ranked].tolist() + ids[~present].tolist()
+        if column is numbers:
+            present = [i for i in ids if not math.isnan(column[i])]
+        else:
+            present = [i for i in ids if column[i] >= 0]
+        chosen = set(present)
+        present.sort(key=column.__getitem__, reverse=descending)
+        return present + [i for i in ids if i not in chosen]
+
+
+def _within(x, intervals: List[Interval]) -> bool:
+    for lo, lo_inclusive, hi, hi_inclusive in intervals:
+        if (x >= lo if lo_inclusive else x > lo) and (x <= hi if hi_inclusive else x < hi):
+            return True
+    return False
+
+
+def _code_set(intervals: List[Interval]) -> set:
+    return {code for lo, _, hi, _ in intervals for code in range(int(lo), int(hi) + 1)}
+
+
+def _mask_bits(mask) -> int:
+    return int.from_bytes(np.packbits(mask, bitorder="little").tobytes(), "little")
+
+
+def load_fields(root: Path) -> FieldIndex:
+    """Return a vault's field index, brought up to date with the vault.
+
+    While ``slatekore watch`` keeps the index current it is loaded as is,
+    without touching the catalog.
+    """
+    index = FieldIndex.load(root)
+    if watcher_running(root) and index.path.exists():
+        return index
+    index.update(refresh_catalog(root))
+    return index
+
+
+def query_notes(root: Path, expr: str, limit: Optional[int] = None, stats: bool = False) -> Dict[str, Any]:
+    """Run a frontmatter query.
+
+    Args:
+        root: Vault root
+        expr: Query (see the module docstring)
+        limit: Maximum number of notes (a ``limit:`` term takes precedence)
+        stats: Also count the tags co-occurring in the result
+
+    Returns:
+        dict with the 'query', the matching 'count', the output 'columns',
+        the 'notes' (one dict per note, keyed by column), the executed
+        'plan', the co-occurring 'tags' with ``stats``, and the query time
+        in 'ms' (index loading excluded)
+
+    Raises:
+        ValueError: if the query is malformed
+    """
+    query = parse_query(expr)
+    index = load_fields(root)
+    tags = load_tags(root) if query["tags"] or stats else None
+    start = time.perf_counter()
+    tag_bits = None
+    if query["tags"]:
+        # Tag ids to field ids (both indexes follow the same catalog)
+        tag_ids = (index.id_of(tags.paths[i]) for i in bits_to_ids(tags.evaluate(query["tags"])))
+        tag_bits = ids_to_bits((i for i in tag_ids if i is not None), index.size)
+    bits, plan = index.execute(query, tag_bits)
+    ids = bits_to_ids(bits)
+    if query["sort"]:
+        ids = index.order(ids, *query["sort"])
+    limit = query["limit"] if query["limit"] is not None else limit
+    elapsed = time.perf_counter() - start
+
+    columns = ["path", "title"]
+    for field in [term[0] for term in query["terms"]] + query["has"] + \
+            ([query["sort"][0]] if query["sort"] else []) + query["fields"]:
+        if field not in columns:
+            columns.append(field)
+    shown = ids[:limit] if limit is not None else ids
+    notes = [{"path": index.paths[i], **{c: index.value(c, i) for c in columns[1:]}} for i in shown]
+    result: Dict[str, Any] = {"query": expr, "count": len(ids), "columns": columns, "notes": notes, "plan": plan}
+    if stats:
+        tag_ids = (tags.id_of(index.paths[i]) for i in ids)
+        result["tags"] = tags.cooccurrence(ids_to_bits((i for i in tag_ids if i is not None), tags.size), limit=20)
+    result["ms"] = round(elapsed * 1000, 3)
+    return result
@@ -0,0 +1,109 @@
+"""Run init, upgrade or check over many vaults at once.
+
+A fleet is a list of vault directories, e.g. one per researcher on a
+shared filesystem. ``run_fleet`` processes them on a bounded pool of
+threads (the work is file I/O and hashing, which release the GIL) and
+collects one result per vault; a vault that fails does not stop the
+others.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Vaults processed at once (override with SLATEKORE_FLEET_WORKERS)
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+ACTIONS = ("init", "upgrade", "check")
+
+
+def default_workers() -> int:
+    """Return the fleet pool size, honouring ``SLATEKORE_FLEET_WORKERS``."""
+    try:
+        return max(1, int(os.environ["SLATEKORE_FLEET_WORKERS"]))
+    except (KeyError, ValueError):
+        return DEFAULT_WORKERS
+
+
+def read_vault_list(text: str, base: Path) -> List[Path]:
+    """Parse a vault list: one directory per line, ``#`` lines are comments.
+
+    Relative paths are resolved against ``base`` (the list's directory);
+    duplicates are dropped.
+    """
+    vaults = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        path = Path(line).expanduser()
+        vaults.append((path if path.is_absolute() else base / path).resolve())
+    return list(dict.fromkeys(vaults))
+
+
+def _run_one(action: str, vault: Path, options: Dict[str, Any]) -> Dict[str, Any]:
+    start = time.perf_counter()
+    try:
+        if action == "init":
+            from .init import initialize_vault
+            result = initialize_vault(vault, force=options.get("force", False), dry_run=options.get("dry_run", False))
+            ok = True
+        elif action == "upgrade":
+            from .upgrade import upgrade_vault
+            if not vault.is_dir():
+                raise FileNotFoundError(f"{vault} is not a directory")
+            result = upgrade_vault(vault, dry_run=options.get("dry_run", False), force=options.get("force", False))
+            ok = not result["conflicts"]
+        else:
+            from .check import check_vault
+            result = check_vault(vault)
+            ok = result["ok"]
+    except Exception as e:
+        return {"vault": str(vault), "ok": False, "error": f"{type(e).__name__}: {e}",
+                "ms": round((time.perf_counter() - start) * 1000, 2)}
+    return {"vault": str(vault), "ok": ok, "result": result,
+            "ms": round((time.perf_counter() - start) * 1000, 2)}
+
+
+def run_fleet(action: str, vaults: List[Path], workers: Optional[int] = None,
+              progress: Optional[Callable[[Dict[str, Any]], None]] = None, **options) -> Dict[str, Any]:
+    """Run ``action`` ('init', 'upgrade' or 'check') on every vault.
+
+    Args:
+        action: One of ``ACTIONS``
+        vaults: Vault directories
+        workers: Vaults processed at once (default: ``default_workers()``)
+        progress: Called with each vault's result as it finishes
+        **options: ``force`` and ``dry_run`` for init and upgrade
+
+    Returns:
+        dict with the 'action', counts of 'vaults', 'ok' and 'failed', the
+        elapsed 'seconds' and the per-vault 'results' (in input order),
+        each with the 'vault', whether it is 'ok', its 'ms' and either the
+        action's 'result' or an 'error'
+
+    Raises:
+        ValueError: for an unknown action
+    """
+    if action not in ACTIONS:
+        raise ValueError(f"unknown fleet action {action!r} (choose from {', '.join(ACTIONS)})")
+    start = time.perf_counter()
+    results: Dict[Path, Dict[str, Any]] = {}
+    with ThreadPoolExecutor(max_workers=min(workers or default_workers(), max(len(vaults), 1))) as pool:
+        futures = {pool.submit(_run_one, action, vault, options): vault for vault in vaults}
+        for future in as_completed(futures):
+            result = results[futures[future]] = future.result()
+            if progress:
+                progress(result)
+    ordered = [results[vault] for vault in vaults]
+    ok = sum(1 for r in ordered if r["ok"])
+    return {
+        "action": action,
+        "vaults": len(ordered),
+        "ok": ok,
+        "failed": len(ordered) - ok,
+        "seconds": round(time.perf_counter() - start, 3),
+        "results": ordered,
+    }
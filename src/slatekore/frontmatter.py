@@ -0,0 +1,284 @@
+"""Frontmatter and inline metadata parsing for Slatekore notes.
+
+The templates in ``init.py`` only emit a small, flat subset of YAML
+(``key: value`` scalars and ``[a, b]`` inline lists), so this parser
+handles exactly that subset without depending on a YAML library.
+
+For vault-wide questions that only need frontmatter ("all notes tagged
+#to-read", "all papers from 2023"), ``scan_frontmatter`` reads just the
+header bytes of each note, stopping at the closing fence, and returns
+compact ``NoteMeta`` records instead of dicts. It needs no ``.slatekore``
+state, so it suits scripts and one-off scans; the commands answer the same
+questions from the catalog, whose records already hold the parsed
+frontmatter (and need the body for links and inline tags anyway). The
+``frontmatter-scan`` benchmark times it against ``index-cold``.
+"""
+
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .scanner import scan_vault
+from .vault import note_name, note_type
+
+FENCE = "---"
+
+# Header reads are issued in blocks of this size; a header is abandoned
+# (treated as missing) once it grows past HEADER_LIMIT bytes
+HEADER_CHUNK = 4096
+HEADER_LIMIT = 64 * 1024
+
+# Obsidian inline tag: '#' at line start or after whitespace, not a heading.
+# The pattern starts with a literal so the regex engine can skip ahead to
+# each '#'; the preceding character is checked in ``extract_tags``.
+_INLINE_TAG = re.compile(r"#([A-Za-z_][\w/-]*)")
+_HEADING = re.compile(r"^#\s+(.+?)\s*$", re.MULTILINE)
+# [[target]], [[target#heading]], [[target|alias]] and ![[embeds]]
+_WIKILINK = re.compile(r"\[\[([^\[\]|#^]+)(?:[#^][^\[\]|]*)?(?:\|[^\[\]]*)?\]\]")
+# Plain integers only: decimals such as arXiv ids (2301.00001) stay strings
+_INTEGER = re.compile(r"^-?(0|[1-9]\d*)$")
+# Headings and whole-line *italic* prompts: the scaffolding every note
+# rendered from a template shares, dropped before comparing note texts
+SCAFFOLD_LINE = re.compile(r"^\s*(#{1,6}\s.*|\*[^*]+\*)\s*$", re.MULTILINE)
+
+
+def split_frontmatter(text: str) -> Tuple[Dict[str, Any], str]:
+    """Split a note into its parsed frontmatter and its body.
+
+    Args:
+        text: Full note content
+
+    Returns:
+        (frontmatter dict, body text). Notes without a frontmatter block
+        return an empty dict and the full text.
+    """
+    if not text.startswith(FENCE):
+        return {}, text
+    first_nl = text.find("\n")
+    if first_nl < 0 or text[:first_nl].strip() != FENCE:
+        return {}, text
+    end = text.find("\n" + FENCE, first_nl)
+    if end < 0:
+        return {}, text
+    header = text[first_nl + 1:end]
+    body_start = text.find("\n", end + 1 + len(FENCE))
+    body = text[body_start + 1:] if body_start >= 0 else ""
+    return parse_header(header), body
+
+
+def parse_header(header: str) -> Dict[str, Any]:
+    """Parse the lines between the ``---`` fences into a dict."""
+    fields: Dict[str, Any] = {}
+    block_lists = set()
+    list_key = None
+    for raw in header.splitlines():
+        line = raw.rstrip()
+        if not line.strip():
+            continue
+        stripped = line.lstrip()
+        if list_key is not None and stripped.startswith("- "):
+            fields[list_key].append(_scalar(stripped[2:].strip()))
+            continue
+        key, sep, value = line.partition(":")
+        if not sep or line[0] in " \t":
+            continue
+        key = key.strip()
+        value = value.strip()
+        list_key = None
+        if not value:
+            # Either an empty field or the start of a block list
+            fields[key] = []
+            block_lists.add(key)
+            list_key = key
+            continue
+        fields[key] = _value(value)
+    for key in block_lists:
+        if not fields[key]:
+            fields[key] = None
+    return fields
+
+
+def _value(value: str) -> Any:
+    """Parse a single frontmatter value."""
+    if value.startswith("[") and value.endswith("]"):
+        inner = value[1:-1].strip()
+        if not inner:
+            return []
+        return [_scalar(item.strip()) for item in inner.split(",") if item.strip()]
+    return _scalar(value)
+
+
+def _scalar(value: str) -> Any:
+    """Parse a scalar: strip quotes and convert plain integers."""
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    if _INTEGER.match(value):
+        return int(value)
+    return value
+
+
+def format_value(value: Any) -> str:
+    """Format a value for a frontmatter line, so ``parse_header`` reads it back."""
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        # Inline lists are split on commas, so items cannot contain any
+        return "[" + ", ".join(_format_scalar(str(v).replace(",", " ")) for v in value) + "]"
+    return _format_scalar(value)
+
+
+def _format_scalar(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    text = " ".join(str(value).split())
+    if text and (text[0] in "[{\"'#&*!|>%@`" or ": " in text or " #" in text or text.endswith(":")
+                 or _INTEGER.match(text)):
+        return '"' + text.replace('"', "'") + '"'
+    return text
+
+
+def normalize_tag(tag: Any) -> str:
+    """Normalize a tag to its lowercase name without the leading '#'."""
+    return str(tag).strip().lstrip("#").lower()
+
+
+def extract_tags(frontmatter: Dict[str, Any], body: str) -> List[str]:
+    """Collect frontmatter tags and inline ``#tags`` from the body.
+
+    Returns:
+        Sorted list of unique, normalized tag names
+    """
+    tags = set()
+    declared = frontmatter.get("tags")
+    if isinstance(declared, str):
+        declared = declared.replace(",", " ").split()
+    if isinstance(declared, list):
+        tags.update(normalize_tag(t) for t in declared if t is not None)
+    if "#" in body:
+        for match in _INLINE_TAG.finditer(body):
+            start = match.start()
+            if start == 0 or body[start - 1].isspace():
+                tags.add(normalize_tag(match.group(1)))
+    tags.discard("")
+    return sorted(tags)
+
+
+def extract_links(body: str) -> List[str]:
+    """Return the distinct wikilink targets of a note, in order of appearance."""
+    links = {}
+    for target in _WIKILINK.findall(body):
+        target = target.strip()
+        if target and "{{" not in target:
+            links[target] = None
+    return list(links)
+
+
+def extract_title(frontmatter: Dict[str, Any], body: str, fallback: str) -> str:
+    """Return the note title: frontmatter title, first H1, then file name."""
+    title = frontmatter.get("title")
+    if isinstance(title, str) and title and "{{" not in title:
+        return title
+    match = _HEADING.search(body)
+    if match and "{{" not in match.group(1):
+        return match.group(1)
+    return fallback
+
+
+def read_header(path: str) -> Optional[str]:
+    """Read only the frontmatter block of a note, without loading its body.
+
+    Returns:
+        The text between the ``---`` fences, or None if the note has no
+        (complete) frontmatter block
+    """
+    with open(path, "rb", buffering=0) as fh:
+        data = fh.read(HEADER_CHUNK)
+        if not data.startswith(b"---"):
+            return None
+        while True:
+            first_nl = data.find(b"\n")
+            if first_nl >= 0:
+                if data[:first_nl].strip() != b"---":
+                    return None
+                end = data.find(b"\n---", first_nl)
+                if end >= 0:
+                    return data[first_nl + 1:end].decode("utf-8", errors="replace")
+            if len(data) >= HEADER_LIMIT:
+                return None
+            more = fh.read(HEADER_CHUNK)
+            if not more:
+                return None
+            data += more
+
+
+# Notes created from the same template share one key tuple
+_KEY_TUPLES: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+class NoteMeta:
+    """Frontmatter of one note, stored without a per-note dict.
+
+    Field names live in a key tuple shared by every note with the same
+    frontmatter layout; values are kept in a parallel tuple (list values
+    become tuples).
+    """
+
+    __slots__ = ("path", "type", "title", "tags", "keys", "values")
+
+    def __init__(self, path: str, fields: Dict[str, Any]):
+        keys = tuple(fields)
+        self.path = path
+        self.keys = _KEY_TUPLES.setdefault(keys, keys)
+        self.values = tuple(tuple(v) if isinstance(v, list) else v for v in fields.values())
+        self.type = sys.intern(note_type(path, fields))
+        title = fields.get("title")
+        self.title = title if isinstance(title, str) and title and "{{" not in title else note_name(path)
+        self.tags = tuple(sys.intern(t) for t in extract_tags(fields, ""))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self.values[self.keys.index(key)]
+        except ValueError:
+            return default
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self.values[self.keys.index(key)]
+        except ValueError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.keys
+
+    def fields(self) -> Dict[str, Any]:
+        return dict(zip(self.keys, self.values))
+
+    def __repr__(self) -> str:
+        return f"NoteMeta({self.path!r}, type={self.type!r}, tags={self.tags!r})"
+
+
+def read_meta(root: Path, rel_path: str) -> Optional[NoteMeta]:
+    """Read the frontmatter record of a single note (None if unreadable)."""
+    try:
+        header = read_header(os.path.join(str(root), rel_path))
+    except OSError:
+        return None
+    return NoteMeta(rel_path, parse_header(header) if header else {})
+
+
+def scan_frontmatter(root: Path, subdir: str = "") -> Iterator[NoteMeta]:
+    """Yield the frontmatter record of every note, reading headers only.
+
+    Only frontmatter tags are collected; inline ``#tags`` in note bodies
+    need the full catalog (``slatekore index``).
+    """
+    def load(rel, st):
+        return read_meta(root, rel)
+
+    for _, _, meta in scan_vault(root, load, subdir=subdir):
+        if meta is not None:
+            yield meta
@@ -0,0 +1,484 @@
+"""Wikilink graph engine for Slatekore vaults.
+
+Links are stored in compressed sparse row (CSR) form: for node ``i`` its
+outlinks are ``out_targets[out_offsets[i]:out_offsets[i + 1]]``, and a
+second, transposed CSR holds backlinks. Edits to individual notes go into a
+small overlay of replaced adjacency rows instead of rebuilding the arrays,
+mirrored by a reverse map from each target to the overlay rows linking to
+it so backlinks stay a lookup; the overlay is folded back into fresh CSR
+arrays once it grows past a fraction of the graph.
+
+The graph lives in ``.slatekore/graph.bin``, a versioned store (see
+``slatekore.store``) opened with ``mmap``:
+
+    meta        JSON: the overlay, unresolved links and the stamp of the
+                catalog the graph was last brought up to date with
+    strings     string table of node paths
+    nodes       one record per node id: path ref, live flag, content hash
+    bypath      live node ids sorted by path ...
+    byname      ... and by lowercased note name, for resolving links
+    outoffsets, outtargets, inoffsets, insources
+                the two CSR arrays, viewed in place as ``uint32``
+
+Loading maps the file: paths and hashes are decoded when read, a path or
+link target is found by binary search, and an update against the same
+catalog it last saw returns at once. Nodes added or changed since are kept
+in memory until the next save.
+"""
+
+import json
+import struct
+from array import array
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .index import Catalog, refresh_catalog
+from .store import StringTable, Store, find_sorted, lower_bound, pack_records, write_store
+from .vault import note_name, state_path
+
+GRAPH_FILE = "graph.bin"
+GRAPH_MAGIC = b"SKGRAPH2"
+GRAPH_VERSION = 1
+
+# Compact the overlay into the CSR arrays once it holds this many rows
+# (or one eighth of the graph, whichever is larger)
+MIN_OVERLAY_ROWS = 256
+
+# path (string ref), live flag, content hash
+_NODE = struct.Struct("<III16s")
+
+
+def _csr(rows: List[List[int]]) -> Tuple[array, array]:
+    """Build ``(offsets, values)`` arrays from a list of adjacency rows."""
+    offsets = array("I", [0])
+    values = array("I")
+    for row in rows:
+        values.extend(row)
+        offsets.append(len(values))
+    return offsets, values
+
+
+class _Column:
+    """A list-like column of the mapped node records; values set or
+    appended since the file was mapped are kept in memory."""
+
+    __slots__ = ("_count", "_decode", "_changed", "_added")
+
+    def __init__(self, count: int, decode: Callable[[int], Any]):
+        self._count = count
+        self._decode = decode
+        self._changed: Dict[int, Any] = {}
+        self._added: List[Any] = []
+
+    def __len__(self) -> int:
+        return self._count + len(self._added)
+
+    def __getitem__(self, i: int) -> Any:
+        if i >= self._count:
+            return self._added[i - self._count]
+        if i in self._changed:
+            return self._changed[i]
+        return self._decode(i)
+
+    def __setitem__(self, i: int, value: Any):
+        if i >= self._count:
+            self._added[i - self._count] = value
+        else:
+            self._changed[i] = value
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def append(self, value: Any):
+        self._added.append(value)
+
+
+class LinkGraph:
+    """Directed wikilink graph over the notes of a vault.
+
+    Node ids index ``nodes`` (vault-relative paths) and ``hashes`` (the
+    content hash each node's links were resolved from). Removed notes leave
+    a tombstone (``hashes[i] is None``) until the next compaction.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.nodes: Any = []
+        self.hashes: Any = []
+        self.out_offsets: Any = array("I", [0])
+        self.out_targets: Any = array("I")
+        self.in_offsets: Any = array("I", [0])
+        self.in_sources: Any = array("I")
+        self.overlay: Dict[int, List[int]] = {}
+        # Target -> overlay rows linking to it
+        self._overlay_in: Dict[int, Set[int]] = {}
+        self.unresolved: Dict[int, List[str]] = {}
+        self._store: Optional[Store] = None
+        self._by_path: Any = ()
+        self._by_name: Any = ()
+        # Catalog stamp the mapped file is up to date with
+        self._synced: Optional[str] = None
+        # Paths and names of the nodes not in the mapped sections
+        self._ids: Dict[str, int] = {}
+        self._names: Dict[str, List[int]] = {}
+
+    @property
+    def path(self) -> Path:
+        return state_path(self.root, GRAPH_FILE)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def load(cls, root: Path) -> "LinkGraph":
+        """Map a vault's link graph (empty if none has been built yet)."""
+        graph = cls(root)
+        graph._open()
+        return graph
+
+    def _open(self) -> bool:
+        store = Store.open(self.path, GRAPH_MAGIC, GRAPH_VERSION)
+        if store is None:
+            return False
+        records = store.records("nodes", _NODE)
+        meta = json.loads(bytes(store.section("meta")) or b"{}")
+        self._store = store
+        self.nodes = _Column(len(records), lambda i: store.text("strings", records[i][:2]))
+        self.hashes = _Column(len(records), lambda i: records[i][3].hex() if records[i][2] else None)
+        self.out_offsets = store.array("outoffsets")
+        self.out_targets = store.array("outtargets")
+        self.in_offsets = store.array("inoffsets")
+        self.in_sources = store.array("insources")
+        self._by_path = store.array("bypath")
+        self._by_name = store.array("byname")
+        self.overlay = {}
+        self._overlay_in = {}
+        for k, row in meta.get("overlay", {}).items():
+            self._set_row(int(k), row)
+        self.unresolved = {int(k): v for k, v in meta.get("unresolved", {}).items()}
+        self._synced = meta.get("catalog")
+        self._ids = {}
+        self._names = {}
+        return True
+
+    def save(self, stamp: Optional[str] = None):
+        """Persist the graph atomically.
+
+        Args:
+            stamp: ``Catalog.stamp`` of the catalog the graph now matches
+        """
+        state_path(self.root, GRAPH_FILE, create=True)
+        strings = StringTable()
+        rows = []
+        live = []
+        for node_id, (path, digest) in enumerate(zip(self.nodes, self.hashes)):
+            rows.append((*strings.add(path), digest is not None, bytes.fromhex(digest or "")))
+            if digest is not None:
+                live.append(node_id)
+        paths = self.nodes
+        by_path = array("I", sorted(live, key=lambda i: paths[i].encode("utf-8")))
+        by_name = array("I", sorted(live, key=lambda i: note_name(paths[i]).lower()))
+        meta = {"overlay": self.overlay, "unresolved": self.unresolved, "catalog": stamp}
+        write_store(self.path, GRAPH_MAGIC, GRAPH_VERSION, [
+            ("meta", json.dumps(meta, separators=(",", ":")).encode("utf-8")),
+            ("strings", bytes(strings.data)),
+            ("nodes", pack_records(_NODE, rows)),
+            ("bypath", by_path.tobytes()),
+            ("byname", by_name.tobytes()),
+            ("outoffsets", self.out_offsets.tobytes()),
+            ("outtargets", self.out_targets.tobytes()),
+            ("inoffsets", self.in_offsets.tobytes()),
+            ("insources", self.in_sources.tobytes()),
+        ])
+        self._open()
+
+    def _set_row(self, node_id: int, row: List[int]):
+        """Replace a node's adjacency row in the overlay."""
+        for target in self.overlay.get(node_id, ()):
+            sources = self._overlay_in[target]
+            sources.discard(node_id)
+            if not sources:
+                del self._overlay_in[target]
+        self.overlay[node_id] = row
+        for target in row:
+            self._overlay_in.setdefault(target, set()).add(node_id)
+
+    def _reindex(self):
+        """Index every node in memory (after a compaction renumbered them)."""
+        self._store = None
+        self._by_path = self._by_name = ()
+        self._ids = {}
+        self._names = {}
+        for node_id, path in enumerate(self.nodes):
+            if self.hashes[node_id] is not None:
+                self._register(node_id, path)
+
+    def _register(self, node_id: int, path: str):
+        self._ids[path] = node_id
+        self._names.setdefault(note_name(path).lower(), []).append(node_id)
+
+    def _id_of(self, path: str) -> Optional[int]:
+        """Node id of a live note, by path."""
+        node_id = self._ids.get(path)
+        if node_id is None and self._by_path:
+            by_path, nodes = self._by_path, self.nodes
+            i = find_sorted(len(by_path), lambda j: nodes[by_path[j]].encode("utf-8"), path.encode("utf-8"))
+            node_id = None if i is None else by_path[i]
+        return node_id if node_id is not None and self.hashes[node_id] is not None else None
+
+    def _named(self, name: str) -> List[int]:
+        """Node ids of the live notes called ``name`` (lowercased)."""
+        ids = []
+        by_name, nodes = self._by_name, self.nodes
+        if by_name:
+            def key(j: int) -> str:
+                return note_name(nodes[by_name[j]]).lower()
+            i = lower_bound(len(by_name), key, name)
+            while i < len(by_name) and key(i) == name:
+                ids.append(by_name[i])
+                i += 1
+        ids.extend(self._names.get(name, ()))
+        return [i for i in ids if self.hashes[i] is not None]
+
+    def _live(self) -> Iterable[int]:
+        return (i for i, digest in enumerate(self.hashes) if digest is not None)
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def resolve(self, target: str) -> Optional[int]:
+        """Resolve a wikilink target to a node id, as Obsidian would."""
+        target = target.strip()
+        if target.lower().endswith(".md"):
+            target = target[:-3]
+        if "/" in target:
+            node_id = self._id_of(target + ".md")
+            if node_id is not None:
+                return node_id
+            suffix = "/" + target.lower() + ".md"
+            candidates = [i for i in self._named(note_name(target + ".md").lower())
+                          if ("/" + self.nodes[i].lower()).endswith(suffix)]
+        else:
+            candidates = self._named(target.lower())
+        if not candidates:
+            return None
+        # Ambiguous names resolve to the shortest path, like Obsidian does
+        return min(candidates, key=lambda i: (len(self.nodes[i]), self.nodes[i]))
+
+    def _resolve_row(self, node_id: int, links: Iterable[str]):
+        row: List[int] = []
+        missing: List[str] = []
+        for target in links:
+            resolved = self.resolve(target)
+            if resolved is None:
+                missing.append(target)
+            elif resolved != node_id and resolved not in row:
+                row.append(resolved)
+        self._set_row(node_id, row)
+        if missing:
+            self.unresolved[node_id] = missing
+        else:
+            self.unresolved.pop(node_id, None)
+
+    def update(self, catalog: Catalog) -> Dict[str, int]:
+        """Apply the notes that changed in the catalog since the last update.
+
+        Returns:
+            dict with 'added', 'updated' and 'removed' counts
+        """
+        counts = {"added": 0, "updated": 0, "removed": 0}
+        stamp = catalog.stamp
+        if stamp is not None and stamp == self._synced:
+            # Same catalog file as at the last save: nothing to compare
+            return counts
+        stale: Set[int] = set()
+        renamed = False
+        known: Dict[str, int] = {}
+
+        for node_id in list(self._live()):
+            path = self.nodes[node_id]
+            record = catalog.get(path)
+            if record is None:
+                # Notes linking here now hold an unresolved link
+                stale.update(self.backlinks_of(node_id))
+                self.hashes[node_id] = None
+                self._set_row(node_id, [])
+                self.unresolved.pop(node_id, None)
+                counts["removed"] += 1
+                renamed = True
+                continue
+            known[path] = node_id
+            if record["hash"] != self.hashes[node_id]:
+                stale.add(node_id)
+                counts["updated"] += 1
+
+        for path in catalog:
+            if path not in known:
+                node_id = len(self.nodes)
+                self.nodes.append(path)
+                # Live but not resolved yet
+                self.hashes.append("")
+                self._register(node_id, path)
+                stale.add(node_id)
+                counts["added"] += 1
+                renamed = True
+
+        if renamed:
+            # New or removed names can change how other notes' links resolve
+            for node_id, missing in list(self.unresolved.items()):
+                if any(self.resolve(t) is not None for t in missing):
+                    stale.add(node_id)
+
+        for node_id in stale:
+            path = self.nodes[node_id]
+            record = catalog.get(path)
+            if record is None:
+                continue
+            self._resolve_row(node_id, record.get("links", []))
+            self.hashes[node_id] = record["hash"]
+
+        if len(self.overlay) > max(MIN_OVERLAY_ROWS, len(self.nodes) // 8):
+            self.compact()
+        if any(counts.values()) or stale or self._store is None or stamp != self._synced:
+            self.save(stamp)
+        return counts
+
+    def compact(self):
+        """Fold the overlay into fresh CSR arrays and drop tombstones."""
+        alive = list(self._live())
+        remap = {old: new for new, old in enumerate(alive)}
+        rows = [[remap[t] for t in self._row(old) if t in remap] for old in alive]
+        incoming: List[List[int]] = [[] for _ in alive]
+        for source, row in enumerate(rows):
+            for target in row:
+                incoming[target].append(source)
+        self.out_offsets, self.out_targets = _csr(rows)
+        self.in_offsets, self.in_sources = _csr(incoming)
+        self.unresolved = {remap[k]: v for k, v in self.unresolved.items() if k in remap}
+        self.nodes = [self.nodes[i] for i in alive]
+        self.hashes = [self.hashes[i] for i in alive]
+        self.overlay = {}
+        self._overlay_in = {}
+        self._reindex()
+
+    # ------------------------------------------------------------------
+    # Queries (by node id)
+    # ------------------------------------------------------------------
+
+    def _row(self, node_id: int) -> List[int]:
+        row = self.overlay.get(node_id)
+        if row is not None:
+            return row
+        if node_id + 1 >= len(self.out_offsets):
+            return []
+        return self.out_targets[self.out_offsets[node_id]:self.out_offsets[node_id + 1]].tolist()
+
+    def outlinks_of(self, node_id: int) -> List[int]:
+        return [t for t in self._row(node_id) if self.hashes[t] is not None]
+
+    def backlinks_of(self, node_id: int) -> List[int]:
+        sources = []
+        if node_id + 1 < len(self.in_offsets):
+            start, end = self.in_offsets[node_id], self.in_offsets[node_id + 1]
+            sources = [s for s in self.in_sources[start:end]
+                       if s not in self.overlay and self.hashes[s] is not None]
+        sources.extend(sorted(s for s in self._overlay_in.get(node_id, ()) if self.hashes[s] is not None))
+        return sources
+
+    def _neighbours(self, node_id: int, direction: str) -> List[int]:
+        if direction == "out":
+            return self.outlinks_of(node_id)
+        if direction == "in":
+            return self.backlinks_of(node_id)
+        return self.outlinks_of(node_id) + self.backlinks_of(node_id)
+
+    # ------------------------------------------------------------------
+    # Queries (by path)
+    # ------------------------------------------------------------------
+
+    def node(self, note: str) -> int:
+        """Return the node id of a note given its path or wikilink name."""
+        node_id = self._id_of(note)
+        if node_id is None:
+            node_id = self.resolve(note)
+        if node_id is None:
+            raise KeyError(f"Note not found: {note}")
+        return node_id
+
+    def outlinks(self, note: str) -> List[str]:
+        return sorted(self.nodes[i] for i in self.outlinks_of(self.node(note)))
+
+    def backlinks(self, note: str) -> List[str]:
+        return sorted(self.nodes[i] for i in self.backlinks_of(self.node(note)))
+
+    def neighbours(self, note: str) -> Set[str]:
+        """Return the paths linked to or from a note (empty if unknown)."""
+        node_id = self._id_of(note)
+        if node_id is None:
+            return set()
+        return {self.nodes[i] for i in self.outlinks_of(node_id) + self.backlinks_of(node_id)}
+
+    def orphans(self) -> List[str]:
+        """Return notes with neither outlinks nor backlinks."""
+        linked = bytearray(len(self.nodes))
+        live = list(self._live())
+        for node_id in live:
+            row = self.outlinks_of(node_id)
+            if row:
+                linked[node_id] = 1
+                for target in row:
+                    linked[target] = 1
+        return sorted(self.nodes[i] for i in live if not linked[i])
+
+    def neighbourhood(self, note: str, hops: int = 1, direction: str = "both") -> Dict[str, int]:
+        """Return every note within ``hops`` links of ``note``, with its distance."""
+        start = self.node(note)
+        seen = {start: 0}
+        frontier = [start]
+        for depth in range(1, hops + 1):
+            next_frontier = []
+            for node_id in frontier:
+                for neighbour in self._neighbours(node_id, direction):
+                    if neighbour not in seen:
+                        seen[neighbour] = depth
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+        del seen[start]
+        return {self.nodes[i]: d for i, d in sorted(seen.items(), key=lambda kv: (kv[1], self.nodes[kv[0]]))}
+
+    def shortest_path(self, source: str, target: str, direction: str = "both") -> Optional[List[str]]:
+        """Return the shortest chain of notes linking ``source`` to ``target``."""
+        start, goal = self.node(source), self.node(target)
+        parents = {start: start}
+        queue = deque([start])
+        while queue:
+            node_id = queue.popleft()
+            if node_id == goal:
+                chain = [goal]
+                while chain[-1] != start:
+                    chain.append(parents[chain[-1]])
+                return [self.nodes[i] for i in reversed(chain)]
+            for neighbour in self._neighbours(node_id, direction):
+                if neighbour not in parents:
+                    parents[neighbour] = node_id
+                    queue.append(neighbour)
+        return None
+
+    def dangling(self) -> Dict[str, List[str]]:
+        """Return the unresolved link targets of each note."""
+        return {self.nodes[i]: targets for i, targets in sorted(self.unresolved.items())
+                if self.hashes[i] is not None}
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._live())
+
+
+def load_graph(root: Path) -> LinkGraph:
+    """Refresh the catalog and link graph of a vault and return the graph."""
+    catalog = refresh_catalog(root)
+    graph = LinkGraph.load(root)
+    graph.update(catalog)
+    return graph
@@ -0,0 +1,339 @@
+"""Duplicate-capture detection: identity keys and near-duplicate sketches.
+
+Every captured source gets a canonical identity key, derived from the
+frontmatter the templates fill in (``arxiv_id``, ``model_id``,
+``space_id``, ``dataset_id``, ``repo_url``, ``url``, ``video_id``) or from
+a URL, so the same paper is recognised whether it was captured from
+``arxiv.org/abs/1706.03762``, ``arxiv.org/pdf/1706.03762v5.pdf`` or
+``huggingface.co/papers/1706.03762``:
+
+    arxiv:1706.03762
+    hf-model:google-bert/bert-base-uncased
+    hf-space:<org>/<name>    hf-dataset:<org>/<name>
+    github:<owner>/<repo>
+    youtube:<video id>
+    url:<host>/<path>?<query without tracking parameters>
+
+``.slatekore/identity.json`` maps each key to its notes, so checking a URL
+before capturing it is a single dictionary lookup.
+
+Notes filed under different names with (nearly) the same content are found
+with a bottom-k MinHash sketch of each note's word 3-shingles; notes that
+share one of their smallest shingle hashes land in the same bucket and are
+compared by estimated Jaccard similarity.
+"""
+
+import heapq
+import json
+import re
+import string
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from .frontmatter import split_frontmatter
+from .index import Catalog, refresh_catalog
+from .vault import atomic_write_bytes, state_path
+
+IDENTITY_FILE = "identity.json"
+IDENTITY_VERSION = 1
+
+# Frontmatter fields holding a source identifier, and the key kind of each
+# (None: the value is a URL)
+IDENTITY_FIELDS = {
+    "arxiv_id": "arxiv",
+    "model_id": "hf-model",
+    "space_id": "hf-space",
+    "dataset_id": "hf-dataset",
+    "video_id": "youtube",
+    "repo_url": None,
+    "url": None,
+}
+
+# Query parameters that never change what a URL points to
+TRACKING_PARAMS = {"fbclid", "gclid", "ref", "ref_src", "si", "feature"}
+
+# First path segments of huggingface.co that are not model repositories
+HF_RESERVED = {
+    "api", "blog", "collections", "docs", "learn", "login", "join", "models",
+    "organizations", "posts", "pricing", "settings", "tasks", "spaces", "datasets",
+}
+
+# Bottom-k sketch size, the sketch values used as LSH buckets, and the
+# minimum number of shingles for a note to be compared at all (unfilled
+# captures are mostly template text)
+SKETCH_SIZE = 32
+SKETCH_BANDS = 4
+MIN_SHINGLES = 24
+MAX_BUCKET = 200
+
+_ARXIV_ID = re.compile(r"(\d{4}\.\d{4,5}|[a-z-]+(?:\.[a-z]{2})?/\d{7})(?:v\d+)?(?:\.pdf)?$", re.IGNORECASE)
+# The most common URLs, keyed without a full parse (anything unusual, such
+# as credentials, ports or odd hosts, falls through to urlsplit)
+_FAST_PATH = re.compile(
+    r"https?://(?:www\.)?(?:"
+    r"arxiv\.org/(?:abs|pdf)/(\d{4}\.\d{4,5})(?:v\d+)?(?:\.pdf)?"
+    r"|github\.com/([\w.-]+)/([\w-]+(?:\.(?!git(?:[/?#]|$))[\w-]+)*)(?:\.git)?(?:/[^?#]*)?"
+    r"|huggingface\.co/(?:(spaces|datasets|models)/)?([\w.-]+)/([\w.-]+)(?:/[^?#]*)?"
+    r")/?(?:[?#].*)?$",
+    re.IGNORECASE,
+)
+_HUB_KINDS = {"models": "hf-model", "spaces": "hf-space", "datasets": "hf-dataset"}
+_HF_BARE_ID = re.compile(r"^[\w.-]+/[\w.-]+$")
+_YOUTUBE_ID = re.compile(r"^[\w-]{11}$")
+_PUNCTUATION = str.maketrans({c: " " for c in string.punctuation + "“”‘’…–—"})
+_SKIPPED_LINE = re.compile(r"^\s*(?:#{1,6}\s.*|\*[^*]+\*|[-*]\s*(?:\[.\]\s*)?|[-*]\s*\w+:\s*\S*)\s*$")
+
+
+def _hf_id(value: str) -> str:
+    return value.strip().strip("/").lower()
+
+
+def canonical_url(url: str) -> str:
+    """Return the identity key of a URL (or of a bare arXiv id)."""
+    url = url.strip()
+    match = _FAST_PATH.match(url)
+    if match:
+        return _fast_key(match) or _canonical_url(url)
+    return _canonical_url(url)
+
+
+def _fast_key(match: "re.Match") -> Optional[str]:
+    """Key of a plain arXiv, GitHub or HuggingFace URL matched by _FAST_PATH."""
+    arxiv, owner, repo, hub, org, name = match.groups()
+    if arxiv:
+        return f"arxiv:{arxiv.lower()}"
+    if owner:
+        return f"github:{owner.lower()}/{repo.lower()}"
+    if hub:
+        return f"{_HUB_KINDS[hub]}:{org.lower()}/{name.lower()}"
+    if org.lower() in HF_RESERVED or org == "papers":
+        return None
+    return f"hf-model:{org.lower()}/{name.lower()}"
+
+
+def _canonical_url(url: str) -> str:
+    if "://" not in url:
+        match = _ARXIV_ID.match(url.lower().replace("arxiv:", "", 1))
+        if match:
+            return f"arxiv:{match.group(1).lower()}"
+        url = "https://" + url
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        # Malformed, e.g. an unclosed IPv6 bracket: key the URL as written
+        return "url:" + url.split("://", 1)[1]
+    host = parts.netloc.lower().rsplit("@", 1)[-1].split(":", 1)[0]
+    for prefix in ("www.", "m.", "export."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    segments = [s for s in parts.path.split("/") if s]
+    query = parse_qsl(parts.query, keep_blank_values=False)
+
+    if host in ("arxiv.org", "alphaxiv.org") and len(segments) >= 2 and segments[0] in ("abs", "pdf", "html"):
+        match = _ARXIV_ID.match("/".join(segments[1:]))
+        if match:
+            return f"arxiv:{match.group(1).lower()}"
+    if host == "huggingface.co" and segments:
+        if segments[0] == "papers" and len(segments) >= 2:
+            match = _ARXIV_ID.match(segments[1])
+            if match:
+                return f"arxiv:{match.group(1).lower()}"
+        if segments[0] in ("models", "spaces", "datasets") and len(segments) >= 3:
+            kind = {"models": "hf-model", "spaces": "hf-space", "datasets": "hf-dataset"}[segments[0]]
+            return f"{kind}:{_hf_id('/'.join(segments[1:3]))}"
+        if segments[0] not in HF_RESERVED and len(segments) >= 2:
+            return f"hf-model:{_hf_id('/'.join(segments[:2]))}"
+    if host == "github.com" and len(segments) >= 2:
+        repo = segments[1][:-4] if segments[1].endswith(".git") else segments[1]
+        return f"github:{segments[0].lower()}/{repo.lower()}"
+    if host in ("youtube.com", "youtu.be", "youtube-nocookie.com"):
+        video = None
+        if host == "youtu.be" and segments:
+            video = segments[0]
+        elif segments[:1] == ["watch"]:
+            video = dict(query).get("v")
+        elif len(segments) >= 2 and segments[0] in ("shorts", "embed", "live", "v"):
+            video = segments[1]
+        if video and _YOUTUBE_ID.match(video):
+            return f"youtube:{video}"
+
+    kept = sorted((k, v) for k, v in query if not k.startswith("utm_") and k not in TRACKING_PARAMS)
+    path = "/".join(segments)
+    key = f"url:{host}/{path}" if path else f"url:{host}"
+    return key + ("?" + urlencode(kept) if kept else "")
+
+
+def identity_key(kind: Optional[str], value: str) -> Optional[str]:
+    """Return the identity key of a frontmatter identifier (None if empty)."""
+    value = value.strip()
+    if not value or value.startswith("{{"):
+        return None
+    if kind is None or "://" in value:
+        return canonical_url(value)
+    if kind == "arxiv":
+        return canonical_url(value) if _ARXIV_ID.match(value) else None
+    if kind == "youtube":
+        return f"youtube:{value}"
+    return f"{kind}:{_hf_id(value)}"
+
+
+def note_keys(frontmatter: Dict[str, Any]) -> List[str]:
+    """Return the identity keys declared by a note's frontmatter."""
+    keys = []
+    for field, kind in IDENTITY_FIELDS.items():
+        value = frontmatter.get(field)
+        if isinstance(value, (str, int, float)) and not isinstance(value, bool):
+            key = identity_key(kind, str(value))
+            if key and key not in keys:
+                keys.append(key)
+    return keys
+
+
+def shingle_sketch(body: str) -> List[int]:
+    """Return the bottom-k MinHash sketch of a note body's word 3-shingles.
+
+    Headings, template prompts and empty list items are ignored; notes with
+    fewer than MIN_SHINGLES shingles get an empty sketch.
+    """
+    text = "\n".join(line for line in body.splitlines() if not _SKIPPED_LINE.match(line))
+    words = text.lower().translate(_PUNCTUATION).split()
+    shingles = set(zip(words, words[1:], words[2:]))
+    if len(shingles) < MIN_SHINGLES:
+        return []
+    return heapq.nsmallest(SKETCH_SIZE, {zlib.crc32(" ".join(s).encode("utf-8")) for s in shingles})
+
+
+def sketch_similarity(a: List[int], b: List[int]) -> float:
+    """Estimate the Jaccard similarity of two notes from their sketches."""
+    if not a or not b:
+        return 0.0
+    union = heapq.nsmallest(SKETCH_SIZE, set(a) | set(b))
+    shared = set(a) & set(b)
+    return sum(1 for h in union if h in shared) / len(union)
+
+
+class IdentityIndex:
+    """Identity keys and near-duplicate sketches of every note.
+
+    ``notes`` maps a path to ``[hash, keys, sketch]``; ``keys`` maps an
+    identity key to the notes declaring it.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.notes: Dict[str, list] = {}
+        self.keys: Dict[str, List[str]] = {}
+
+    @property
+    def path(self) -> Path:
+        return state_path(self.root, IDENTITY_FILE)
+
+    @classmethod
+    def load(cls, root: Path) -> "IdentityIndex":
+        """Load a vault's identity index (empty if none has been built yet)."""
+        index = cls(root)
+        try:
+            data = json.loads(index.path.read_bytes())
+        except (OSError, ValueError):
+            return index
+        if data.get("version") != IDENTITY_VERSION:
+            return index
+        index.notes = data["notes"]
+        for path, (_, keys, _) in index.notes.items():
+            for key in keys:
+                index.keys.setdefault(key, []).append(path)
+        return index
+
+    def save(self):
+        """Persist the index atomically."""
+        state_path(self.root, IDENTITY_FILE, create=True)
+        payload = {"version": IDENTITY_VERSION, "notes": self.notes}
+        atomic_write_bytes(self.path, json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+
+    def update(self, catalog: Catalog) -> Dict[str, int]:
+        """Re-read the notes whose catalog hash differs from the index.
+
+        Returns:
+            dict with 'indexed' and 'removed' counts
+        """
+        indexed = removed = 0
+        for path in list(self.notes):
+            if path not in catalog.notes:
+                self._remove(path)
+                removed += 1
+        for path, record in catalog.notes.items():
+            entry = self.notes.get(path)
+            if entry is not None and entry[0] == record["hash"]:
+                continue
+            try:
+                text = (self.root / path).read_text(encoding="utf-8", errors="replace")
+            except OSError:
+                continue
+            if entry is not None:
+                self._remove(path)
+            _, body = split_frontmatter(text)
+            keys = note_keys(record["frontmatter"])
+            self.notes[path] = [record["hash"], keys, shingle_sketch(body)]
+            for key in keys:
+                self.keys.setdefault(key, []).append(path)
+            indexed += 1
+        if indexed or removed or not self.path.exists():
+            self.save()
+        return {"indexed": indexed, "removed": removed}
+
+    def _remove(self, path: str):
+        _, keys, _ = self.notes.pop(path)
+        for key in keys:
+            paths = self.keys[key]
+            paths.remove(path)
+            if not paths:
+                del self.keys[key]
+
+    def lookup(self, url: str) -> Tuple[str, List[str]]:
+        """Return the identity key of a URL or id and the notes capturing it.
+
+        A bare ``org/name`` id matches a model, space or dataset.
+        """
+        key = canonical_url(url)
+        if key not in self.keys and _HF_BARE_ID.match(url.strip()):
+            for kind in ("hf-model", "hf-space", "hf-dataset"):
+                candidate = f"{kind}:{_hf_id(url)}"
+                if candidate in self.keys:
+                    return candidate, sorted(self.keys[candidate])
+        return key, sorted(self.keys.get(key, ()))
+
+    def collisions(self) -> Dict[str, List[str]]:
+        """Return identity keys declared by more than one note."""
+        return {key: sorted(paths) for key, paths in sorted(self.keys.items()) if len(paths) > 1}
+
+    def near_duplicates(self, threshold: float = 0.8) -> List[Tuple[str, str, float]]:
+        """Return ``(path, path, similarity)`` for notes with near-identical text."""
+        buckets: Dict[int, List[str]] = {}
+        for path, (_, _, sketch) in self.notes.items():
+            for value in sketch[:SKETCH_BANDS]:
+                buckets.setdefault(value, []).append(path)
+        seen: Set[Tuple[str, str]] = set()
+        pairs = []
+        for members in buckets.values():
+            if len(members) < 2 or len(members) > MAX_BUCKET:
+                continue
+            members.sort()
+            for i, a in enumerate(members):
+                for b in members[i + 1:]:
+                    if (a, b) in seen:
+                        continue
+                    seen.add((a, b))
+                    similarity = sketch_similarity(self.notes[a][2], self.notes[b][2])
+                    if similarity >= threshold:
+                        pairs.append((a, b, round(similarity, 3)))
+        return sorted(pairs, key=lambda p: (-p[2], p[0], p[1]))
+
+
+def load_identity(root: Path) -> IdentityIndex:
+    """Refresh the catalog and identity index of a vault and return the index."""
+    catalog = refresh_catalog(root)
+    index = IdentityIndex.load(root)
+    index.update(catalog)
+    return index
@@ -0,0 +1,446 @@
+"""Offline bulk capture from reference-manager exports.
+
+``slatekore import`` reads BibTeX (``.bib``), CSV and JSON Lines exports,
+turns every record into a note from the matching template (paper, model,
+dataset, space, repo, website or video), fills the frontmatter fields the
+template declares (``arxiv_id``, ``authors``, ``year``, ``venue``,
+``model_id``, ...) and writes the notes into the folders the URL router
+picks.
+
+Records that are already in the vault (same arXiv id, model/dataset id,
+repository or URL, or a note at the same path) and records repeated within
+the import are skipped. Planning happens in one process; rendering and
+writing are spread over a process pool. Notes are created with exclusive
+opens, so an import never overwrites an existing note.
+"""
+
+import csv
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+
+from .frontmatter import normalize_tag
+from .identity import IdentityIndex, canonical_url, identity_key, note_keys
+from .index import refresh_catalog
+from .render import TemplatePlan, compile_template, default_values, template_text
+from .router import ROUTES, route_url, sanitize_filename
+
+# Note type -> target folder
+FOLDERS = {note_type: folder for note_type, folder, _ in ROUTES.values()}
+
+# Record columns/BibTeX fields accepted for each frontmatter field
+FIELD_ALIASES = {
+    "title": ("title", "name"),
+    "authors": ("authors", "author"),
+    "year": ("year", "date", "published"),
+    "venue": ("venue", "journal", "booktitle", "publisher", "conference"),
+    "arxiv_id": ("arxiv_id", "arxiv", "eprint"),
+    "citations": ("citations", "citation_count"),
+    "model_id": ("model_id",),
+    "space_id": ("space_id",),
+    "dataset_id": ("dataset_id",),
+    "repo_url": ("repo_url",),
+    "url": ("url", "link", "howpublished"),
+    "video_id": ("video_id",),
+}
+
+# Notes handed to each worker process at a time; smaller imports are
+# written in-process
+CHUNK_SIZE = 256
+MAX_KEYWORD_TAGS = 5
+
+_BIB_ENTRY = re.compile(r"@\s*(\w+)\s*[{(]")
+_BIB_FIELD = re.compile(r"\s*([\w:.+-]+)\s*=\s*")
+_LATEX_COMMAND = re.compile(r"\\[a-zA-Z]+\s*|\\(.)")
+_YEAR = re.compile(r"\b(1[89]\d\d|20\d\d)\b")
+_ARXIV_IN_TEXT = re.compile(r"arxiv(?:\.org/(?:abs|pdf)/|[.:\s]*)(\d{4}\.\d{4,5})", re.IGNORECASE)
+
+# Fields an arXiv id may hide in when a record has no ``eprint``; never the
+# title or abstract, which cite other papers
+ARXIV_ID_FIELDS = ("eprint", "journal", "note", "howpublished", "url", "doi")
+
+
+# ----------------------------------------------------------------------
+# Readers
+# ----------------------------------------------------------------------
+
+def read_bibtex(fh: TextIO) -> Iterator[Dict[str, str]]:
+    """Yield the fields of each BibTeX entry (plus ``ENTRYTYPE`` and ``ID``)."""
+    text = fh.read()
+    pos = 0
+    while True:
+        match = _BIB_ENTRY.search(text, pos)
+        if match is None:
+            return
+        end = _closing_brace(text, match.end() - 1)
+        if end < 0:
+            return
+        pos = end + 1
+        kind = match.group(1).lower()
+        if kind in ("comment", "preamble", "string"):
+            continue
+        key, _, rest = text[match.end():end].partition(",")
+        fields = _bib_fields(rest)
+        fields["ENTRYTYPE"] = kind
+        fields["ID"] = key.strip()
+        yield fields
+
+
+def _closing_brace(text: str, start: int) -> int:
+    """Index of the bracket closing the one at ``start`` (-1 if unbalanced).
+
+    Braces nest inside ``@entry( ... )``; parentheses inside braces or
+    quoted values do not count.
+    """
+    if text[start] == "{":
+        depth = 0
+        for i in range(start, len(text)):
+            if text[i] == "{":
+                depth += 1
+            elif text[i] == "}":
+                depth -= 1
+                if depth == 0:
+                    return i
+        return -1
+    braces = 0
+    quoted = False
+    for i in range(start + 1, len(text)):
+        char = text[i]
+        if char == "{":
+            braces += 1
+        elif char == "}":
+            braces -= 1
+        elif char == '"' and braces == 0:
+            quoted = not quoted
+        elif char == ")" and braces == 0 and not quoted:
+            return i
+    return -1
+
+
+def _bib_fields(body: str) -> Dict[str, str]:
+    fields = {}
+    pos = 0
+    while True:
+        match = _BIB_FIELD.match(body, pos)
+        if match is None:
+            return fields
+        name = match.group(1).lower()
+        pos = match.end()
+        if pos >= len(body):
+            return fields
+        if body[pos] == "{":
+            end = _closing_brace(body, pos)
+            if end < 0:
+                return fields
+            value, pos = body[pos + 1:end], end + 1
+        elif body[pos] == '"':
+            end, depth = pos + 1, 0
+            while end < len(body) and (body[end] != '"' or depth):
+                depth += {"{": 1, "}": -1}.get(body[end], 0)
+                end += 1
+            value, pos = body[pos + 1:end], end + 1
+        else:
+            end = body.find(",", pos)
+            end = len(body) if end < 0 else end
+            value, pos = body[pos:end], end
+        fields[name] = _clean_latex(value)
+        comma = body.find(",", pos)
+        if comma < 0:
+            return fields
+        pos = comma + 1
+
+
+def _clean_latex(value: str) -> str:
+    value = _LATEX_COMMAND.sub(lambda m: m.group(1) or "", value)
+    return " ".join(value.replace("{", "").replace("}", "").replace("~", " ").split())
+
+
+def read_csv(fh: TextIO) -> Iterator[Dict[str, str]]:
+    """Yield each row of a CSV export (first row: column names)."""
+    for row in csv.DictReader(fh):
+        yield {k: v for k, v in row.items() if k}
+
+
+def read_jsonl(fh: TextIO) -> Iterator[Dict[str, Any]]:
+    """Yield each object of a JSON Lines export."""
+    for line in fh:
+        line = line.strip()
+        if line:
+            record = json.loads(line)
+            if isinstance(record, dict):
+                yield record
+
+
+READERS = {"bib": read_bibtex, "csv": read_csv, "jsonl": read_jsonl}
+EXTENSIONS = {".bib": "bib", ".bibtex": "bib", ".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+
+def read_records(path: Path, fmt: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Stream the raw records of an export file.
+
+    Raises:
+        ValueError: if the format cannot be told from the file extension
+    """
+    fmt = fmt or EXTENSIONS.get(Path(path).suffix.lower())
+    if fmt not in READERS:
+        raise ValueError(f"Unknown import format for {path} (use --format bib|csv|jsonl)")
+    with open(path, encoding="utf-8", errors="replace", newline="") as fh:
+        yield from READERS[fmt](fh)
+
+
+# ----------------------------------------------------------------------
+# Planning
+# ----------------------------------------------------------------------
+
+def _lookup(record: Dict[str, Any], field: str) -> Any:
+    for alias in FIELD_ALIASES.get(field, (field,)):
+        value = record.get(alias)
+        if value not in (None, "", []):
+            return value
+    return None
+
+
+def _authors(value: Any) -> List[str]:
+    """Split BibTeX-style ('A and B', 'Last, First') or listed authors."""
+    if isinstance(value, str):
+        names = re.split(r"\s+and\s+|;", value) if (" and " in value or ";" in value) else [value]
+        if len(names) == 1 and value.count(",") > 1:
+            names = value.split(",")
+    else:
+        names = [str(v) for v in value]
+    authors = []
+    for name in names:
+        last, sep, first = name.partition(",")
+        name = f"{first.strip()} {last.strip()}" if sep and first.strip() else name
+        if name.strip() and name.strip().lower() != "others":
+            authors.append(" ".join(name.split()))
+    return authors
+
+
+def _keyword_tags(value: Any) -> List[str]:
+    if isinstance(value, str):
+        value = re.split(r"[;,]", value)
+    tags = []
+    for keyword in value or ():
+        tag = re.sub(r"[^\w/-]+", "-", normalize_tag(keyword)).strip("-")
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags[:MAX_KEYWORD_TAGS]
+
+
+def normalize_record(raw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Turn a raw export record into an import plan entry.
+
+    Returns:
+        dict with the note 'type', 'title', frontmatter 'fields' to fill,
+        extra 'tags', 'abstract', target 'path' and identity 'keys', or
+        None if the record identifies nothing
+    """
+    record = {str(k).strip().lower(): v for k, v in raw.items()}
+    fields: Dict[str, Any] = {}
+    for field in FIELD_ALIASES:
+        value = _lookup(record, field)
+        if value is not None:
+            fields[field] = value
+
+    arxiv = fields.pop("arxiv_id", None)
+    if arxiv is None:
+        # e.g. journal = {arXiv preprint arXiv:1706.03762}
+        match = _ARXIV_IN_TEXT.search(" ".join(
+            record[field] for field in ARXIV_ID_FIELDS if isinstance(record.get(field), str)))
+        arxiv = match.group(1) if match else None
+    if arxiv is not None and identity_key("arxiv", str(arxiv)):
+        fields["arxiv_id"] = canonical_url(str(arxiv)).partition(":")[2]
+
+    url = fields.get("url")
+    if isinstance(url, str) and "://" not in url:
+        fields.pop("url")
+        url = None
+
+    title = fields.get("title")
+    declared = str(record.get("type") or "").strip().lower()
+    if declared in FOLDERS:
+        note_type = declared
+    elif "model_id" in fields:
+        note_type = "model"
+    elif "dataset_id" in fields:
+        note_type = "dataset"
+    elif "space_id" in fields:
+        note_type = "space"
+    elif "arxiv_id" in fields or "entrytype" in record:
+        note_type = "paper"
+    elif url:
+        note_type = route_url(url).type
+    else:
+        return None
+
+    # Route by the most specific identifier the record carries
+    source = {
+        "paper": fields.get("arxiv_id"),
+        "model": fields.get("model_id") and f"https://huggingface.co/{fields['model_id']}",
+        "space": fields.get("space_id") and f"https://huggingface.co/spaces/{fields['space_id']}",
+        "dataset": fields.get("dataset_id") and f"https://huggingface.co/datasets/{fields['dataset_id']}",
+        "repo": fields.get("repo_url"),
+        "video": fields.get("video_id") and f"https://youtu.be/{fields['video_id']}",
+    }.get(note_type) or url
+    if source:
+        route = route_url(str(source), str(title) if title else None)
+        if route.type == "repo":
+            fields.setdefault("repo_url", url)
+        elif route.type == "website":
+            fields.setdefault("url", url)
+        for kind, field in (("hf-model", "model_id"), ("hf-space", "space_id"),
+                            ("hf-dataset", "dataset_id"), ("youtube", "video_id")):
+            if route.key.startswith(kind + ":") and field not in fields:
+                fields[field] = route.key.partition(":")[2]
+        filename = route.filename
+    elif title:
+        filename = sanitize_filename(str(title)) + ".md"
+    else:
+        return None
+
+    if "authors" in fields:
+        fields["authors"] = _authors(fields["authors"])
+    if "year" in fields:
+        match = _YEAR.search(str(fields.pop("year")))
+        if match:
+            fields["year"] = int(match.group(1))
+    title = " ".join(str(title).split()) if title else filename[:-3]
+    fields["title"] = title
+
+    return {
+        "type": note_type,
+        "title": title,
+        "fields": fields,
+        "tags": _keyword_tags(record.get("keywords") or record.get("tags")),
+        "abstract": " ".join(str(record.get("abstract") or "").split()),
+        "path": f"{FOLDERS[note_type]}/{filename}",
+        "keys": note_keys(fields),
+    }
+
+
+def _unique_path(path: str, taken: Set[str]) -> str:
+    stem = path[:-3]
+    n = 2
+    while path.lower() in taken:
+        path = f"{stem}-{n}.md"
+        n += 1
+    return path
+
+
+# ----------------------------------------------------------------------
+# Rendering and writing
+# ----------------------------------------------------------------------
+
+def render_note(plan: TemplatePlan, entry: Dict[str, Any], values: Dict[str, str]) -> str:
+    """Render the note for one planned record."""
+    text = plan.render(dict(values, title=entry["title"]), entry["fields"], entry["tags"])
+    if entry["abstract"]:
+        heading = "# " + entry["title"] + "\n"
+        at = text.find(heading)
+        if at >= 0:
+            at += len(heading)
+            text = text[:at] + "\n> " + entry["abstract"] + "\n" + text[at:]
+    return text
+
+
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(root: str, templates: Dict[str, str], values: Dict[str, str]):
+    # Each worker compiles every template once
+    plans = {note_type: compile_template(text) for note_type, text in templates.items()}
+    _WORKER.update(root=root, plans=plans, values=values)
+
+
+def _write_notes(entries: List[Dict[str, Any]]) -> Tuple[List[str], List[str]]:
+    """Render and create notes; returns (created paths, paths that appeared meanwhile)."""
+    created, existing = [], []
+    root = _WORKER["root"]
+    for entry in entries:
+        text = render_note(_WORKER["plans"][entry["type"]], entry, _WORKER["values"])
+        target = os.path.join(root, entry["path"])
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        try:
+            with open(target, "x", encoding="utf-8") as fh:
+                fh.write(text)
+        except FileExistsError:
+            existing.append(entry["path"])
+            continue
+        created.append(entry["path"])
+    return created, existing
+
+
+def import_records(root: Path, records: Iterable[Dict[str, Any]], workers: Optional[int] = None,
+                   dry_run: bool = False) -> Dict[str, Any]:
+    """Create notes for export records that are not in the vault yet.
+
+    Args:
+        root: Vault directory
+        records: Raw records (see ``read_records``)
+        workers: Writer processes (default: CPU count)
+        dry_run: Plan the import without writing anything
+
+    Returns:
+        dict with the 'created' paths, the 'duplicates' skipped as
+        ``{existing note or earlier record: [record titles]}`` and the number
+        of records 'skipped' because they identify nothing
+    """
+    root = Path(root)
+    catalog = refresh_catalog(root)
+    identity = IdentityIndex.load(root)
+    identity.update(catalog)
+    taken = {p.lower() for p in identity.notes}
+    seen: Dict[str, str] = {}
+    planned: List[Dict[str, Any]] = []
+    duplicates: Dict[str, List[str]] = {}
+    skipped = 0
+
+    for raw in records:
+        entry = normalize_record(raw)
+        if entry is None:
+            skipped += 1
+            continue
+        match = None
+        for key in entry["keys"]:
+            found = identity.keys.get(key)
+            match = found[0] if found else seen.get(key)
+            if match:
+                break
+        if match is None and not entry["keys"] and entry["path"].lower() in taken:
+            # Without an identifier, the same title means the same source
+            match = entry["path"]
+        if match:
+            duplicates.setdefault(match, []).append(entry["title"])
+            continue
+        entry["path"] = _unique_path(entry["path"], taken)
+        taken.add(entry["path"].lower())
+        for key in entry["keys"]:
+            seen[key] = entry["path"]
+        planned.append(entry)
+
+    result = {"created": [], "duplicates": duplicates, "skipped": skipped, "planned": len(planned)}
+    if dry_run or not planned:
+        result["created"] = [e["path"] for e in planned] if dry_run else []
+        return result
+
+    templates = {t: template_text(root, t) for t in {e["type"] for e in planned}}
+    args = (str(root), templates, default_values())
+    chunks = [planned[i:i + CHUNK_SIZE] for i in range(0, len(planned), CHUNK_SIZE)]
+    if len(chunks) == 1 or workers == 1:
+        _init_worker(*args)
+        outcomes = [_write_notes(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=args) as pool:
+            outcomes = list(pool.map(_write_notes, chunks))
+    titles = {e["path"]: e["title"] for e in planned}
+    for created, existing in outcomes:
+        result["created"].extend(created)
+        for path in existing:
+            duplicates.setdefault(path, []).append(titles[path])
+    # Catalog (and journal) the new notes without waiting for the next sweep
+    catalog.update_paths(result["created"])
+    return result
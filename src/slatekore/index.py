@@ -0,0 +1,562 @@
+"""Persistent, incremental note catalog for Slatekore vaults.
+
+The catalog lives in ``.slatekore/catalog.bin`` and records, for every
+note, its path, type, frontmatter, tags, wikilinks, mtime, size and content
+hash. Refreshing only re-reads files whose stat changed, and only re-parses
+files whose content hash changed. Every change an update finds is recorded
+in the vault's change journal (see ``slatekore.journal``).
+
+The file is a versioned store (see ``slatekore.store``) opened with
+``mmap``:
+
+    strings     string table: paths, titles, types, tags, links and the
+                frontmatter of each note as JSON
+    records     one fixed-width record per note, sorted by path
+    tagrefs     (offset, length) string refs of each note's tags ...
+    linkrefs    ... and of its wikilink targets, addressed CSR-style by
+                the (start, count) pair in the note's record
+    tags        the distinct tags, sorted, each with a (start, count) slice
+    tagdocs     of this posting list of record numbers
+
+Loading maps the file and nothing more: a path is found by binary search
+over the records and a record's fields are decoded when they are read.
+Saving copies the string table and the records of unchanged notes
+verbatim, appending only what changed, and rewrites the file from scratch
+once enough of it is stale.
+"""
+
+import hashlib
+import json
+import os
+import struct
+import time
+from array import array
+from collections.abc import ItemsView, Mapping, MutableMapping
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .frontmatter import extract_links, extract_tags, extract_title, split_frontmatter
+from .journal import append_events, catalog_events
+from .scanner import scan_vault
+from .store import StringTable, Store, find_sorted, pack_records, write_store
+from .vault import note_name, note_type, state_path, watcher_running
+
+CATALOG_FILE = "catalog.bin"
+CATALOG_MAGIC = b"SKCATLG1"
+CATALOG_VERSION = 3
+# JSON catalog written by earlier versions, migrated on first save
+LEGACY_CATALOG_FILE = "index.json"
+LEGACY_CATALOG_VERSION = 2
+
+# Replaced or deleted records tolerated in the file (at least this many,
+# else a quarter of the notes) before a save rewrites it from scratch
+MIN_STALE = 256
+# Keyed lookups answered by binary search before a path map is built
+MAX_BISECTS = 32
+
+# path, title, type, frontmatter (string refs); mtime; size; hash;
+# tags and links (start, count)
+_RECORD = struct.Struct("<8IqQ16s4I")
+# tag (string ref); tagdocs (start, count)
+_TAG = struct.Struct("<4I")
+RECORD_FIELDS = ("type", "title", "frontmatter", "tags", "links", "mtime", "size", "hash")
+
+
+def content_hash(data: bytes) -> str:
+    """Return the content hash stored for a note."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def parse_note(rel_path: str, data: bytes) -> Dict[str, Any]:
+    """Build the catalog fields derived from a note's content."""
+    text = data.decode("utf-8", errors="replace")
+    frontmatter, body = split_frontmatter(text)
+    return {
+        "type": note_type(rel_path, frontmatter),
+        "title": extract_title(frontmatter, body, note_name(rel_path)),
+        "frontmatter": frontmatter,
+        "tags": extract_tags(frontmatter, body),
+        "links": extract_links(body),
+    }
+
+
+class CatalogFile:
+    """A mapped ``catalog.bin``."""
+
+    def __init__(self, store: Store):
+        self.store = store
+        self.records = store.records("records", _RECORD)
+        self.tags = store.records("tags", _TAG)
+        self.tag_refs = store.array("tagrefs")
+        self.link_refs = store.array("linkrefs")
+        self.tag_docs = store.array("tagdocs")
+        self.meta = json.loads(bytes(store.section("meta")) or b"{}")
+        self._paths: Optional[List[str]] = None
+
+    @classmethod
+    def open(cls, path: Path) -> Optional["CatalogFile"]:
+        store = Store.open(path, CATALOG_MAGIC, CATALOG_VERSION)
+        return None if store is None else cls(store)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def text(self, offset: int, length: int) -> str:
+        return self.store.text("strings", (offset, length))
+
+    def raw(self, offset: int, length: int) -> bytes:
+        return self.store.raw("strings", (offset, length))
+
+    def texts(self, refs, start: int, count: int) -> List[str]:
+        return [self.text(refs[2 * i], refs[2 * i + 1]) for i in range(start, start + count)]
+
+    def paths(self) -> List[str]:
+        """Every path, in record order (decoded once)."""
+        if self._paths is None:
+            records = self.records
+            self._paths = [self.text(*records[i][:2]) for i in range(len(records))]
+        return self._paths
+
+    def find(self, path: str) -> Optional[int]:
+        """Record number of a path, by binary search."""
+        records = self.records
+        return find_sorted(len(records), lambda i: self.raw(*records[i][:2]), path.encode("utf-8"))
+
+    def record(self, i: int) -> "StoredRecord":
+        return StoredRecord(self, self.records[i])
+
+    def tagged(self, tag: str) -> List[int]:
+        """Record numbers of the notes carrying ``tag`` (its posting list)."""
+        _, _, start, count = self._tag_row(tag)
+        return self.tag_docs[start:start + count].tolist()
+
+    def tag_count(self, tag: str) -> int:
+        """Number of notes carrying ``tag``."""
+        return self._tag_row(tag)[3]
+
+    def _tag_row(self, tag: str) -> tuple:
+        tags = self.tags
+        i = find_sorted(len(tags), lambda j: self.raw(*tags[j][:2]), tag.encode("utf-8"))
+        return (0, 0, 0, 0) if i is None else tags[i]
+
+
+class StoredRecord(Mapping):
+    """A catalog record read in place from ``catalog.bin``.
+
+    Behaves like the plain dict records of freshly parsed notes; each field
+    is decoded the first time it is read.
+    """
+
+    __slots__ = ("file", "row", "_cache")
+
+    def __init__(self, file: CatalogFile, row: tuple):
+        self.file = file
+        self.row = row
+        self._cache: Dict[str, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        row = self.row
+        if key == "mtime":
+            return row[8]
+        if key == "size":
+            return row[9]
+        if key == "hash":
+            value = row[10].hex()
+        elif key == "title":
+            value = self.file.text(row[2], row[3])
+        elif key == "type":
+            value = self.file.text(row[4], row[5])
+        elif key == "frontmatter":
+            value = json.loads(self.file.raw(row[6], row[7]))
+        elif key == "tags":
+            value = self.file.texts(self.file.tag_refs, row[11], row[12])
+        elif key == "links":
+            value = self.file.texts(self.file.link_refs, row[13], row[14])
+        else:
+            raise KeyError(key)
+        self._cache[key] = value
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(RECORD_FIELDS)
+
+    def __len__(self) -> int:
+        return len(RECORD_FIELDS)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class _NoteItems(ItemsView):
+    def __iter__(self):
+        return self._mapping.iter_items()
+
+
+class CatalogNotes(MutableMapping):
+    """The notes of a mapped catalog, with changes kept in memory.
+
+    Reads go to the file unless a path was set or deleted since it was
+    mapped; ``Catalog.save`` writes the changes out and maps the result.
+    """
+
+    def __init__(self, file: CatalogFile):
+        self.file = file
+        self._changed: Dict[str, Dict[str, Any]] = {}
+        self._deleted: set = set()
+        self._added = 0
+        self._ids: Optional[Dict[str, int]] = None
+        self._bisects = 0
+
+    @property
+    def modified(self) -> bool:
+        return bool(self._changed or self._deleted)
+
+    def _find(self, path: str) -> Optional[int]:
+        if self._ids is None:
+            self._bisects += 1
+            if self._bisects <= MAX_BISECTS:
+                return self.file.find(path)
+            self._ids = {p: i for i, p in enumerate(self.file.paths())}
+        return self._ids.get(path)
+
+    def __getitem__(self, path: str):
+        record = self._changed.get(path)
+        if record is not None:
+            return record
+        i = None if path in self._deleted else self._find(path)
+        if i is None:
+            raise KeyError(path)
+        return self.file.record(i)
+
+    def __contains__(self, path) -> bool:
+        if path in self._changed:
+            return True
+        return path not in self._deleted and self._find(path) is not None
+
+    def __setitem__(self, path: str, record: Dict[str, Any]):
+        if path not in self._changed:
+            if self._find(path) is None:
+                self._added += 1
+            else:
+                self._deleted.discard(path)
+        self._changed[path] = record
+
+    def __delitem__(self, path: str):
+        if path in self._changed:
+            del self._changed[path]
+            if self._find(path) is None:
+                self._added -= 1
+            else:
+                self._deleted.add(path)
+        elif path in self._deleted or self._find(path) is None:
+            raise KeyError(path)
+        else:
+            self._deleted.add(path)
+
+    def __iter__(self) -> Iterator[str]:
+        for path in self.file.paths():
+            if path not in self._deleted and path not in self._changed:
+                yield path
+        yield from self._changed
+
+    def iter_items(self) -> Iterator[Tuple[str, Any]]:
+        file = self.file
+        for i, path in enumerate(file.paths()):
+            if path not in self._deleted and path not in self._changed:
+                yield path, file.record(i)
+        yield from self._changed.items()
+
+    def items(self):
+        return _NoteItems(self)
+
+    def __len__(self) -> int:
+        return len(self.file) - len(self._deleted) + self._added
+
+
+class Catalog:
+    """On-disk catalog of every note in a vault.
+
+    ``notes`` maps each note's vault-relative posix path to its record:
+    ``type``, ``title``, ``frontmatter``, ``tags``, ``links`` (raw wikilink
+    targets), ``mtime`` (ns), ``size`` and ``hash``. Records read from the
+    catalog file are ``StoredRecord`` mappings, new ones plain dicts.
+    """
+
+    def __init__(self, root: Path, notes: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.root = Path(root)
+        self.notes: MutableMapping = notes or {}
+        self._file: Optional[CatalogFile] = None
+        self._legacy = False
+
+    @property
+    def path(self) -> Path:
+        return state_path(self.root, CATALOG_FILE)
+
+    @property
+    def stamp(self) -> Optional[str]:
+        """Identity of the mapped ``catalog.bin`` the notes match, or None
+        when they were changed since it was mapped (or none is)."""
+        if self._file is None or not isinstance(self.notes, CatalogNotes) or self.notes.modified:
+            return None
+        return self._file.store.stamp
+
+    @classmethod
+    def load(cls, root: Path) -> "Catalog":
+        """Map the catalog of a vault (empty if none has been built yet).
+
+        A JSON catalog left by an earlier version is read instead, and
+        replaced by ``catalog.bin`` the next time the catalog is saved.
+        """
+        catalog = cls(root)
+        if catalog._open():
+            return catalog
+        try:
+            data = json.loads(state_path(root, LEGACY_CATALOG_FILE).read_bytes())
+        except (OSError, ValueError):
+            return catalog
+        if data.get("version") == LEGACY_CATALOG_VERSION:
+            catalog.notes = data.get("notes", {})
+            catalog._legacy = True
+        return catalog
+
+    def _open(self) -> bool:
+        self._file = CatalogFile.open(self.path)
+        if self._file is None:
+            return False
+        self.notes = CatalogNotes(self._file)
+        return True
+
+    def save(self):
+        """Persist the catalog atomically."""
+        state_path(self.root, CATALOG_FILE, create=True)
+        base = self._file
+        items = sorted(self.notes.items(), key=lambda item: item[0])
+        stale = 0
+        if base is not None:
+            stale = base.meta.get("stale", 0)
+            carried = sum(1 for _, record in items
+                          if isinstance(record, StoredRecord) and record.file is base)
+            stale += len(base) - carried
+            if stale > max(MIN_STALE, len(items) // 4):
+                base = None
+                stale = 0
+
+        strings = StringTable()
+        tag_refs = array("I")
+        link_refs = array("I")
+        if base is not None:
+            # Unchanged records keep pointing into the copied sections
+            strings.data += base.store.section("strings")
+            tag_refs.frombytes(base.store.section("tagrefs"))
+            link_refs.frombytes(base.store.section("linkrefs"))
+
+        def refs(values: List[str], table: array) -> Tuple[int, int]:
+            start = len(table) // 2
+            for value in values:
+                table.extend(strings.add(value))
+            return start, len(values)
+
+        rows = []
+        for path, record in items:
+            if base is not None and isinstance(record, StoredRecord) and record.file is base:
+                rows.append(record.row)
+                continue
+            if isinstance(record, StoredRecord):
+                frontmatter = strings.add_bytes(record.file.raw(*record.row[6:8]))
+            else:
+                frontmatter = strings.add(json.dumps(record["frontmatter"], separators=(",", ":")))
+            rows.append((*strings.add(path), *strings.add(record["title"]), *strings.add(record["type"]),
+                         *frontmatter, record["mtime"], record["size"], bytes.fromhex(record["hash"]),
+                         *refs(record["tags"], tag_refs), *refs(record["links"], link_refs)))
+
+        names: Dict[Tuple[int, int], str] = {}
+        postings: Dict[str, array] = {}
+        for i, row in enumerate(rows):
+            for j in range(row[11], row[11] + row[12]):
+                ref = (tag_refs[2 * j], tag_refs[2 * j + 1])
+                name = names.get(ref)
+                if name is None:
+                    name = names[ref] = strings.data[ref[0]:ref[0] + ref[1]].decode("utf-8")
+                postings.setdefault(name, array("I")).append(i)
+        tags = []
+        tag_docs = array("I")
+        for name in sorted(postings):
+            tags.append((*strings.add(name), len(tag_docs), len(postings[name])))
+            tag_docs.extend(postings[name])
+
+        meta = {"notes": len(rows), "stale": stale}
+        write_store(self.path, CATALOG_MAGIC, CATALOG_VERSION, [
+            ("meta", json.dumps(meta).encode("utf-8")),
+            ("strings", bytes(strings.data)),
+            ("records", pack_records(_RECORD, rows)),
+            ("tagrefs", tag_refs.tobytes()),
+            ("linkrefs", link_refs.tobytes()),
+            ("tags", pack_records(_TAG, tags)),
+            ("tagdocs", tag_docs.tobytes()),
+        ])
+        if self._legacy:
+            try:
+                os.unlink(state_path(self.root, LEGACY_CATALOG_FILE))
+            except OSError:
+                pass
+            self._legacy = False
+        self._open()
+
+    def _scan(self, rel: str, st, old: Optional[Dict[str, Any]]) -> Tuple[Optional[Dict[str, Any]], str]:
+        """Compare one note on disk with its previous record.
+
+        Returns:
+            (record, status) where status is 'unchanged', 'touched' (stat
+            changed, content did not), 'changed' or 'unreadable'
+        """
+        if old is not None and old["mtime"] == st.st_mtime_ns and old["size"] == st.st_size:
+            return old, "unchanged"
+        try:
+            data = (self.root / rel).read_bytes()
+        except OSError:
+            return None, "unreadable"
+        digest = content_hash(data)
+        if old is not None and old["hash"] == digest:
+            # Touched but not edited: keep the parse, refresh the stat
+            return dict(old, mtime=st.st_mtime_ns, size=st.st_size), "touched"
+        record = parse_note(rel, data)
+        record.update(mtime=st.st_mtime_ns, size=st.st_size, hash=digest)
+        return record, "changed"
+
+    def refresh(self, rebuild: bool = False, workers: Optional[int] = None) -> Dict[str, Any]:
+        """Bring the catalog up to date with the vault on disk.
+
+        Args:
+            rebuild: If True, re-read and re-parse every note
+            workers: Scanner threads (see ``slatekore.scanner``)
+
+        Returns:
+            dict with 'added', 'updated' and 'removed' path lists, the
+            'unchanged' count and the elapsed time in 'seconds'
+        """
+        start = time.perf_counter()
+        result = {"added": [], "updated": [], "removed": [], "unchanged": 0}
+        previous = {} if rebuild else dict(self.notes.items())
+        notes: Dict[str, Dict[str, Any]] = {}
+        touched = False
+
+        def load(rel, st):
+            return self._scan(rel, st, previous.get(rel))
+
+        for rel, st, (record, status) in scan_vault(self.root, load, workers=workers):
+            if record is None:
+                continue
+            notes[rel] = record
+            if status == "changed":
+                result["updated" if rel in self.notes else "added"].append(rel)
+            else:
+                result["unchanged"] += 1
+                touched = touched or status == "touched"
+
+        result["added"].sort()
+        result["updated"].sort()
+        result["removed"] = sorted(set(self.notes) - set(notes))
+        missing = not self.path.exists()
+        dirty = (rebuild or touched or result["added"] or result["updated"]
+                 or result["removed"] or missing)
+        if not missing or self._legacy:
+            # The first build is the journal's baseline, not a batch of creations
+            append_events(self.root, catalog_events(self.notes, notes, result))
+        if dirty:
+            self.notes = notes
+            self.save()
+        elif self._file is None:
+            self.notes = notes
+        result["seconds"] = time.perf_counter() - start
+        return result
+
+    def update_paths(self, paths: Iterable[str], save: bool = True) -> Dict[str, Any]:
+        """Re-check only the given notes, e.g. those reported by a file watcher.
+
+        Paths that no longer exist on disk are removed from the catalog.
+
+        Returns:
+            dict in the same shape as ``refresh``
+        """
+        start = time.perf_counter()
+        result = {"added": [], "updated": [], "removed": [], "unchanged": 0}
+        before: Dict[str, Dict[str, Any]] = {}
+        touched = False
+        for rel in sorted(set(paths)):
+            old = self.notes.get(rel)
+            if old is not None:
+                before[rel] = old
+            try:
+                st = os.stat(self.root / rel)
+            except OSError:
+                st = None
+            record, status = (None, "missing") if st is None else self._scan(rel, st, old)
+            if record is None:
+                if old is not None:
+                    del self.notes[rel]
+                    result["removed"].append(rel)
+                continue
+            self.notes[rel] = record
+            if status == "changed":
+                result["updated" if old is not None else "added"].append(rel)
+            else:
+                result["unchanged"] += 1
+                touched = touched or status == "touched"
+        append_events(self.root, catalog_events(before, self.notes, result))
+        if save and (touched or result["added"] or result["updated"] or result["removed"]):
+            self.save()
+        result["seconds"] = time.perf_counter() - start
+        return result
+
+    def __len__(self) -> int:
+        return len(self.notes)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.notes)
+
+    def get(self, rel_path: str) -> Optional[Dict[str, Any]]:
+        return self.notes.get(rel_path)
+
+    def tagged(self, tag: str) -> List[str]:
+        """Paths of the notes tagged ``tag``.
+
+        Answered from the file's posting list while the catalog is unchanged
+        since it was mapped, else by a scan.
+        """
+        notes = self.notes
+        if isinstance(notes, CatalogNotes) and not notes.modified:
+            paths = notes.file.paths()
+            return [paths[i] for i in notes.file.tagged(tag)]
+        return [path for path, record in notes.items() if tag in record["tags"]]
+
+    def tag_counts(self, tags: Iterable[str]) -> Dict[str, int]:
+        """Number of notes carrying each of ``tags``.
+
+        Read from the posting lists' lengths while the catalog is unchanged
+        since it was mapped, else counted in one scan.
+        """
+        notes = self.notes
+        if isinstance(notes, CatalogNotes) and not notes.modified:
+            return {tag: notes.file.tag_count(tag) for tag in tags}
+        counts = {tag: 0 for tag in tags}
+        for _, record in notes.items():
+            for tag in record["tags"]:
+                if tag in counts:
+                    counts[tag] += 1
+        return counts
+
+
+def refresh_catalog(root: Path, rebuild: bool = False) -> Catalog:
+    """Load a vault's catalog and bring it up to date.
+
+    While a ``slatekore watch`` daemon keeps the catalog current, the stat
+    sweep over the vault is skipped (unless ``rebuild`` is requested).
+    """
+    catalog = Catalog.load(root)
+    if rebuild or not watcher_running(root) or not catalog.path.exists():
+        catalog.refresh(rebuild=rebuild)
+    return catalog
@@ -1,158 +1,153 @@
 """Vault initialization logic for Slatekore."""
 
-import shutil
+import json
 from pathlib import Path
 from importlib import resources
+from typing import Dict, List, Tuple
 
-# Vault folder structure to create
-VAULT_FOLDERS = [
-    "00-Inbox/papers",
-    "00-Inbox/repos",
-    "00-Inbox/models",
-    "00-Inbox/datasets",
-    "00-Inbox/spaces",
-    "00-Inbox/websites",
-    "01-Projects",
-    "02-Papers",
-    "03-Codebases",
-    "04-Concepts",
-    "05-Books",
-    "06-Resources/pdfs/papers",
-    "06-Resources/pdfs/books",
-    "06-Resources/pdfs/reports",
-    "06-Resources/videos",
-    "06-Resources/datasets",
-    "06-Resources/models",
-    "07-Daily",
-    "08-Maps",
-    "09-Models",
-    "10-Implementations",
-    "11-Datasets",
-    "12-Websites",
-]
-
-
-def initialize_vault(target_path: Path, force: bool = False) -> dict:
+from . import __version__
+# Vault folder structure to create; defined in ``vault`` so that the
+# indexing commands can use it without loading the templates below
+from .vault import VAULT_FOLDERS, atomic_write_bytes, state_path
+
+TEMPLATES_DIR = ".obsidian/templates"
+WORKFLOWS_DIR = ".agent/workflows"
+
+# Shipped content of every file init installed (in .slatekore/), the
+# common ancestor ``slatekore upgrade`` merges customizations against
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+
+# Prefix of each shipped file in init's report, by directory
+_ICONS = {TEMPLATES_DIR: "📄", WORKFLOWS_DIR: "📋", "": "📝"}
+
+
+def initialize_vault(target_path: Path, force: bool = False, dry_run: bool = False) -> dict:
     """Initialize an Obsidian vault with Slatekore structure.
     
+    Every write is planned before anything is touched. Files whose content
+    already matches what slatekore ships are left alone (so re-running init
+    changes no mtimes), the rest are written via a temp file and rename, so
+    an interrupted init never leaves a half-written template.
+    
     Args:
         target_path: Path to the vault directory
-        force: If True, overwrite existing files
+        force: If True, overwrite existing files that differ
+        dry_run: Only report what would be done
         
     Returns:
-        dict with 'created' and 'skipped' lists
+        dict with 'created', 'updated' (overwritten with --force),
+        'unchanged' (already up to date) and 'skipped' (customized, kept)
+        lists, and whether it was a 'dry_run'
     """
-    result = {"created": [], "skipped": []}
-    
-    # Ensure target exists
-    target_path.mkdir(parents=True, exist_ok=True)
-    
-    # 1. Create folder structure
-    for folder in VAULT_FOLDERS:
-        folder_path = target_path / folder
-        if not folder_path.exists():
-            folder_path.mkdir(parents=True, exist_ok=True)
-            result["created"].append(f"📁 {folder}")
-    
-    # 2. Create .obsidian/templates directory
-    templates_dir = target_path / ".obsidian" / "templates"
-    templates_dir.mkdir(parents=True, exist_ok=True)
-    
-    # 3. Copy template files
-    _copy_templates(target_path, force, result)
-    
-    # 4. Create GEMINI.md (main agent config)
-    _create_gemini_config(target_path, force, result)
-    
-    # 5. Create .agent/workflows directory
-    _create_workflows(target_path, force, result)
+    target_path = Path(target_path)
+    folders, writes, synced, result = plan_init(target_path, force)
+    result["dry_run"] = dry_run
+    if dry_run:
+        return result
     
+    # Create every missing directory up front, parents before children
+    for folder in folders:
+        (target_path / folder).mkdir(parents=True, exist_ok=True)
+    for rel, data in writes:
+        atomic_write_bytes(target_path / rel, data)
+    record_manifest(target_path, synced)
     return result
 
 
-def _copy_templates(target_path: Path, force: bool, result: dict):
-    """Copy all templates to .obsidian/templates/."""
-    templates_dir = target_path / ".obsidian" / "templates"
+def plan_init(target_path: Path, force: bool = False) -> Tuple[List[str], List[Tuple[str, bytes]], List[str], dict]:
+    """Work out what ``initialize_vault`` has to do, without writing.
     
-    # Get templates from package
-    try:
-        templates_pkg = resources.files("slatekore.templates.obsidian_templates")
-        
-        for template_file in templates_pkg.iterdir():
-            if template_file.name.endswith(".md"):
-                dest = templates_dir / template_file.name
-                
-                if dest.exists() and not force:
-                    result["skipped"].append(f"📄 .obsidian/templates/{template_file.name}")
-                else:
-                    content = template_file.read_text()
-                    dest.write_text(content)
-                    result["created"].append(f"📄 .obsidian/templates/{template_file.name}")
-    except Exception:
-        # Fallback: templates not bundled, create from inline
-        _create_inline_templates(templates_dir, force, result)
-
-
-def _create_inline_templates(templates_dir: Path, force: bool, result: dict):
-    """Create templates inline if package resources not available."""
-    templates = {
-        "paper_template.md": PAPER_TEMPLATE,
-        "model_template.md": MODEL_TEMPLATE,
-        "repo_template.md": REPO_TEMPLATE,
-        "space_template.md": SPACE_TEMPLATE,
-        "dataset_template.md": DATASET_TEMPLATE,
-        "website_template.md": WEBSITE_TEMPLATE,
-        "video_template.md": VIDEO_TEMPLATE,
-        "project_template.md": PROJECT_TEMPLATE,
-        "prd_template.md": PRD_TEMPLATE,
-        "system-design_template.md": SYSTEM_DESIGN_TEMPLATE,
-        "daily_template.md": DAILY_TEMPLATE,
-        "moc_template.md": MOC_TEMPLATE,
-    }
+    Returns:
+        the missing directories (relative, sorted), the files to write as
+        ``(relative path, content)`` pairs, the files that will then match
+        what slatekore ships, and the report
+    """
+    from .index import content_hash
+    result = {"created": [], "updated": [], "unchanged": [], "skipped": []}
+    synced = []
+    shipped = shipped_files()
     
-    for name, content in templates.items():
-        dest = templates_dir / name
-        if dest.exists() and not force:
-            result["skipped"].append(f"📄 .obsidian/templates/{name}")
-        else:
-            dest.write_text(content)
-            result["created"].append(f"📄 .obsidian/templates/{name}")
-
-
-def _create_gemini_config(target_path: Path, force: bool, result: dict):
-    """Create GEMINI.md in vault root."""
-    gemini_path = target_path / "GEMINI.md"
+    directories = set(VAULT_FOLDERS)
+    directories.update(rel.rsplit("/", 1)[0] for rel in shipped if "/" in rel)
+    folders = sorted(d for d in directories if not (target_path / d).is_dir())
+    reported = set(VAULT_FOLDERS)
+    result["created"] += [f"📁 {folder}" for folder in folders if folder in reported]
     
-    if gemini_path.exists() and not force:
-        result["skipped"].append("📝 GEMINI.md")
-    else:
-        gemini_path.write_text(GEMINI_CONFIG)
-        result["created"].append("📝 GEMINI.md")
+    writes = []
+    for rel, content in shipped.items():
+        data = content.encode("utf-8")
+        label = f"{_ICONS[rel.rsplit('/', 1)[0] if '/' in rel else '']} {rel}"
+        try:
+            existing = (target_path / rel).read_bytes()
+        except (FileNotFoundError, NotADirectoryError):
+            result["created"].append(label)
+            writes.append((rel, data))
+            synced.append(rel)
+            continue
+        if len(existing) == len(data) and content_hash(existing) == content_hash(data):
+            result["unchanged"].append(label)
+            synced.append(rel)
+        elif force:
+            result["updated"].append(label)
+            writes.append((rel, data))
+            synced.append(rel)
+        else:
+            result["skipped"].append(label)
+    return folders, writes, synced, result
 
 
-def _create_workflows(target_path: Path, force: bool, result: dict):
-    """Create .agent/workflows/ directory with workflow files."""
-    workflows_dir = target_path / ".agent" / "workflows"
-    workflows_dir.mkdir(parents=True, exist_ok=True)
-    
-    workflows = {
-        "capture.md": WORKFLOW_CAPTURE,
-        "summarize.md": WORKFLOW_SUMMARIZE,
-        "daily-setup.md": WORKFLOW_DAILY_SETUP,
-        "daily-digest.md": WORKFLOW_DAILY_DIGEST,
-        "explore.md": WORKFLOW_EXPLORE,
-        "connect.md": WORKFLOW_CONNECT,
-        "moc-create.md": WORKFLOW_MOC_CREATE,
-        "project-create.md": WORKFLOW_PROJECT_CREATE,
-    }
-    
-    for name, content in workflows.items():
-        dest = workflows_dir / name
-        if dest.exists() and not force:
-            result["skipped"].append(f"📋 .agent/workflows/{name}")
-        else:
-            dest.write_text(content)
-            result["created"].append(f"📋 .agent/workflows/{name}")
+def load_manifest(root: Path) -> Dict[str, Dict[str, str]]:
+    """Return the manifest's entries: path -> {'hash', 'text'} as shipped."""
+    try:
+        data = json.loads(state_path(root, MANIFEST_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data.get("files", {})
+
+
+def save_manifest(root: Path, files: Dict[str, Dict[str, str]]):
+    payload = {"version": MANIFEST_VERSION, "slatekore": __version__, "files": dict(sorted(files.items()))}
+    atomic_write_bytes(state_path(root, MANIFEST_FILE, create=True),
+                       json.dumps(payload, indent=1, ensure_ascii=False).encode("utf-8"))
+
+
+def record_manifest(root: Path, paths: List[str]):
+    """Record the shipped content of files that now match it (written only
+    if an entry changed)."""
+    from .index import content_hash
+    shipped = shipped_files()
+    files = load_manifest(root)
+    changed = False
+    for rel in paths:
+        content = shipped[rel]
+        entry = {"hash": content_hash(content.encode("utf-8")), "text": content}
+        if files.get(rel) != entry:
+            files[rel] = entry
+            changed = True
+    if changed:
+        save_manifest(root, files)
+
+
+def shipped_files() -> Dict[str, str]:
+    """Return the files init installs, by path relative to the vault."""
+    files = {f"{TEMPLATES_DIR}/{name}": content for name, content in _template_files().items()}
+    files["GEMINI.md"] = GEMINI_CONFIG
+    files.update((f"{WORKFLOWS_DIR}/{name}", content) for name, content in WORKFLOWS.items())
+    return files
+
+
+def _template_files() -> Dict[str, str]:
+    """Templates bundled with the package, or the inline ones below."""
+    try:
+        templates_pkg = resources.files("slatekore.templates.obsidian_templates")
+        bundled = {f.name: f.read_text() for f in templates_pkg.iterdir() if f.name.endswith(".md")}
+    except Exception:
+        # Fallback: templates not bundled, use the inline ones
+        bundled = {}
+    return bundled or dict(INLINE_TEMPLATES)
 
 
 # ============================================================================
@@ -1251,3 +1246,30 @@ When creating a project, ALWAYS create all 6 items:
 **NEVER** create just project.md and ask "what next?"
 **ALWAYS** create complete structure in one operation.
 '''
+
+
+INLINE_TEMPLATES = {
+    "paper_template.md": PAPER_TEMPLATE,
+    "model_template.md": MODEL_TEMPLATE,
+    "repo_template.md": REPO_TEMPLATE,
+    "space_template.md": SPACE_TEMPLATE,
+    "dataset_template.md": DATASET_TEMPLATE,
+    "website_template.md": WEBSITE_TEMPLATE,
+    "video_template.md": VIDEO_TEMPLATE,
+    "project_template.md": PROJECT_TEMPLATE,
+    "prd_template.md": PRD_TEMPLATE,
+    "system-design_template.md": SYSTEM_DESIGN_TEMPLATE,
+    "daily_template.md": DAILY_TEMPLATE,
+    "moc_template.md": MOC_TEMPLATE,
+}
+
+WORKFLOWS = {
+    "capture.md": WORKFLOW_CAPTURE,
+    "summarize.md": WORKFLOW_SUMMARIZE,
+    "daily-setup.md": WORKFLOW_DAILY_SETUP,
+    "daily-digest.md": WORKFLOW_DAILY_DIGEST,
+    "explore.md": WORKFLOW_EXPLORE,
+    "connect.md": WORKFLOW_CONNECT,
+    "moc-create.md": WORKFLOW_MOC_CREATE,
+    "project-create.md": WORKFLOW_PROJECT_CREATE,
+}
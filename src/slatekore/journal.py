@@ -0,0 +1,231 @@
+"""Append-only change journal of a vault's notes.
+
+Every catalog update (the stat sweep run by query commands, ``slatekore
+watch``, and commands that write notes) appends one JSON line per change
+to ``.slatekore/journal.jsonl``:
+
+    {"t": 1760774400.5, "op": "create", "path": "02-Papers/attention.md",
+     "type": "paper", "title": "Attention Is All You Need", "mtime": 1760774399.1}
+
+``op`` is ``create``, ``modify``, ``rename`` (with the old path in
+``from``) or ``delete``. ``t`` is when the change was recorded and
+``mtime`` when the note was last written, so a change an outside editor
+made before the next sweep is still dated correctly. Entries are appended
+in ``t`` order, which lets readers stop at the first entry older than
+what they need: answering "what changed today" reads only the tail of the
+journal. The journal is rotated to ``journal.1.jsonl`` once it exceeds
+``JOURNAL_MAX_BYTES``.
+"""
+
+import datetime
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from .vault import state_path
+
+JOURNAL_FILE = "journal.jsonl"
+ROTATED_FILE = "journal.1.jsonl"
+
+# Size at which the journal is rotated
+JOURNAL_MAX_BYTES = 16 * 1024 * 1024
+
+# Digest sections (the categories of the /daily-digest workflow) by note type
+DIGEST_GROUPS = {
+    "paper": "papers",
+    "model": "models",
+    "repo": "code",
+    "space": "code",
+    "dataset": "datasets",
+}
+
+# Bytes read per step when scanning the journal backwards
+_BLOCK = 64 * 1024
+
+_DURATION = re.compile(r"^(\d+(?:\.\d+)?)\s*([mhdw])$")
+_DURATION_SECONDS = {"m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+
+def catalog_events(before: Dict[str, Dict[str, Any]], after: Dict[str, Dict[str, Any]],
+                   result: Dict[str, Any], now: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Turn a catalog update into journal entries.
+
+    Args:
+        before: Records before the update (at least the updated and removed paths)
+        after: Records after the update (at least the added and updated paths)
+        result: The 'added', 'updated' and 'removed' lists of the update
+        now: Time the change is recorded at (default: now)
+
+    A removed note and an added note with the same content are recorded as
+    a rename. Updates that did not change the content hash (a forced
+    rebuild) are not recorded.
+    """
+    now = round(time.time() if now is None else now, 3)
+
+    def entry(op: str, path: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        event = {"t": now, "op": op, "path": path, "type": record["type"], "title": record["title"]}
+        if op != "delete":
+            event["mtime"] = round(record["mtime"] / 1e9, 3)
+        return event
+
+    events = []
+    removed = {}
+    for path in result["removed"]:
+        removed.setdefault(before[path]["hash"], []).append(path)
+    for path in result["added"]:
+        record = after[path]
+        sources = removed.get(record["hash"])
+        if sources:
+            event = entry("rename", path, record)
+            event["from"] = sources.pop(0)
+            events.append(event)
+        else:
+            events.append(entry("create", path, record))
+    for path in result["updated"]:
+        old = before.get(path)
+        if old is None or old["hash"] != after[path]["hash"]:
+            events.append(entry("modify", path, after[path]))
+    for sources in removed.values():
+        for path in sources:
+            events.append(entry("delete", path, before[path]))
+    return events
+
+
+def append_events(root: Path, events: List[Dict[str, Any]]):
+    """Append entries to a vault's journal (rotating it when it is full)."""
+    if not events:
+        return
+    path = state_path(root, JOURNAL_FILE, create=True)
+    data = "".join(json.dumps(e, ensure_ascii=False, separators=(",", ":")) + "\n" for e in events)
+    try:
+        if path.stat().st_size > JOURNAL_MAX_BYTES:
+            os.replace(path, state_path(root, ROTATED_FILE))
+    except OSError:
+        pass
+    # A single O_APPEND write, so concurrent writers never interleave lines
+    fd = os.open(str(path), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, data.encode("utf-8"))
+    finally:
+        os.close(fd)
+
+
+def _reverse_lines(path: Path) -> Iterator[bytes]:
+    """Yield the lines of a file from last to first, reading it backwards."""
+    try:
+        fh = open(path, "rb")
+    except OSError:
+        return
+    with fh:
+        position = fh.seek(0, os.SEEK_END)
+        rest = b""
+        while position > 0:
+            step = min(_BLOCK, position)
+            position -= step
+            fh.seek(position)
+            lines = (fh.read(step) + rest).split(b"\n")
+            rest = lines.pop(0)
+            for line in reversed(lines):
+                if line:
+                    yield line
+        if rest:
+            yield rest
+
+
+def read_events(root: Path, since: float = 0.0) -> List[Dict[str, Any]]:
+    """Return the journal entries recorded at or after ``since``, oldest first.
+
+    Only the tail of the journal is read: scanning stops at the first entry
+    recorded before ``since``.
+    """
+    events = []
+    for name in (JOURNAL_FILE, ROTATED_FILE):
+        for line in _reverse_lines(state_path(root, name)):
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if event["t"] < since:
+                events.reverse()
+                return events
+            events.append(event)
+    events.reverse()
+    return events
+
+
+def parse_since(value: str, now: Optional[float] = None) -> float:
+    """Turn 'today', 'yesterday', YYYY-MM-DD or a duration (30m, 12h, 7d, 2w)
+    into a timestamp.
+
+    Raises:
+        ValueError: for anything else
+    """
+    now = time.time() if now is None else now
+    value = value.strip().lower()
+    today = datetime.datetime.fromtimestamp(now).date()
+    if value in ("today", "yesterday"):
+        day = today - datetime.timedelta(days=value == "yesterday")
+    else:
+        duration = _DURATION.match(value)
+        if duration:
+            return now - float(duration.group(1)) * _DURATION_SECONDS[duration.group(2)]
+        day = datetime.date.fromisoformat(value)
+    return datetime.datetime.combine(day, datetime.time()).timestamp()
+
+
+def build_digest(root: Path, since: float) -> Dict[str, Any]:
+    """Summarize the notes created, modified, renamed and deleted since a time.
+
+    Reads only the journal tail (see ``read_events``); a note's changes are
+    collapsed, so a note created and then edited counts once, as created,
+    and a note created and deleted in the window is left out.
+
+    Returns:
+        dict with 'since', the number of journal 'events' read, the
+        'created', 'modified', 'renamed' and 'deleted' notes (``{path,
+        type, title}`` dicts; renames also carry 'from') and 'groups', the
+        created or modified paths per digest section ('papers', 'models',
+        'code', 'datasets', 'other')
+    """
+    events = read_events(root, since)
+    notes: Dict[str, Dict[str, Any]] = {}
+    deleted: Dict[str, Dict[str, Any]] = {}
+    for event in events:
+        op, path = event["op"], event["path"]
+        if op in ("create", "modify") and event["mtime"] < since:
+            continue
+        note = {"path": path, "type": event["type"], "title": event["title"]}
+        previous = notes.pop(event.get("from", path), None)
+        if op == "delete":
+            if previous is None or previous["status"] != "created":
+                deleted[path] = note
+            continue
+        if previous is not None:
+            # A note keeps the status it entered the window with
+            note["status"] = previous["status"]
+            if "from" in previous:
+                note["from"] = previous["from"]
+        elif op == "rename":
+            note.update(status="renamed", **{"from": event["from"]})
+        else:
+            note["status"] = "created" if op == "create" else "modified"
+        deleted.pop(path, None)
+        notes[path] = note
+
+    digest: Dict[str, Any] = {
+        "since": datetime.datetime.fromtimestamp(since).isoformat(timespec="minutes"),
+        "events": len(events),
+        "created": [],
+        "modified": [],
+        "renamed": [],
+        "deleted": [deleted[path] for path in sorted(deleted)],
+        "groups": {name: [] for name in ("papers", "models", "code", "datasets", "other")},
+    }
+    for path in sorted(notes):
+        note = notes[path]
+        digest[note.pop("status")].append(note)
+        digest["groups"][DIGEST_GROUPS.get(note["type"], "other")].append(path)
+    return digest
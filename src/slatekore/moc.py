@@ -0,0 +1,424 @@
+"""Map of Content suggestions (``slatekore moc suggest``).
+
+WORKFLOW_MOC_CREATE asks for 8+ related notes before a MOC is created.
+This module finds those groups: it runs weighted label propagation, a
+near-linear community detection algorithm, with a modularity resolution
+(so a few dense topics do not swallow the vault) over a graph of the
+vault's notes whose edges are
+
+* wikilinks, weighted up by the tag co-occurrence (IDF-weighted, as in
+  ``slatekore.related``) and text similarity (MinHash) of their ends;
+* the precomputed related-notes lists, which connect notes with similar
+  text and tags that do not link to each other yet.
+
+Daily notes and existing MOCs are left out, as are links of hub notes
+(they would glue unrelated topics together), and the tags templates put
+on every note of a type (#paper, #to-read, #prd) count neither for
+similarity nor for naming a community. Communities of at least
+``MIN_CLUSTER`` notes that no note in ``08-Maps/`` already covers (links to
+half of them) are suggested, each with a MOC_TEMPLATE skeleton listing its
+notes by section.
+
+Needs NumPy, like ``slatekore related``.
+"""
+
+import math
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+from .graph import LinkGraph
+from .index import Catalog, refresh_catalog
+from .related import MAX_BUCKET, WEIGHTS, RelatedIndex, _require_numpy
+from .frontmatter import normalize_tag
+from .render import TEMPLATES, default_values, fill_section, get_template
+from .router import sanitize_filename
+from .vault import note_name
+
+# Folder holding the Maps of Content
+MOC_FOLDER = "08-Maps"
+
+# Notes a community needs before it is worth a MOC
+MIN_CLUSTER = 8
+
+# A MOC linking to this share of a community's notes already covers it
+COVERAGE = 0.5
+
+# Weight of a wikilink, on top of its tag and text similarity
+LINK_WEIGHT = 1.0
+
+# Note types that are hubs rather than topic notes
+EXCLUDED_TYPES = frozenset({"daily", "moc"})
+
+# Reading-status tags; with the note types and the tags the templates
+# declare, they say what a note is rather than what it is about
+STATUS_TAGS = frozenset({"read", "reading", "to-read", "to-review", "to-explore", "to-watch", "done", "todo"})
+
+# Modularity resolution of label propagation: higher values give smaller
+# communities
+RESOLUTION = 1.0
+
+# A community without a topic tag whose notes are nearly all of one type
+# is held together by its template, not its subject, and is not suggested
+TYPE_SHARE = 0.9
+
+# Label propagation stops after this many rounds, or once fewer than
+# CONVERGED of the notes changed label
+MAX_ROUNDS = 30
+CONVERGED = 0.001
+
+# Skeleton sections by note type (papers are split by year)
+SECTIONS = {
+    "concept": "## Core Concepts",
+    "model": "## Models & Implementations",
+    "space": "## Models & Implementations",
+    "repo": "## Code Resources",
+    "dataset": "## Datasets",
+}
+
+
+def label_propagation(n: int, u: "np.ndarray", v: "np.ndarray", w: "np.ndarray",
+                      resolution: float = RESOLUTION, seed: int = 1337) -> "np.ndarray":
+    """Weighted label propagation over an undirected graph.
+
+    Every round, a random half of the nodes move to the neighbouring label
+    that most increases modularity: the edge weight ``w(i, L)`` to the
+    label's nodes less ``resolution * k(i) * K(L) / 2m``, where ``k(i)``
+    is the node's weighted degree and ``K(L)`` the label's (ties go to the
+    smallest label; a node stays unless a move is strictly better). Plain
+    label propagation lets one label flood densely connected graphs such
+    as the related-notes lists; the volume penalty stops a community from
+    growing past its topic. Updating half the nodes at a time avoids the
+    oscillations of fully synchronous rounds. Rounds are vectorized, so
+    100k notes with a million edges cluster in about two seconds.
+
+    Args:
+        n: Number of nodes
+        u, v, w: Edge endpoints and weights, one entry per undirected edge
+        resolution: Larger values give smaller communities (0 is plain
+            label propagation)
+
+    Returns:
+        ``int64[n]`` community label of each node
+    """
+    labels = np.arange(n, dtype=np.int64)
+    if not len(u):
+        return labels
+    src = np.concatenate([u, v]).astype(np.int64)
+    dst = np.concatenate([v, u]).astype(np.int64)
+    # Weights quantized to 16 bits ride in the low bits of the sort key, so
+    # each round is one plain sort of (node, neighbour label, weight) keys
+    weight = np.concatenate([w, w]).astype(np.float64)
+    weight = np.maximum(1, np.rint(weight * (0xFFFF / max(weight.max(), 1e-9)))).astype(np.int64)
+    degree = np.bincount(dst, weights=weight, minlength=n)
+    total = float(weight.sum())
+    rng = np.random.RandomState(seed)
+    for _ in range(MAX_ROUNDS):
+        keys = np.sort(((dst * n + labels[src]) << 16) | weight)
+        groups = keys >> 16
+        starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+        totals = np.add.reduceat(keys & 0xFFFF, starts).astype(np.float64)
+        node, label = groups[starts] // n, groups[starts] % n
+        # Modularity gain of each (node, neighbouring label); a node's own
+        # label is scored without the node's own degree
+        volume = np.bincount(labels, weights=degree, minlength=n)
+        own = label == labels[node]
+        gain = totals - resolution * degree[node] * (volume[label] - own * degree[node]) / total
+        stay = -resolution * degree * (volume[labels] - degree) / total
+        stay[node[own]] = gain[own]
+        # Per node, the best label (the smallest one among equals)
+        first = np.flatnonzero(np.r_[True, node[1:] != node[:-1]])
+        highest = np.repeat(np.maximum.reduceat(gain, first), np.diff(np.r_[first, len(node)]))
+        candidates = np.flatnonzero(gain == highest)
+        chosen = candidates[np.r_[True, node[candidates][1:] != node[candidates][:-1]]]
+        chosen = chosen[gain[chosen] > stay[node[chosen]]]
+        best = labels.copy()
+        best[node[chosen]] = label[chosen]
+        moved = (rng.rand(n) < 0.5) & (best != labels)
+        labels[moved] = best[moved]
+        if moved.sum() < CONVERGED * n:
+            break
+    return labels
+
+
+def type_tags(root: Optional[Path] = None) -> Set[str]:
+    """Tags that name a note's type or status rather than its topic."""
+    tags = set(STATUS_TAGS) | set(TEMPLATES) | EXCLUDED_TYPES
+    for note_type in TEMPLATES:
+        tags.update(normalize_tag(t) for t in get_template(root, note_type).tags)
+    return tags
+
+
+def _tag_counts(catalog: Catalog, paths: List[str], ignore: Set[str] = frozenset()
+                ) -> Tuple[List[Set[str]], Dict[str, int]]:
+    """Return each note's tags (less ``ignore``) and the number of notes
+    carrying each tag."""
+    tags = [set(catalog.get(p)["tags"]) - ignore for p in paths]
+    counts: Dict[str, int] = {}
+    for note_tags in tags:
+        for tag in note_tags:
+            counts[tag] = counts.get(tag, 0) + 1
+    return tags, counts
+
+
+def note_edges(catalog: Catalog, graph: LinkGraph, related: RelatedIndex, ignore: Set[str] = frozenset()
+               ) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """Build the weighted, undirected note graph clustering runs on.
+
+    Node ids are positions in ``related.paths``; tags in ``ignore`` do not
+    count towards tag similarity. Returns ``(u, v, w)`` with ``u < v`` and
+    one entry per connected pair.
+    """
+    paths = related.paths
+    n = len(paths)
+    ids = {p: i for i, p in enumerate(paths)}
+    keep = np.array([catalog.get(p)["type"] not in EXCLUDED_TYPES for p in paths], dtype=bool)
+    tags, counts = _tag_counts(catalog, paths, ignore)
+    idf = {t: math.log(1 + n / c) for t, c in counts.items()}
+
+    # Wikilinks between kept notes, without the links of hubs
+    rows: List[List[int]] = [[] for _ in range(n)]
+    for node_id, path in enumerate(graph.nodes):
+        i = ids.get(path)
+        if i is None or graph.hashes[node_id] is None or not keep[i]:
+            continue
+        for target in graph.outlinks_of(node_id):
+            j = ids.get(graph.nodes[target])
+            if j is not None and keep[j]:
+                rows[i].append(j)
+    degree = np.zeros(n, dtype=np.int64)
+    for i, row in enumerate(rows):
+        degree[i] += len(row)
+        for j in row:
+            degree[j] += 1
+    pairs = list({(min(i, j), max(i, j)) for i, row in enumerate(rows) if degree[i] <= MAX_BUCKET
+                  for j in row if degree[j] <= MAX_BUCKET and i != j})
+    link_u = np.fromiter((p[0] for p in pairs), dtype=np.int64, count=len(pairs))
+    link_v = np.fromiter((p[1] for p in pairs), dtype=np.int64, count=len(pairs))
+
+    # Tag co-occurrence and text similarity of each link's ends
+    tag_sim = np.zeros(len(pairs))
+    for e, (i, j) in enumerate(pairs):
+        shared = tags[i] & tags[j]
+        if shared:
+            tag_sim[e] = sum(idf[t] for t in shared) / sum(idf[t] for t in tags[i] | tags[j])
+    signatures = related.signatures
+    empty = (signatures == 0xFFFFFFFF).all(axis=1)
+    text_sim = (signatures[link_u] == signatures[link_v]).mean(axis=1) if len(pairs) else np.zeros(0)
+    text_sim[empty[link_u] | empty[link_v]] = 0.0
+    link_w = LINK_WEIGHT + WEIGHTS["tags"] * tag_sim + WEIGHTS["text"] * text_sim
+
+    # Related-notes lists
+    k = related.neighbours.shape[1]
+    rel_u = np.repeat(np.arange(n, dtype=np.int64), k)
+    rel_v = related.neighbours.ravel().astype(np.int64)
+    rel_w = related.scores.ravel().astype(np.float64)
+    valid = rel_v >= 0
+    valid[valid] &= keep[rel_u[valid]] & keep[rel_v[valid]]
+    rel_u, rel_v, rel_w = rel_u[valid], rel_v[valid], rel_w[valid]
+    rel_u, rel_v = np.minimum(rel_u, rel_v), np.maximum(rel_u, rel_v)
+
+    # Sum the weights of pairs that are both linked and related
+    u = np.concatenate([link_u, rel_u])
+    v = np.concatenate([link_v, rel_v])
+    w = np.concatenate([link_w, rel_w])
+    keys, inverse = np.unique(u * max(n, 1) + v, return_inverse=True)
+    return keys // max(n, 1), keys % max(n, 1), np.bincount(inverse, weights=w)
+
+
+def _topic(members: List[str], catalog: Catalog, counts: Dict[str, int], n: int,
+           ignore: Set[str] = frozenset()) -> Tuple[str, List[str]]:
+    """Name a community after the tags most over-represented in it.
+
+    A tag scores its share of the community times the log of how much more
+    common it is there than in the vault; type and status tags (``ignore``,
+    e.g. #paper, #to-read) are never a topic. Tags scoring at least half
+    the best are returned with the name; without any, the community is
+    named after its most connected note and no tags are returned.
+    """
+    inside: Dict[str, int] = {}
+    for path in members:
+        for tag in catalog.get(path)["tags"]:
+            if tag not in ignore:
+                inside[tag] = inside.get(tag, 0) + 1
+    size = len(members)
+    scores = {t: c / size * math.log(c / size * n / counts[t]) for t, c in inside.items() if c >= 2}
+    ranked = sorted((t for t, score in scores.items() if score > 0), key=lambda t: (-scores[t], t))
+    if not ranked:
+        return catalog.get(members[0])["title"], []
+    ranked = [t for t in ranked if scores[t] >= scores[ranked[0]] / 2][:3]
+    name = ranked[0].rsplit("/", 1)[-1]
+    return name.replace("-", " ").replace("_", " ").title(), ranked
+
+
+def find_clusters(catalog: Catalog, graph: LinkGraph, related: RelatedIndex,
+                  min_size: int = MIN_CLUSTER, resolution: float = RESOLUTION,
+                  ignore: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+    """Detect communities of at least ``min_size`` notes.
+
+    Communities with no topic tag whose notes nearly all share one type
+    (``TYPE_SHARE``), e.g. every PRD, are left out.
+
+    Args:
+        resolution: See ``label_propagation``
+        ignore: Type and status tags (default: ``type_tags()``)
+
+    Returns:
+        Clusters, largest first, as dicts with the 'topic', its 'tags', the
+        member 'notes' (most connected first), the 'coverage' of the best
+        covering MOC and that MOC ('covered_by', or None)
+    """
+    if ignore is None:
+        ignore = type_tags()
+    paths = related.paths
+    n = len(paths)
+    u, v, w = note_edges(catalog, graph, related, ignore)
+    labels = label_propagation(n, u, v, w, resolution)
+    _, counts = _tag_counts(catalog, paths, ignore)
+
+    # Weight of each note's edges inside its community: its centrality
+    inside = labels[u] == labels[v]
+    strength = (np.bincount(u[inside], weights=w[inside], minlength=n)
+                + np.bincount(v[inside], weights=w[inside], minlength=n))
+    _, inverse, sizes = np.unique(labels, return_inverse=True, return_counts=True)
+    groups: Dict[int, List[int]] = {}
+    for i in np.flatnonzero(sizes[inverse] >= min_size).tolist():
+        groups.setdefault(int(inverse[i]), []).append(i)
+
+    mocs = {}
+    for path, record in catalog.notes.items():
+        if record["type"] == "moc" or path.startswith(MOC_FOLDER + "/"):
+            try:
+                mocs[path] = set(graph.outlinks(path))
+            except KeyError:
+                mocs[path] = set()
+
+    clusters = []
+    for members in groups.values():
+        members.sort(key=lambda i: (-strength[i], paths[i]))
+        notes = [paths[i] for i in members]
+        topic, tags = _topic(notes, catalog, counts, n, ignore)
+        if not tags:
+            types: Dict[str, int] = {}
+            for path in notes:
+                note_type = catalog.get(path)["type"]
+                types[note_type] = types.get(note_type, 0) + 1
+            if max(types.values()) >= TYPE_SHARE * len(notes):
+                continue
+        coverage, covered_by = 0.0, None
+        member_set = set(notes)
+        for moc, linked in mocs.items():
+            share = len(linked & member_set) / len(member_set)
+            if share > coverage:
+                coverage, covered_by = share, moc
+        clusters.append({
+            "topic": topic,
+            "tags": tags,
+            "notes": notes,
+            "coverage": round(coverage, 3),
+            "covered_by": covered_by,
+        })
+    clusters.sort(key=lambda c: (-len(c["notes"]), c["topic"]))
+    return clusters
+
+
+def _link(path: str, catalog: Catalog) -> str:
+    name = note_name(path)
+    title = catalog.get(path)["title"]
+    return f"- [[{name}]] - {title}" if title and title != name else f"- [[{name}]] - "
+
+
+def moc_skeleton(root: Path, cluster: Dict[str, Any], catalog: Catalog) -> str:
+    """Render a MOC_TEMPLATE skeleton listing a cluster's notes by section."""
+    plan = get_template(root, "moc")
+    fields = {"topic": cluster["topic"]}
+    text = plan.render(dict(default_values(), topic=cluster["topic"]), fields, cluster["tags"])
+
+    sections: Dict[str, List[str]] = {}
+    papers: List[Tuple[int, str]] = []
+    queue, other = [], []
+    for path in cluster["notes"]:
+        record = catalog.get(path)
+        if record["type"] == "paper":
+            year = record["frontmatter"].get("year")
+            papers.append((year if isinstance(year, int) else 9999, path))
+            if "to-read" in record["tags"]:
+                queue.append(_link(path, catalog))
+        elif record["type"] in SECTIONS:
+            sections.setdefault(SECTIONS[record["type"]], []).append(_link(path, catalog))
+        else:
+            other.append(f"- [[{note_name(path)}]]")
+
+    papers.sort()
+    half = (len(papers) + 1) // 2
+    sections["### Foundational"] = [_link(p, catalog) for _, p in papers[:half]]
+    sections["### Recent Advances"] = [_link(p, catalog) for _, p in papers[half:]]
+    sections["### Reading Queue"] = queue
+    years: Dict[int, List[str]] = {}
+    for year, path in papers:
+        if year != 9999:
+            years.setdefault(year, []).append(f"[[{note_name(path)}]]")
+    if years:
+        sections["## Evolution Timeline"] = (["| Year | Development |", "|------|-------------|"]
+                                             + [f"| {y} | {', '.join(links)} |" for y, links in sorted(years.items())])
+    for heading, lines in sections.items():
+        text = fill_section(text, heading, lines, replace=True)
+    related = [f"- [[{note_name(cluster['covered_by'])}]]"] if cluster["covered_by"] else ["- "]
+    text = fill_section(text, "## Related Topics", related, replace=True)
+    return fill_section(text, "## Resources", other)
+
+
+def suggest_mocs(root: Path, min_size: int = MIN_CLUSTER, limit: Optional[int] = 10,
+                 coverage: float = COVERAGE, resolution: float = RESOLUTION) -> Dict[str, Any]:
+    """Refresh the indexes and suggest MOCs for uncovered clusters.
+
+    Returns:
+        dict with the number of 'clusters' found and the 'suggestions':
+        clusters (see ``find_clusters``) no MOC covers, each with the
+        'path' to create (unique among the vault's notes and the other
+        suggestions) and its 'skeleton' text
+    """
+    _require_numpy()
+    catalog = refresh_catalog(root)
+    graph = LinkGraph.load(root)
+    graph.update(catalog)
+    related = RelatedIndex.load(root)
+    related.update(catalog, graph)
+    clusters = find_clusters(catalog, graph, related, min_size, resolution, type_tags(root))
+    suggestions = [c for c in clusters if c["coverage"] < coverage][:limit]
+    taken = {p.lower() for p in catalog.notes}
+    for cluster in suggestions:
+        stem = path = f"{MOC_FOLDER}/{sanitize_filename(cluster['topic'])}"
+        n = 2
+        while f"{path}.md".lower() in taken:
+            path = f"{stem}-{n}"
+            n += 1
+        cluster["path"] = f"{path}.md"
+        taken.add(cluster["path"].lower())
+        cluster["skeleton"] = moc_skeleton(root, cluster, catalog)
+    return {"clusters": len(clusters), "suggestions": suggestions}
+
+
+def write_mocs(root: Path, suggestions: List[Dict[str, Any]]) -> List[str]:
+    """Create the suggested MOC notes that do not exist yet.
+
+    Returns:
+        Paths of the notes created
+    """
+    created = []
+    for cluster in suggestions:
+        target = root / cluster["path"]
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            with open(target, "x", encoding="utf-8") as fh:
+                fh.write(cluster["skeleton"])
+        except FileExistsError:
+            continue
+        created.append(cluster["path"])
+    if created:
+        Catalog.load(root).update_paths(created)
+    return created
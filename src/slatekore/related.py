@@ -0,0 +1,471 @@
+"""Precomputed related-notes engine behind WORKFLOW_CONNECT.
+
+Each note is described by three signals:
+
+* text: a MinHash signature of the distinct content words of its body
+  (headings, template prompts and stopwords excluded), so that the share of
+  equal signature slots estimates the Jaccard overlap of two notes' words;
+* tags: IDF-weighted overlap of their tags;
+* links: cosine overlap of their link neighbourhoods (outlinks and
+  backlinks), i.e. notes citing or cited by the same notes.
+
+Candidates come from LSH buckets over the signatures, shared (non-generic)
+tags and shared link neighbours, and are scored with NumPy. The top-k list
+of every note is stored under ``.slatekore/related/`` and updated
+incrementally: only notes whose content or links changed, and the notes
+whose lists they touch, are re-scored. Tag weights of untouched lists are
+refreshed on the next rebuild, which happens once a quarter of the vault
+has changed.
+
+NumPy is an optional dependency: ``pip install "slatekore[similarity]"``.
+"""
+
+import itertools
+import json
+import math
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+from .frontmatter import SCAFFOLD_LINE, split_frontmatter
+from .graph import LinkGraph
+from .index import Catalog, refresh_catalog
+from .search import tokenize
+from .vault import atomic_write_bytes, note_name, state_path
+
+RELATED_DIR = "related"
+RELATED_VERSION = 1
+
+# Neighbours kept per note, and the weights of the three signals
+TOP_K = 10
+WEIGHTS = {"text": 0.5, "tags": 0.3, "links": 0.2}
+MIN_SCORE = 0.05
+
+# MinHash signature of NUM_PERM slots, split into BANDS bands for LSH
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+_PRIME = 4294967311
+
+# Buckets, tags and link hubs larger than this are too generic to suggest
+# connections (e.g. #paper, or a MOC linking to hundreds of notes)
+MAX_BUCKET = 200
+
+# Rebuild from scratch instead of patching when this share of notes changed
+REBUILD_FRACTION = 0.25
+
+STOPWORDS = frozenset("""
+a about above after again all also an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from
+further had has have having here how if in into is it its itself just more most my no
+nor not now of off on once only or other our out over own same should so some such
+than that the their them then there these they this those through to too under until
+up very was we were what when where which while who whom why will with would you your
+""".split())
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError(
+            "Related notes need NumPy. Install it with: pip install \"slatekore[similarity]\""
+        )
+
+
+def content_terms(body: str) -> Set[str]:
+    """Return the distinct content words of a note body."""
+    body = SCAFFOLD_LINE.sub(" ", body)
+    # Long notes repeat most words: tokenize each distinct chunk once
+    terms: Set[str] = set()
+    for chunk in set(body.split()):
+        terms.update(tokenize(chunk))
+    terms -= STOPWORDS
+    return {t for t in terms if len(t) > 2 and not t.isdigit()}
+
+
+_PERMUTATIONS = None
+
+
+def _permutations():
+    global _PERMUTATIONS
+    if _PERMUTATIONS is None:
+        rng = np.random.RandomState(1337)
+        _PERMUTATIONS = (
+            rng.randint(1, 2 ** 31, NUM_PERM).astype(np.uint64),
+            rng.randint(0, 2 ** 31, NUM_PERM).astype(np.uint64),
+        )
+    return _PERMUTATIONS
+
+
+def minhash(terms: Set[str]) -> "np.ndarray":
+    """Return the MinHash signature (``uint32[NUM_PERM]``) of a set of terms.
+
+    Empty sets get an all-ones signature, which callers treat as "no text".
+    """
+    if not terms:
+        return np.full(NUM_PERM, 0xFFFFFFFF, dtype=np.uint32)
+    a, b = _permutations()
+    x = np.fromiter((zlib.crc32(t.encode("utf-8")) for t in terms), dtype=np.uint64, count=len(terms))
+    hashed = (np.outer(x, a) + b) % np.uint64(_PRIME)
+    return (hashed.min(axis=0) & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+
+def _band_hashes(signatures: "np.ndarray") -> "np.ndarray":
+    """Collapse each band of ROWS signature slots into one uint64 key."""
+    mult = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9,
+                     0x27D4EB2F165667C5][:ROWS], dtype=np.uint64)
+    bands = signatures.astype(np.uint64).reshape(len(signatures), BANDS, ROWS)
+    return (bands * mult).sum(axis=2, dtype=np.uint64)
+
+
+class _Buckets:
+    """LSH buckets: notes sorted by band key, one column per band.
+
+    The bucket of note ``i`` in band ``b`` is
+    ``order[start[pos, b]:end[pos, b], b]`` with ``pos = rank[i, b]``, so
+    candidate lookup costs BANDS slices instead of a scan of the vault.
+    """
+
+    def __init__(self, signatures: "np.ndarray"):
+        bands = _band_hashes(signatures)
+        n = len(bands)
+        self.order = np.argsort(bands, axis=0, kind="stable")
+        ordered = np.take_along_axis(bands, self.order, axis=0)
+        positions = np.broadcast_to(np.arange(n)[:, None], (n, BANDS))
+        first = np.ones((n, BANDS), dtype=bool)
+        first[1:] = ordered[1:] != ordered[:-1]
+        last = np.ones((n, BANDS), dtype=bool)
+        last[:-1] = first[1:]
+        self.start = np.maximum.accumulate(np.where(first, positions, 0), axis=0)
+        self.end = np.minimum.accumulate(np.where(last, positions, n - 1)[::-1], axis=0)[::-1] + 1
+        self.rank = np.empty((n, BANDS), dtype=np.int64)
+        np.put_along_axis(self.rank, self.order, positions, axis=0)
+
+    def members(self, i: int) -> Set[int]:
+        found: Set[int] = set()
+        for band in range(BANDS):
+            pos = self.rank[i, band]
+            start, end = self.start[pos, band], self.end[pos, band]
+            if 1 < end - start <= MAX_BUCKET:
+                found.update(self.order[start:end, band].tolist())
+        return found
+
+
+class _Rows:
+    """Sparse 0/1 matrix in CSR form: row ``i`` sets the columns
+    ``cols[ptr[i]:ptr[i + 1]]``."""
+
+    def __init__(self, rows: List[Any]):
+        self.counts = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
+        self.ptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(self.counts, out=self.ptr[1:])
+        self.cols = np.fromiter(itertools.chain.from_iterable(rows), dtype=np.int64,
+                                count=int(self.ptr[-1]))
+
+    def row(self, i: int) -> "np.ndarray":
+        return self.cols[self.ptr[i]:self.ptr[i + 1]]
+
+    def dot(self, ids: "np.ndarray", vector: "np.ndarray") -> "np.ndarray":
+        """Product of the rows ``ids`` with a dense ``vector``."""
+        counts = self.counts[ids]
+        offsets = np.repeat(self.ptr[ids] - (np.cumsum(counts) - counts), counts)
+        flat = self.cols[offsets + np.arange(offsets.size)]
+        owner = np.repeat(np.arange(len(ids)), counts)
+        return np.bincount(owner, weights=vector[flat], minlength=len(ids))
+
+
+class RelatedIndex:
+    """Top-k related notes for every note of a vault."""
+
+    def __init__(self, root: Path):
+        _require_numpy()
+        self.root = Path(root)
+        self.paths: List[str] = []
+        self.hashes: List[str] = []
+        # crc32 of each note's link neighbourhood, to spot link-only changes
+        self.link_hashes: List[int] = []
+        self.signatures = np.zeros((0, NUM_PERM), dtype=np.uint32)
+        self.neighbours = np.full((0, TOP_K), -1, dtype=np.int32)
+        self.scores = np.zeros((0, TOP_K), dtype=np.float32)
+        self._ids: Dict[str, int] = {}
+        # Per-update state
+        self._tags: List[Set[str]] = []
+        self._tag_notes: Dict[str, List[int]] = {}
+        self._links: List[Set[int]] = []
+        # The same tags and links as sparse rows, for scoring candidate
+        # blocks: per-tag IDF, each note's total tag weight and link count,
+        # and zeroed scratch vectors over tags and notes
+        self._tag_rows = None
+        self._link_rows = None
+        self._idf = None
+        self._tag_mass = None
+        self._weights = None
+        self._marked = None
+        self._buckets = None
+        self._empty = None
+
+    @property
+    def directory(self) -> Path:
+        return state_path(self.root, RELATED_DIR)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def load(cls, root: Path) -> "RelatedIndex":
+        """Load a vault's related-notes index (empty if never built)."""
+        index = cls(root)
+        directory = index.directory
+        try:
+            meta = json.loads((directory / "meta.json").read_bytes())
+            if meta.get("version") != RELATED_VERSION or meta.get("k") != TOP_K:
+                return index
+            signatures = np.load(directory / "signatures.npy")
+            neighbours = np.load(directory / "neighbours.npy")
+            scores = np.load(directory / "scores.npy")
+            paths, hashes, link_hashes = meta["paths"], meta["hashes"], meta["links"]
+        except (OSError, ValueError, KeyError):
+            return index
+        if not (len(signatures) == len(neighbours) == len(scores) == len(paths)):
+            return index
+        index.paths, index.hashes, index.link_hashes = paths, hashes, link_hashes
+        index.signatures, index.neighbours, index.scores = signatures, neighbours, scores
+        index._ids = {p: i for i, p in enumerate(index.paths)}
+        return index
+
+    def save(self):
+        """Persist the index (arrays first, metadata last)."""
+        directory = self.directory
+        directory.mkdir(parents=True, exist_ok=True)
+        for name, values in (("signatures", self.signatures), ("neighbours", self.neighbours),
+                             ("scores", self.scores)):
+            with open(directory / f"{name}.npy.tmp", "wb") as fh:
+                np.save(fh, values)
+            (directory / f"{name}.npy.tmp").replace(directory / f"{name}.npy")
+        meta = {"version": RELATED_VERSION, "k": TOP_K, "paths": self.paths, "hashes": self.hashes,
+                "links": self.link_hashes}
+        atomic_write_bytes(directory / "meta.json", json.dumps(meta).encode("utf-8"))
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def update(self, catalog: Catalog, graph: LinkGraph) -> Dict[str, int]:
+        """Bring the top-k lists up to date with the catalog.
+
+        Returns:
+            dict with the 'changed' note count and the number of lists
+            're-scored'
+        """
+        old_ids = self._ids
+        paths = sorted(catalog.notes)
+        ids = {p: i for i, p in enumerate(paths)}
+        changed = [p for p in paths if p not in old_ids
+                   or self.hashes[old_ids[p]] != catalog.get(p)["hash"]]
+        removed = [p for p in old_ids if p not in ids]
+        if not changed and not removed and self.directory.exists():
+            return {"changed": 0, "rescored": 0}
+
+        # Carry over signatures and lists of unchanged notes under new ids
+        n = len(paths)
+        signatures = np.zeros((n, NUM_PERM), dtype=np.uint32)
+        neighbours = np.full((n, TOP_K), -1, dtype=np.int32)
+        scores = np.zeros((n, TOP_K), dtype=np.float32)
+        remap = np.full(len(self.paths) + 1, -1, dtype=np.int32)
+        for p, old in old_ids.items():
+            if p in ids:
+                remap[old] = ids[p]
+        for p in paths:
+            old = old_ids.get(p)
+            if old is not None:
+                signatures[ids[p]] = self.signatures[old]
+                neighbours[ids[p]] = remap[self.neighbours[old]]
+                scores[ids[p]] = self.scores[old]
+        for p in changed:
+            signatures[ids[p]] = minhash(self._read_terms(p))
+
+        old_links = {p: self.link_hashes[i] for p, i in old_ids.items()}
+        self.paths, self._ids = paths, ids
+        self.hashes = [catalog.get(p)["hash"] for p in paths]
+        self.signatures, self.neighbours, self.scores = signatures, neighbours, scores
+        self._prepare(catalog, graph)
+
+        # Notes whose content changed, or whose links did (e.g. the target
+        # of a link that was added or removed elsewhere)
+        changed_ids = {ids[p] for p in changed}
+        changed_ids.update(i for i, p in enumerate(paths) if old_links.get(p) != self.link_hashes[i])
+        if not old_ids or len(changed_ids) + len(removed) > REBUILD_FRACTION * max(n, 1):
+            dirty = set(range(n))
+        else:
+            # Changed notes and notes whose lists lost or hold a changed entry
+            dirty = set(changed_ids)
+            lost = (self.neighbours == -1) & (self.scores > 0)
+            holds = np.isin(self.neighbours, list(changed_ids)) if changed_ids else lost
+            dirty.update(np.flatnonzero(lost.any(axis=1) | holds.any(axis=1)).tolist())
+
+        for i in dirty:
+            self._rescore(i)
+        # Notes outside the dirty set may now rank a changed note highly
+        for i in (changed_ids if len(dirty) < n else ()):
+            for score, j in self._score(i, self._candidates(i)):
+                if j not in dirty:
+                    self._offer(j, i, score)
+        self.save()
+        return {"changed": len(changed) + len(removed), "rescored": len(dirty)}
+
+    def _read_terms(self, path: str) -> Set[str]:
+        try:
+            text = (self.root / path).read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            return set()
+        _, body = split_frontmatter(text)
+        return content_terms(body)
+
+    def _prepare(self, catalog: Catalog, graph: LinkGraph):
+        """Build the per-update lookup tables for tags and links."""
+        n = len(self.paths)
+        self._tags = [set(catalog.get(p)["tags"]) for p in self.paths]
+        self._tag_notes = {}
+        for i, tags in enumerate(self._tags):
+            for tag in tags:
+                self._tag_notes.setdefault(tag, []).append(i)
+        columns = {t: k for k, t in enumerate(self._tag_notes)}
+        self._idf = np.array([math.log(1 + n / len(ids)) for ids in self._tag_notes.values()])
+        self._tag_rows = _Rows([[columns[t] for t in tags] for tags in self._tags])
+        self._tag_mass = self._tag_rows.dot(np.arange(n), self._idf)
+        self._weights = np.zeros(len(columns))
+
+        self._links = []
+        self.link_hashes = []
+        for p in self.paths:
+            linked = graph.neighbours(p)
+            self._links.append({self._ids[q] for q in linked if q in self._ids})
+            self.link_hashes.append(zlib.crc32("\n".join(sorted(linked)).encode("utf-8")))
+        self._link_rows = _Rows(self._links)
+        self._marked = np.zeros(n)
+
+        self._buckets = _Buckets(self.signatures)
+        self._empty = (self.signatures == 0xFFFFFFFF).all(axis=1)
+
+    def _candidates(self, i: int) -> Set[int]:
+        """Notes sharing an LSH bucket, a specific tag or a link neighbour."""
+        candidates: Set[int] = set()
+        if not self._empty[i]:
+            candidates.update(j for j in self._buckets.members(i) if not self._empty[j])
+        for tag in self._tags[i]:
+            notes = self._tag_notes.get(tag, ())
+            if len(notes) <= MAX_BUCKET:
+                candidates.update(notes)
+        for j in self._links[i]:
+            if len(self._links[j]) <= MAX_BUCKET:
+                candidates.update(self._links[j])
+        candidates.discard(i)
+        candidates.difference_update(self._links[i])
+        return candidates
+
+    def _score(self, i: int, candidates: Set[int]) -> List[Tuple[float, int]]:
+        if not candidates:
+            return []
+        ids = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        text = (self.signatures[ids] == self.signatures[i]).mean(axis=1)
+        text[self._empty[ids] | self._empty[i]] = 0.0
+        score = WEIGHTS["text"] * text
+        tags_i = self._tag_rows.row(i)
+        if tags_i.size:
+            # IDF mass of the shared tags over that of the union
+            self._weights[tags_i] = self._idf[tags_i]
+            shared = self._tag_rows.dot(ids, self._weights)
+            self._weights[tags_i] = 0.0
+            score += WEIGHTS["tags"] * shared / (self._tag_mass[i] + self._tag_mass[ids] - shared)
+        links_i = self._link_rows.row(i)
+        if links_i.size:
+            # Cosine of the link neighbourhoods
+            self._marked[links_i] = 1.0
+            common = self._link_rows.dot(ids, self._marked)
+            self._marked[links_i] = 0.0
+            degrees = np.maximum(self._link_rows.counts[ids], 1)
+            score += WEIGHTS["links"] * common / np.sqrt(links_i.size * degrees)
+        keep = np.flatnonzero(score >= MIN_SCORE)
+        return list(zip(score[keep].tolist(), ids[keep].tolist()))
+
+    def _rescore(self, i: int):
+        best = sorted(self._score(i, self._candidates(i)), key=lambda s: (-s[0], s[1]))[:TOP_K]
+        self.neighbours[i] = -1
+        self.scores[i] = 0.0
+        for slot, (score, j) in enumerate(best):
+            self.neighbours[i, slot] = j
+            self.scores[i, slot] = score
+
+    def _offer(self, i: int, j: int, score: float):
+        """Insert ``j`` into the list of ``i`` if it ranks in the top k."""
+        row, values = self.neighbours[i], self.scores[i]
+        entries = [(float(values[s]), int(row[s])) for s in range(TOP_K) if row[s] >= 0 and row[s] != j]
+        entries.append((score, j))
+        entries = sorted(entries, key=lambda s: (-s[0], s[1]))[:TOP_K]
+        row[:] = -1
+        values[:] = 0.0
+        for slot, (value, k) in enumerate(entries):
+            row[slot] = k
+            values[slot] = value
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def related(self, path: str, k: int = 5) -> List[Tuple[str, float]]:
+        """Return up to ``k`` ``(path, score)`` pairs related to a note."""
+        i = self._ids[path]
+        return [(self.paths[j], round(float(s), 4))
+                for j, s in zip(self.neighbours[i][:k].tolist(), self.scores[i][:k].tolist()) if j >= 0]
+
+    def reason(self, a: str, b: str, catalog: Catalog, graph: LinkGraph) -> str:
+        """Explain in a few words why two notes are related."""
+        reasons = []
+        shared = set(catalog.get(a)["tags"]) & set(catalog.get(b)["tags"])
+        if shared:
+            # Rarest tags say the most about the connection (counted from
+            # the catalog's posting lists, not by scanning every note)
+            counts = catalog.tag_counts(shared)
+            ranked = sorted(shared, key=lambda t: (counts[t], t))
+            reasons.append("shared tags " + ", ".join(f"#{t}" for t in ranked[:3]))
+        common = sorted(graph.neighbours(a) & graph.neighbours(b))
+        if common:
+            names = ", ".join(f"[[{note_name(p)}]]" for p in common[:3])
+            reasons.append(f"both connected to {names}")
+        sig_a, sig_b = self.signatures[self._ids[a]], self.signatures[self._ids[b]]
+        if not ((sig_a == 0xFFFFFFFF).all() or (sig_b == 0xFFFFFFFF).all()):
+            overlap = float((sig_a == sig_b).mean())
+            if overlap >= 0.1:
+                reasons.append(f"~{overlap:.0%} vocabulary overlap")
+        return "; ".join(reasons) or "weakly related"
+
+
+def related_notes(root: Path, note: str, k: int = 5) -> Dict[str, Any]:
+    """Refresh the indexes and return the notes related to ``note``.
+
+    Returns:
+        dict with the resolved 'note' path and its 'related' list of
+        ``{path, score, reason}`` dicts
+
+    Raises:
+        KeyError: if ``note`` does not name a note in the vault
+    """
+    _require_numpy()
+    catalog = refresh_catalog(root)
+    graph = LinkGraph.load(root)
+    graph.update(catalog)
+    index = RelatedIndex.load(root)
+    index.update(catalog, graph)
+    path = graph.nodes[graph.node(note)]
+    return {
+        "note": path,
+        "related": [
+            {"path": other, "score": score, "reason": index.reason(path, other, catalog, graph)}
+            for other, score in index.related(path, k)
+        ],
+    }
@@ -0,0 +1,128 @@
+"""URL router: where a captured URL goes in the vault.
+
+This is the URL detection table of GEMINI.md and the capture workflow,
+implemented once for every command (and agent) that needs it:
+
+    arxiv.org, huggingface.co/papers    paper    02-Papers/
+    huggingface.co/<org>/<model>        model    09-Models/
+    huggingface.co/spaces/              space    10-Implementations/
+    huggingface.co/datasets/            dataset  11-Datasets/
+    github.com/<owner>/<repo>           repo     03-Codebases/
+    youtube.com, youtu.be               video    06-Resources/videos/
+    anything else                       website  12-Websites/
+
+Routing reuses the identity keys of ``slatekore.identity``: a URL is
+canonicalized once and its key kind selects the route, so a routed URL and
+the duplicate check always agree on what the URL points to.
+"""
+
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from .identity import canonical_url
+
+# Key kind -> (note type, target folder, template)
+ROUTES = {
+    "arxiv": ("paper", "02-Papers", "paper_template.md"),
+    "hf-model": ("model", "09-Models", "model_template.md"),
+    "hf-space": ("space", "10-Implementations", "space_template.md"),
+    "hf-dataset": ("dataset", "11-Datasets", "dataset_template.md"),
+    "github": ("repo", "03-Codebases", "repo_template.md"),
+    "youtube": ("video", "06-Resources/videos", "video_template.md"),
+    "url": ("website", "12-Websites", "website_template.md"),
+}
+
+# Longest file name (without .md) produced for a note
+MAX_FILENAME = 80
+
+_APOSTROPHE = re.compile(r"['’]")
+_UNSAFE = re.compile(r"[^a-z0-9.]+")
+
+
+def sanitize_filename(title: str) -> str:
+    """Turn a title into a lowercase, dash-separated note file name."""
+    name = _UNSAFE.sub("-", _APOSTROPHE.sub("", title.lower())).strip("-.")
+    if len(name) > MAX_FILENAME:
+        name = name[:MAX_FILENAME].rsplit("-", 1)[0] or name[:MAX_FILENAME]
+    return name or "untitled"
+
+
+class Route:
+    """Where and how to capture one URL."""
+
+    __slots__ = ("url", "key", "type", "folder", "template", "filename")
+
+    def __init__(self, url: str, key: str, note_type: str, folder: str, template: str, filename: str):
+        self.url = url
+        self.key = key
+        self.type = note_type
+        self.folder = folder
+        self.template = template
+        self.filename = filename
+
+    @property
+    def path(self) -> str:
+        """Vault-relative path of the note to create."""
+        return f"{self.folder}/{self.filename}"
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "key": self.key,
+            "type": self.type,
+            "folder": self.folder,
+            "template": self.template,
+            "filename": self.filename,
+            "path": self.path,
+        }
+
+    def __repr__(self) -> str:
+        return f"Route({self.url!r} -> {self.path})"
+
+
+def route_url(url: str, title: Optional[str] = None) -> Route:
+    """Route a URL (or bare arXiv id) to its note type, folder and file name.
+
+    Args:
+        url: The URL to capture
+        title: Title of the source, if known. Papers, videos and websites
+            are filed under their sanitized title; without one, the arXiv
+            id, video id or URL path is used instead.
+    """
+    key = canonical_url(url)
+    kind, _, ident = key.partition(":")
+    note_type, folder, template = ROUTES[kind]
+    if kind in ("hf-model", "hf-space", "hf-dataset", "github"):
+        # {model-id}, {space-id}, ...: the repository name, without its owner
+        stem = ident.rsplit("/", 1)[-1]
+    elif title:
+        stem = title
+    else:
+        stem = ident.split("?", 1)[0].replace("/", " ")
+    return Route(url.strip(), key, note_type, folder, template, sanitize_filename(stem) + ".md")
+
+
+def route_batch(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Route a stream of URLs, one per line, yielding each route's ``as_dict()``.
+
+    Blank lines and ``#`` comments are skipped. A line may carry a title
+    after a tab (``url<TAB>title``). A URL that cannot be routed yields
+    ``{"url": ..., "error": ...}`` and the stream goes on.
+    """
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        url, _, title = line.partition("\t")
+        try:
+            yield route_url(url, title.strip() or None).as_dict()
+        except ValueError as e:
+            yield {"url": url.strip(), "error": str(e)}
+
+
+def routes_jsonl(lines: Iterable[str]) -> Iterator[str]:
+    """Route a stream of URLs and yield one JSON line per route (or error)."""
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    for route in route_batch(lines):
+        yield dumps(route)
@@ -0,0 +1,189 @@
+"""Parallel vault scanner shared by Slatekore's commands.
+
+Walking a vault one file at a time is dominated by per-file latency on
+network-mounted or encrypted home directories. ``scan_vault`` spreads the
+``os.scandir`` traversal and the per-note work (reading, hashing, parsing)
+over a pool of threads:
+
+* the vault is split into work units: one per subtree of ``VAULT_FOLDERS``,
+  one per project folder under ``01-Projects`` and one per other top-level
+  folder, plus shallow units for the vault root and intermediate folders;
+* while walking, a unit hands its subdirectories and large batches of
+  notes back to the pool, so deep or very flat folders are shared too;
+* results stream back through a bounded queue, so memory stays flat
+  however large the vault is.
+"""
+
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import Any, Callable, Iterator, List, Optional, Set, Tuple
+
+from .vault import VAULT_FOLDERS, list_dir
+
+# Worker threads per scan (override with SLATEKORE_SCAN_WORKERS)
+DEFAULT_WORKERS = min(16, (os.cpu_count() or 1) + 4)
+
+# Notes per unit of work, and result chunks buffered ahead of the consumer
+CHUNK_SIZE = 128
+QUEUE_SIZE = 64
+
+# Folders whose children each become a separate work unit
+SPLIT_FOLDERS = {"01-Projects"}
+
+ScanItem = Tuple[str, os.stat_result, Any]
+Loader = Callable[[str, os.stat_result], Any]
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def default_workers() -> int:
+    """Return the configured number of scanner threads."""
+    try:
+        return max(1, int(os.environ["SLATEKORE_SCAN_WORKERS"]))
+    except (KeyError, ValueError):
+        return DEFAULT_WORKERS
+
+
+def plan_units(root: Path) -> List[Tuple[str, bool]]:
+    """Split a vault into initial work units.
+
+    Returns:
+        List of ``(vault-relative directory, recursive)`` pairs
+    """
+    expand: Set[str] = {""} | SPLIT_FOLDERS
+    for folder in VAULT_FOLDERS:
+        parts = folder.split("/")
+        expand.update("/".join(parts[:i]) for i in range(1, len(parts)))
+
+    units: List[Tuple[str, bool]] = []
+    stack = [""]
+    while stack:
+        rel_dir = stack.pop()
+        units.append((rel_dir, False))
+        subdirs, _ = list_dir(root, rel_dir)
+        for sub in subdirs:
+            if sub in expand:
+                stack.append(sub)
+            else:
+                units.append((sub, True))
+    return units
+
+
+def scan_vault(root: Path, loader: Optional[Loader] = None, workers: Optional[int] = None,
+               subdir: str = "") -> Iterator[ScanItem]:
+    """Stream every note of a vault, in no particular order.
+
+    Args:
+        root: Vault directory
+        loader: Called as ``loader(rel_path, stat)`` on a worker thread; its
+            return value is yielded with the note. Notes for which it
+            raises ``OSError`` are skipped.
+        workers: Number of threads (defaults to ``default_workers()``)
+        subdir: Only scan this vault-relative directory
+
+    Yields:
+        ``(relative posix path, stat, loader result or None)``
+    """
+    workers = workers or default_workers()
+    units = [(subdir.strip("/"), True)] if subdir.strip("/") else plan_units(root)
+
+    tasks: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+    results: "queue.Queue[Any]" = queue.Queue(maxsize=QUEUE_SIZE)
+    cancel = threading.Event()
+    lock = threading.Lock()
+    pending = [len(units)]
+
+    def add_task(task):
+        with lock:
+            pending[0] += 1
+        tasks.put(task)
+
+    def finish_task():
+        with lock:
+            pending[0] -= 1
+            last = pending[0] == 0
+        if last:
+            for _ in range(workers):
+                tasks.put(None)
+
+    def emit(item) -> bool:
+        while not cancel.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def load(notes: List[Tuple[str, os.stat_result]]):
+        chunk = []
+        for rel, st in notes:
+            if cancel.is_set():
+                return
+            if loader is None:
+                chunk.append((rel, st, None))
+                continue
+            try:
+                chunk.append((rel, st, loader(rel, st)))
+            except OSError:
+                continue
+        if chunk:
+            emit(chunk)
+
+    def walk(rel_dir: str, recursive: bool):
+        subdirs, notes = list_dir(root, rel_dir)
+        if recursive:
+            for sub in subdirs:
+                add_task((sub, True))
+        # Hand all but the last batch of a large folder to other workers
+        while len(notes) > CHUNK_SIZE:
+            add_task(notes[:CHUNK_SIZE])
+            notes = notes[CHUNK_SIZE:]
+        load(notes)
+
+    def worker():
+        try:
+            while True:
+                task = tasks.get()
+                if task is None or cancel.is_set():
+                    break
+                try:
+                    if isinstance(task, list):
+                        load(task)
+                    else:
+                        walk(*task)
+                finally:
+                    finish_task()
+        except BaseException as error:  # surfaced on the consumer's thread
+            cancel.set()
+            results.put(_Failure(error))
+        finally:
+            emit(_DONE)
+
+    for unit in units:
+        tasks.put(unit)
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+
+    finished = 0
+    try:
+        while finished < workers:
+            item = results.get()
+            if item is _DONE:
+                finished += 1
+            elif isinstance(item, _Failure):
+                raise item.error
+            else:
+                yield from item
+    finally:
+        cancel.set()
+        for _ in range(workers):
+            tasks.put(None)
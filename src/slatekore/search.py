@@ -0,0 +1,626 @@
+"""BM25 full-text search over a Slatekore vault.
+
+The search index is an inverted index over note bodies (with term
+positions, for phrase queries) and titles. It is kept in sync with the
+catalog by content hash, so only notes that changed since the last query
+are re-tokenized.
+
+It lives in two parts:
+
+``.slatekore/search.bin``
+    the base segment, a store (see ``slatekore.store``) opened with
+    ``mmap``: a string table, fixed-width doc records, per-doc length
+    arrays, the term records sorted by term (each pointing at its slice of
+    the body and title posting lists) and the positions of every body
+    posting. A query binary-searches the terms it needs and reads only
+    their postings, so it costs about the same on any size of vault.
+
+``.slatekore/search.delta.json``
+    notes re-indexed since the base was written and the base docs they
+    replace. Once it holds more than ``MAX_DELTA`` changes it is merged
+    into a new base segment.
+
+Query syntax:
+
+    transformer attention       terms, ranked with BM25
+    "multi-head attention"      phrase: terms must appear adjacently
+    diffus*                     prefix: any term starting with 'diffus'
+"""
+
+import bisect
+import heapq
+import json
+import math
+import os
+import re
+import struct
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .frontmatter import split_frontmatter
+from .index import Catalog, refresh_catalog
+from .store import StringTable, Store, find_sorted, lower_bound, pack_records, write_store
+from .vault import atomic_write_bytes, folder_of, state_path, watcher_running
+
+SEARCH_FILE = "search.bin"
+SEARCH_MAGIC = b"SKSERCH1"
+SEARCH_VERSION = 2
+DELTA_FILE = "search.delta.json"
+# JSON index written by earlier versions, removed once a base is written
+LEGACY_SEARCH_FILE = "search.json"
+LEGACY_SEARCH_VERSION = 1
+
+# Re-indexed plus removed notes held in the delta before it is merged
+MAX_DELTA = 512
+
+# BM25 parameters and the extra weight given to title matches
+K1 = 1.2
+B = 0.75
+TITLE_WEIGHT = 2.0
+
+# path, title, type, folder (string refs); hash
+_DOC = struct.Struct("<8I16s")
+# term (string ref); body postings (start, count); title postings (start, count)
+_TERM = struct.Struct("<6I")
+
+_TOKEN = re.compile(r"\w+")
+_QUERY = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return _TOKEN.findall(text.lower())
+
+
+class SearchSegment:
+    """A mapped ``search.bin``.
+
+    Doc ids are record numbers. The body postings of a term are parallel
+    ``bodydocs``/``bodytf``/``bodypos`` slices (doc ids ascending); a
+    posting's positions are ``positions[pos:pos + tf]``.
+    """
+
+    def __init__(self, store: Store):
+        self.store = store
+        self.meta = json.loads(bytes(store.section("meta")))
+        self.docs = store.records("docs", _DOC)
+        self.lengths = store.array("lengths")
+        self.title_lengths = store.array("titlelengths")
+        self.terms = store.records("terms", _TERM)
+        self.body_docs = store.array("bodydocs")
+        self.body_tf = store.array("bodytf")
+        self.body_pos = store.array("bodypos")
+        self.positions = store.array("positions")
+        self.title_docs = store.array("titledocs")
+        self.title_tf = store.array("titletf")
+
+    @classmethod
+    def open(cls, path: Path) -> Optional["SearchSegment"]:
+        store = Store.open(path, SEARCH_MAGIC, SEARCH_VERSION)
+        return None if store is None else cls(store)
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def _term_key(self, i: int) -> bytes:
+        return self.store.raw("strings", self.terms[i][:2])
+
+    def term(self, term: str) -> Optional[tuple]:
+        """The record of a term, or None if no base doc contains it."""
+        i = find_sorted(len(self.terms), self._term_key, term.encode("utf-8"))
+        return None if i is None else self.terms[i]
+
+    def vocabulary(self, prefix: str = "") -> List[str]:
+        """Terms starting with ``prefix``, in order."""
+        key = prefix.encode("utf-8")
+        found = []
+        for i in range(lower_bound(len(self.terms), self._term_key, key), len(self.terms)):
+            raw = self._term_key(i)
+            if not raw.startswith(key):
+                break
+            found.append(raw.decode("utf-8"))
+        return found
+
+    def path(self, doc_id: int) -> str:
+        return self.store.text("strings", self.docs[doc_id][0:2])
+
+    def doc(self, doc_id: int) -> list:
+        """``[path, title, type, folder, hash]`` of a doc."""
+        row = self.docs[doc_id]
+        text = self.store.text
+        return [text("strings", row[0:2]), text("strings", row[2:4]), text("strings", row[4:6]),
+                text("strings", row[6:8]), row[8].hex()]
+
+    def body(self, record: tuple) -> Tuple[List[int], List[int]]:
+        start, count = record[2], record[3]
+        return self.body_docs[start:start + count].tolist(), self.body_tf[start:start + count].tolist()
+
+    def title(self, record: tuple) -> Tuple[List[int], List[int]]:
+        start, count = record[4], record[5]
+        return self.title_docs[start:start + count].tolist(), self.title_tf[start:start + count].tolist()
+
+    def doc_positions(self, record: tuple, doc_id: int) -> Optional[List[int]]:
+        start, end = record[2], record[2] + record[3]
+        i = bisect.bisect_left(self.body_docs, doc_id, start, end)
+        if i == end or self.body_docs[i] != doc_id:
+            return None
+        pos = self.body_pos[i]
+        return self.positions[pos:pos + self.body_tf[i]].tolist()
+
+
+class SearchIndex:
+    """Inverted index with BM25 ranking: a mapped base segment plus a delta.
+
+    Base docs keep their record number as doc id; delta docs are numbered
+    after them. ``docs`` holds the delta docs as ``[path, hash, length,
+    title_length, type, folder, title, terms]`` (``None`` for freed
+    slots); ``terms`` lists the distinct terms of the note so it can be
+    removed without a full sweep. ``postings`` maps a body term to ``{doc
+    id: [positions]}`` and ``titles`` maps a title term to ``{doc id: term
+    frequency}``, both for delta docs only. ``deleted`` holds the ids of
+    base docs that were removed or re-indexed.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.base: Optional[SearchSegment] = None
+        self.deleted: set = set()
+        self.docs: List[Optional[list]] = []
+        self.postings: Dict[str, Dict[int, List[int]]] = {}
+        self.titles: Dict[str, Dict[int, int]] = {}
+        self._doc_ids: Optional[Dict[str, int]] = None
+        self._free: List[int] = []
+        self._doc_count = 0
+        self._total_length = 0
+        self._total_title_length = 0
+
+    @property
+    def path(self) -> Path:
+        return state_path(self.root, SEARCH_FILE)
+
+    @property
+    def delta_path(self) -> Path:
+        return state_path(self.root, DELTA_FILE)
+
+    @property
+    def _offset(self) -> int:
+        return len(self.base) if self.base is not None else 0
+
+    @classmethod
+    def load(cls, root: Path) -> "SearchIndex":
+        """Map a vault's search index (empty if none has been built yet)."""
+        index = cls(root)
+        index.base = SearchSegment.open(index.path)
+        if index.base is None:
+            # An index from an earlier version has the layout of a delta
+            # over an empty base; the next update writes it out as one
+            path, version, base_id = state_path(root, LEGACY_SEARCH_FILE), LEGACY_SEARCH_VERSION, None
+        else:
+            path, version, base_id = index.delta_path, SEARCH_VERSION, index.base.meta["id"]
+        try:
+            data = json.loads(path.read_bytes())
+        except (OSError, ValueError):
+            data = {}
+        if data.get("version") == version and data.get("base") == base_id:
+            index.deleted = set(data.get("deleted", ()))
+            index.docs = data["docs"]
+            index.postings = {t: dict(p) for t, p in data["postings"].items()}
+            index.titles = {t: dict(p) for t, p in data["titles"].items()}
+        index._reset_stats()
+        return index
+
+    def save(self):
+        """Persist the delta atomically (the base is written by ``compact``)."""
+        if not self.deleted and not self.doc_count_delta():
+            try:
+                os.unlink(self.delta_path)
+            except OSError:
+                pass
+            return
+        payload = {
+            "version": SEARCH_VERSION,
+            "base": self.base.meta["id"],
+            "deleted": sorted(self.deleted),
+            "docs": self.docs,
+            "postings": {t: list(p.items()) for t, p in self.postings.items()},
+            "titles": {t: list(p.items()) for t, p in self.titles.items()},
+        }
+        atomic_write_bytes(self.delta_path, json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+
+    def doc_count_delta(self) -> int:
+        """Number of live docs in the delta."""
+        return len(self.docs) - len(self._free)
+
+    def _reset_stats(self):
+        self._doc_ids = None
+        self._free = [i for i, doc in enumerate(self.docs) if doc is None]
+        live = [doc for doc in self.docs if doc is not None]
+        self._doc_count = len(live)
+        self._total_length = sum(doc[2] for doc in live)
+        self._total_title_length = sum(doc[3] for doc in live)
+        if self.base is not None:
+            meta = self.base.meta
+            self._doc_count += len(self.base) - len(self.deleted)
+            self._total_length += meta["length"] - sum(self.base.lengths[d] for d in self.deleted)
+            self._total_title_length += (meta["title_length"]
+                                         - sum(self.base.title_lengths[d] for d in self.deleted))
+
+    @property
+    def doc_ids(self) -> Dict[str, int]:
+        """Map of every indexed path to its doc id (built on first use)."""
+        if self._doc_ids is None:
+            ids = {}
+            if self.base is not None:
+                for doc_id in range(len(self.base)):
+                    if doc_id not in self.deleted:
+                        ids[self.base.path(doc_id)] = doc_id
+            offset = self._offset
+            for i, doc in enumerate(self.docs):
+                if doc is not None:
+                    ids[doc[0]] = offset + i
+            self._doc_ids = ids
+        return self._doc_ids
+
+    def __len__(self) -> int:
+        return self._doc_count
+
+    def _doc(self, doc_id: int) -> list:
+        """``[path, title, type, folder, hash]`` of any doc."""
+        offset = self._offset
+        if doc_id < offset:
+            return self.base.doc(doc_id)
+        doc = self.docs[doc_id - offset]
+        return [doc[0], doc[6], doc[4], doc[5], doc[1]]
+
+    def _hash(self, doc_id: int) -> str:
+        offset = self._offset
+        return self.base.docs[doc_id][8].hex() if doc_id < offset else self.docs[doc_id - offset][1]
+
+    def _length(self, doc_id: int) -> int:
+        offset = self._offset
+        return self.base.lengths[doc_id] if doc_id < offset else self.docs[doc_id - offset][2]
+
+    def _title_length(self, doc_id: int) -> int:
+        offset = self._offset
+        return self.base.title_lengths[doc_id] if doc_id < offset else self.docs[doc_id - offset][3]
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def update(self, catalog: Catalog) -> Dict[str, int]:
+        """Re-index the notes whose catalog hash differs from the index.
+
+        Returns:
+            dict with 'indexed' and 'removed' counts
+        """
+        indexed = removed = 0
+        for path, doc_id in list(self.doc_ids.items()):
+            record = catalog.get(path)
+            if record is None:
+                self.remove(path)
+                removed += 1
+            elif record["hash"] != self._hash(doc_id):
+                self.remove(path)
+        for path, record in catalog.notes.items():
+            if path in self.doc_ids:
+                continue
+            try:
+                text = (self.root / path).read_text(encoding="utf-8", errors="replace")
+            except OSError:
+                continue
+            self.add(path, record, text)
+            indexed += 1
+        if self.base is None or len(self.deleted) + self.doc_count_delta() > MAX_DELTA:
+            self.compact()
+        elif indexed or removed:
+            self.save()
+        return {"indexed": indexed, "removed": removed}
+
+    def add(self, path: str, record: Dict[str, Any], text: str):
+        """Add a note to the index (in the delta)."""
+        _, body = split_frontmatter(text)
+        terms = tokenize(body)
+        title_terms = tokenize(record["title"])
+        slot = self._free.pop() if self._free else len(self.docs)
+        doc = [path, record["hash"], len(terms), len(title_terms), record["type"],
+               folder_of(path), record["title"], sorted(set(terms) | set(title_terms))]
+        if slot == len(self.docs):
+            self.docs.append(doc)
+        else:
+            self.docs[slot] = doc
+        doc_id = self._offset + slot
+        self.doc_ids[path] = doc_id
+        for position, term in enumerate(terms):
+            self.postings.setdefault(term, {}).setdefault(doc_id, []).append(position)
+        for term in title_terms:
+            entry = self.titles.setdefault(term, {})
+            entry[doc_id] = entry.get(doc_id, 0) + 1
+        self._doc_count += 1
+        self._total_length += len(terms)
+        self._total_title_length += len(title_terms)
+
+    def remove(self, path: str):
+        """Remove a note from the index."""
+        doc_id = self.doc_ids.pop(path)
+        self._doc_count -= 1
+        self._total_length -= self._length(doc_id)
+        self._total_title_length -= self._title_length(doc_id)
+        offset = self._offset
+        if doc_id < offset:
+            self.deleted.add(doc_id)
+            return
+        doc = self.docs[doc_id - offset]
+        for term in doc[7]:
+            for table in (self.postings, self.titles):
+                entry = table.get(term)
+                if entry is not None and entry.pop(doc_id, None) is not None and not entry:
+                    del table[term]
+        self.docs[doc_id - offset] = None
+        self._free.append(doc_id - offset)
+
+    def compact(self):
+        """Merge the delta into a new base segment and write it."""
+        base = self.base
+        offset = self._offset
+        renumber = {}
+        strings = StringTable()
+        docs = []
+        lengths = array("I")
+        title_lengths = array("I")
+        for doc_id in range(offset):
+            if doc_id not in self.deleted:
+                renumber[doc_id] = len(docs)
+                docs.append(base.doc(doc_id))
+                lengths.append(base.lengths[doc_id])
+                title_lengths.append(base.title_lengths[doc_id])
+        for i, doc in enumerate(self.docs):
+            if doc is not None:
+                renumber[offset + i] = len(docs)
+                docs.append([doc[0], doc[6], doc[4], doc[5], doc[1]])
+                lengths.append(doc[2])
+                title_lengths.append(doc[3])
+        doc_rows = [(*strings.add(path), *strings.add(title), *strings.add(note_type),
+                     *strings.add(folder), bytes.fromhex(digest))
+                    for path, title, note_type, folder, digest in docs]
+
+        vocabulary = sorted(set(base.vocabulary() if base is not None else ())
+                            | self.postings.keys() | self.titles.keys(), key=lambda t: t.encode("utf-8"))
+        terms = []
+        body_docs, body_tf, body_pos, positions = array("I"), array("I"), array("I"), array("I")
+        title_docs, title_tf = array("I"), array("I")
+        for term in vocabulary:
+            record = base.term(term) if base is not None else None
+            body_start, title_start = len(body_docs), len(title_docs)
+            if record is not None and record[3]:
+                start, count = record[2], record[3]
+                if not self.deleted:
+                    # Doc ids are unchanged: copy the postings as they are
+                    first = base.body_pos[start]
+                    last = base.body_pos[start + count - 1] + base.body_tf[start + count - 1]
+                    shift = len(positions) - first
+                    body_docs.frombytes(base.body_docs[start:start + count].tobytes())
+                    body_tf.frombytes(base.body_tf[start:start + count].tobytes())
+                    body_pos.extend([pos + shift for pos in base.body_pos[start:start + count].tolist()])
+                    positions.frombytes(base.positions[first:last].tobytes())
+                else:
+                    for i in range(start, start + count):
+                        new_id = renumber.get(base.body_docs[i])
+                        if new_id is None:
+                            continue
+                        pos, tf = base.body_pos[i], base.body_tf[i]
+                        body_docs.append(new_id)
+                        body_tf.append(tf)
+                        body_pos.append(len(positions))
+                        positions.frombytes(base.positions[pos:pos + tf].tobytes())
+            for doc_id, term_positions in sorted(self.postings.get(term, {}).items()):
+                body_docs.append(renumber[doc_id])
+                body_tf.append(len(term_positions))
+                body_pos.append(len(positions))
+                positions.extend(term_positions)
+            if record is not None:
+                for doc_id, tf in zip(*base.title(record)):
+                    if doc_id in renumber:
+                        title_docs.append(renumber[doc_id])
+                        title_tf.append(tf)
+            for doc_id, tf in sorted(self.titles.get(term, {}).items()):
+                title_docs.append(renumber[doc_id])
+                title_tf.append(tf)
+            body_count, title_count = len(body_docs) - body_start, len(title_docs) - title_start
+            if body_count or title_count:
+                terms.append((*strings.add(term), body_start, body_count, title_start, title_count))
+
+        meta = {"id": os.urandom(8).hex(), "docs": len(docs),
+                "length": sum(lengths), "title_length": sum(title_lengths)}
+        state_path(self.root, SEARCH_FILE, create=True)
+        write_store(self.path, SEARCH_MAGIC, SEARCH_VERSION, [
+            ("meta", json.dumps(meta).encode("utf-8")),
+            ("strings", bytes(strings.data)),
+            ("docs", pack_records(_DOC, doc_rows)),
+            ("lengths", lengths.tobytes()),
+            ("titlelengths", title_lengths.tobytes()),
+            ("terms", pack_records(_TERM, terms)),
+            ("bodydocs", body_docs.tobytes()),
+            ("bodytf", body_tf.tobytes()),
+            ("bodypos", body_pos.tobytes()),
+            ("positions", positions.tobytes()),
+            ("titledocs", title_docs.tobytes()),
+            ("titletf", title_tf.tobytes()),
+        ])
+        try:
+            os.unlink(state_path(self.root, LEGACY_SEARCH_FILE))
+        except OSError:
+            pass
+        self.base = SearchSegment.open(self.path)
+        self.deleted = set()
+        self.docs = []
+        self.postings = {}
+        self.titles = {}
+        self._reset_stats()
+        self.save()
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+
+    def _term_postings(self, term: str) -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
+        """``(doc id, term frequency)`` pairs of a term in bodies and in titles."""
+        body: List[Tuple[int, int]] = []
+        title: List[Tuple[int, int]] = []
+        record = self.base.term(term) if self.base is not None else None
+        if record is not None:
+            body = list(zip(*self.base.body(record)))
+            title = list(zip(*self.base.title(record)))
+            if self.deleted:
+                body = [p for p in body if p[0] not in self.deleted]
+                title = [p for p in title if p[0] not in self.deleted]
+        body += [(doc_id, len(positions)) for doc_id, positions in self.postings.get(term, {}).items()]
+        title += list(self.titles.get(term, {}).items())
+        return body, title
+
+    def search(self, query: str, note_type: Optional[str] = None,
+               folder: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """Run a query and return the best matching notes.
+
+        Args:
+            query: Terms, "quoted phrases" and prefix* patterns
+            note_type: Only return notes of this type (e.g. 'paper')
+            folder: Only return notes under this vault folder (e.g. '02-Papers')
+            limit: Maximum number of results
+
+        Returns:
+            List of result dicts ordered by descending score
+        """
+        terms, phrases = self._parse_query(query)
+        if not terms:
+            return []
+
+        doc_count = self._doc_count or 1
+        avg_length = (self._total_length / doc_count) or 1.0
+        avg_title = (self._total_title_length / doc_count) or 1.0
+        scores: Dict[int, float] = {}
+        matched: Dict[int, set] = {}
+
+        for term in terms:
+            body, title = self._term_postings(term)
+            df = len({d for d, _ in body} | {d for d, _ in title}) if title else len(body)
+            if not df:
+                continue
+            idf = math.log(1.0 + (doc_count - df + 0.5) / (df + 0.5))
+            for doc_id, tf in body:
+                norm = K1 * (1 - B + B * self._length(doc_id) / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+                matched.setdefault(doc_id, set()).add(term)
+            for doc_id, tf in title:
+                norm = K1 * (1 - B + B * self._title_length(doc_id) / avg_title)
+                boost = TITLE_WEIGHT * idf * tf * (K1 + 1) / (tf + norm)
+                scores[doc_id] = scores.get(doc_id, 0.0) + boost
+                matched.setdefault(doc_id, set()).add(term)
+
+        candidates = scores.keys()
+        for phrase in phrases:
+            candidates = [d for d in candidates if self._has_phrase(d, phrase)]
+
+        prefix = folder.strip("/") + "/" if folder else None
+        results = []
+        for doc_id in candidates:
+            if note_type or prefix:
+                doc = self._doc(doc_id)
+                if note_type and doc[2] != note_type:
+                    continue
+                if prefix and not doc[0].startswith(prefix):
+                    continue
+            results.append((scores[doc_id], doc_id))
+        best = heapq.nlargest(limit, results)
+        if best:
+            # Ties at the cutoff are broken by path, as for the rest
+            cutoff = best[-1][0]
+            best = [r for r in best if r[0] > cutoff] + [r for r in results if r[0] == cutoff]
+        docs = {doc_id: self._doc(doc_id) for _, doc_id in best}
+        best = sorted(best, key=lambda item: (-item[0], docs[item[1]][0]))[:limit]
+
+        return [
+            {
+                "path": docs[doc_id][0],
+                "title": docs[doc_id][1],
+                "type": docs[doc_id][2],
+                "folder": docs[doc_id][3],
+                "score": round(score, 4),
+                "matches": sorted(matched[doc_id]),
+            }
+            for score, doc_id in best
+        ]
+
+    def _parse_query(self, query: str) -> Tuple[List[str], List[List[str]]]:
+        """Expand a query into scoring terms and required phrases."""
+        terms: List[str] = []
+        phrases: List[List[str]] = []
+        for phrase, word in _QUERY.findall(query):
+            if phrase:
+                tokens = tokenize(phrase)
+                if len(tokens) > 1:
+                    phrases.append(tokens)
+                terms.extend(tokens)
+            elif word.endswith("*") and len(word) > 1:
+                terms.extend(self._expand_prefix(word[:-1].lower()))
+            else:
+                terms.extend(tokenize(word))
+        return list(dict.fromkeys(terms)), phrases
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        """Return every indexed term starting with ``prefix``."""
+        found = set(self.base.vocabulary(prefix)) if self.base is not None else set()
+        found.update(t for t in self.postings.keys() | self.titles.keys() if t.startswith(prefix))
+        return sorted(found)
+
+    def _positions(self, doc_id: int, term: str) -> Optional[List[int]]:
+        if doc_id >= self._offset:
+            return self.postings.get(term, {}).get(doc_id)
+        record = self.base.term(term)
+        return None if record is None else self.base.doc_positions(record, doc_id)
+
+    def _has_phrase(self, doc_id: int, phrase: List[str]) -> bool:
+        """Check whether the terms of ``phrase`` occur adjacently in a note."""
+        position_sets = []
+        for term in phrase:
+            positions = self._positions(doc_id, term)
+            if positions is None:
+                return False
+            position_sets.append(positions)
+        rest = [set(p) for p in position_sets[1:]]
+        return any(
+            all(start + offset + 1 in positions for offset, positions in enumerate(rest))
+            for start in position_sets[0]
+        )
+
+
+def load_search(root: Path) -> SearchIndex:
+    """Return a vault's search index, brought up to date with the vault.
+
+    While ``slatekore watch`` keeps the index current it is mapped as is,
+    without touching the catalog.
+    """
+    index = SearchIndex.load(root)
+    if watcher_running(root) and index.path.exists():
+        return index
+    index.update(refresh_catalog(root))
+    return index
+
+
+def search_vault(root: Path, query: str, note_type: Optional[str] = None,
+                 folder: Optional[str] = None, limit: int = 10) -> Dict[str, Any]:
+    """Bring the search index up to date, then run a query.
+
+    Returns:
+        dict with the 'query', its 'results' and the elapsed time in 'ms'
+    """
+    start = time.perf_counter()
+    index = load_search(root)
+    results = index.search(query, note_type=note_type, folder=folder, limit=limit)
+    return {
+        "query": query,
+        "results": results,
+        "ms": round((time.perf_counter() - start) * 1000, 2),
+    }
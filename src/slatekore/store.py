@@ -0,0 +1,174 @@
+"""Versioned, memory-mapped binary files for the on-disk indexes.
+
+Layout (little-endian):
+
+    magic       8 bytes naming the kind of file
+    version     uint32
+    count       uint32, number of sections
+    directory   count x (name: 16 bytes, offset: uint64, length: uint64)
+    sections    each starting on an 8-byte boundary
+
+Readers ``mmap`` the file and view sections in place, so opening one costs
+the same whatever its size and nothing is deserialized until it is read.
+Sections hold string tables (UTF-8 text referenced by ``(offset,
+length)`` pairs), fixed-width record arrays (read with ``struct``),
+``uint32`` arrays (viewed with ``memoryview.cast``) and posting lists or
+CSR adjacency built from them.
+
+Files are replaced atomically; a reader keeps seeing the version it
+mapped.
+"""
+
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from .vault import atomic_write_bytes
+
+_HEADER = struct.Struct("<8sII")
+_ENTRY = struct.Struct("<16sQQ")
+_ALIGN = 8
+
+
+class StringTable:
+    """Builder for a string table section (each distinct string stored once)."""
+
+    def __init__(self):
+        self.data = bytearray()
+        self._refs: Dict[bytes, Tuple[int, int]] = {}
+
+    def add(self, text: str) -> Tuple[int, int]:
+        """Store a string and return its ``(offset, length)``."""
+        return self.add_bytes(text.encode("utf-8"))
+
+    def add_bytes(self, raw: bytes) -> Tuple[int, int]:
+        ref = self._refs.get(raw)
+        if ref is None:
+            ref = self._refs[raw] = (len(self.data), len(raw))
+            self.data += raw
+        return ref
+
+
+def write_store(path: Path, magic: bytes, version: int, sections: Iterable[Tuple[str, bytes]]):
+    """Write a store file atomically."""
+    sections = list(sections)
+    offset = _HEADER.size + _ENTRY.size * len(sections)
+    directory = []
+    body = []
+    for name, data in sections:
+        padding = -offset % _ALIGN
+        body.append(b"\0" * padding)
+        offset += padding
+        directory.append(_ENTRY.pack(name.encode("ascii"), offset, len(data)))
+        body.append(data)
+        offset += len(data)
+    atomic_write_bytes(path, b"".join([_HEADER.pack(magic, version, len(sections))] + directory + body))
+
+
+class Store:
+    """A memory-mapped store file."""
+
+    def __init__(self, buffer, sections: Dict[str, Tuple[int, int]], stamp: str = ""):
+        self._buffer = buffer
+        self._view = memoryview(buffer)
+        self._sections = sections
+        #: Identity of the mapped file (inode, mtime, size); every save
+        #: replaces the file, so a new stamp means new contents
+        self.stamp = stamp
+
+    @classmethod
+    def open(cls, path: Path, magic: bytes, version: int) -> Optional["Store"]:
+        """Map a store file; None if it is missing, of another kind or
+        another version."""
+        try:
+            with open(path, "rb") as fh:
+                st = os.fstat(fh.fileno())
+                size = st.st_size
+                if size < _HEADER.size:
+                    return None
+                buffer = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        found, found_version, count = _HEADER.unpack_from(buffer, 0)
+        if found != magic or found_version != version or _HEADER.size + count * _ENTRY.size > size:
+            buffer.close()
+            return None
+        sections = {}
+        for i in range(count):
+            name, offset, length = _ENTRY.unpack_from(buffer, _HEADER.size + i * _ENTRY.size)
+            if offset + length > size:
+                buffer.close()
+                return None
+            sections[name.rstrip(b"\0").decode("ascii")] = (offset, length)
+        return cls(buffer, sections, f"{st.st_ino}:{st.st_mtime_ns}:{size}")
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._sections
+
+    def section(self, name: str) -> memoryview:
+        """Return a section's bytes (empty if the file has no such section)."""
+        if name not in self._sections:
+            return self._view[0:0]
+        offset, length = self._sections[name]
+        return self._view[offset:offset + length]
+
+    def array(self, name: str, typecode: str = "I") -> memoryview:
+        """View a section as an array of ``typecode`` items (``I``, ``Q``, ...)."""
+        return self.section(name).cast(typecode)
+
+    def records(self, name: str, layout: struct.Struct) -> "Records":
+        """View a section as fixed-width ``layout`` records."""
+        return Records(self.section(name), layout)
+
+    def text(self, name: str, ref: Tuple[int, int]) -> str:
+        """Decode an ``(offset, length)`` reference into a string section."""
+        offset, length = self._sections[name]
+        start = offset + ref[0]
+        return str(self._view[start:start + ref[1]], "utf-8")
+
+    def raw(self, name: str, ref: Tuple[int, int]) -> bytes:
+        offset, _ = self._sections[name]
+        return self._view[offset + ref[0]:offset + ref[0] + ref[1]].tobytes()
+
+
+class Records:
+    """Fixed-width records of one section."""
+
+    def __init__(self, view: memoryview, layout: struct.Struct):
+        self._view = view
+        self._layout = layout
+        self._count = len(view) // layout.size
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i: int) -> tuple:
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        return self._layout.unpack_from(self._view, i * self._layout.size)
+
+
+def pack_records(layout: struct.Struct, rows: Iterable[tuple]) -> bytes:
+    """Pack rows into a fixed-width record section."""
+    return b"".join(layout.pack(*row) for row in rows)
+
+
+def lower_bound(count: int, key, target) -> int:
+    """First index in ``range(count)`` whose ``key(i)`` is not below ``target``
+    (``key`` must be non-decreasing)."""
+    lo, hi = 0, count
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if key(mid) < target:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def find_sorted(count: int, key, target) -> Optional[int]:
+    """Index of ``target`` among sorted keys, or None."""
+    i = lower_bound(count, key, target)
+    return i if i < count and key(i) == target else None
@@ -0,0 +1,469 @@
+"""Bitmap tag index and boolean tag queries.
+
+Every note gets a small integer id; every tag maps to the bitmap of the
+notes carrying it, held in memory as a Python int, so a query such as
+
+    #paper & #to-read & !#archived
+
+is two bitwise operations over a few kilobytes, whatever the vault size.
+Counts are popcounts, and the co-occurrence of two tags is the popcount
+of their intersection.
+
+``.slatekore/tags.bin`` stores each tag in whichever form is smaller: the
+sorted ``uint32`` ids of its notes (rare tags) or the raw bitmap (common
+ones). Loading the file only reads the tag directory; a tag is decoded the
+first time a query uses it, and note paths only when results are listed.
+Like the link graph, removed notes leave a tombstone id until the index
+is compacted, and only notes whose catalog hash changed are re-tagged.
+
+Query syntax: tags with or without ``#``, ``&``/``AND`` (or juxtaposition),
+``|``/``OR``, ``!``/``-``/``NOT``, parentheses, and ``prefix*`` for every
+tag starting with ``prefix`` (``#ml/*`` for nested tags). NOT binds
+tighter than AND, which binds tighter than OR.
+"""
+
+import json
+import re
+import struct
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .frontmatter import normalize_tag
+from .index import Catalog, refresh_catalog
+from .vault import atomic_write_bytes, state_path, watcher_running
+
+TAGS_FILE = "tags.bin"
+TAGS_MAGIC = b"SKTAGS01"
+
+# Compact tombstoned ids once there are this many (or one eighth of the ids)
+MIN_TOMBSTONES = 256
+
+# Rebuild every bitmap rather than flip bits once this many notes changed
+MAX_INCREMENTAL = 1000
+
+if hasattr(int, "bit_count"):
+    popcount = int.bit_count
+else:  # Python < 3.10
+    def popcount(bits: int) -> int:
+        return bin(bits).count("1")
+
+
+def bits_to_ids(bits: int) -> List[int]:
+    """Return the positions of the set bits of a bitmap, ascending."""
+    digits = bin(bits)[:1:-1]
+    ids = []
+    at = digits.find("1")
+    while at >= 0:
+        ids.append(at)
+        at = digits.find("1", at + 1)
+    return ids
+
+
+def ids_to_bits(ids: Iterable[int], size: int) -> int:
+    """Build the bitmap of a set of ids below ``size``."""
+    buffer = bytearray((size + 7) // 8)
+    for i in ids:
+        buffer[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buffer, "little")
+
+
+# ----------------------------------------------------------------------
+# Query language
+# ----------------------------------------------------------------------
+
+_TOKEN = re.compile(r"\s*(?:(\(|\)|&&?|\|\|?|!|(?<![\w/-])-)|([^\s()&|!]+))")
+_KEYWORDS = {"and": "&", "or": "|", "not": "!"}
+
+
+def tokenize_query(expr: str) -> List[str]:
+    """Split a tag query into operators and tag tokens.
+
+    Raises:
+        ValueError: on characters the syntax does not allow
+    """
+    tokens = []
+    pos = 0
+    expr = expr.strip()
+    while pos < len(expr):
+        match = _TOKEN.match(expr, pos)
+        if match is None or match.end() == pos:
+            raise ValueError(f"Unexpected {expr[pos:]!r} in tag query")
+        operator, word = match.groups()
+        if operator:
+            tokens.append({"&&": "&", "||": "|", "-": "!"}.get(operator, operator))
+        else:
+            tokens.append(_KEYWORDS.get(word.lower(), word))
+        pos = match.end()
+    return tokens
+
+
+def parse_tag_query(expr: str) -> Tuple:
+    """Parse a tag query into a tree of ``("tag", name)``, ``("prefix",
+    name)``, ``("not", node)``, ``("and", nodes)`` and ``("or", nodes)``.
+
+    Raises:
+        ValueError: if the query is malformed
+    """
+    tokens = tokenize_query(expr)
+    pos = 0
+
+    def peek() -> Optional[str]:
+        return tokens[pos] if pos < len(tokens) else None
+
+    def take() -> str:
+        nonlocal pos
+        pos += 1
+        return tokens[pos - 1]
+
+    def parse_or():
+        nodes = [parse_and()]
+        while peek() == "|":
+            take()
+            nodes.append(parse_and())
+        return nodes[0] if len(nodes) == 1 else ("or", nodes)
+
+    def parse_and():
+        nodes = [parse_not()]
+        while peek() not in (None, "|", ")"):
+            if peek() == "&":
+                take()
+            nodes.append(parse_not())
+        return nodes[0] if len(nodes) == 1 else ("and", nodes)
+
+    def parse_not():
+        token = peek()
+        if token is None:
+            raise ValueError("Tag query ends unexpectedly")
+        if token == "!":
+            take()
+            return ("not", parse_not())
+        if token == "(":
+            take()
+            node = parse_or()
+            if peek() != ")":
+                raise ValueError("Unbalanced parentheses in tag query")
+            take()
+            return node
+        if token in ("&", "|", ")"):
+            raise ValueError(f"Unexpected {token!r} in tag query")
+        take()
+        if token.endswith("*"):
+            return ("prefix", normalize_tag(token[:-1]))
+        return ("tag", normalize_tag(token))
+
+    if not tokens:
+        raise ValueError("Empty tag query")
+    tree = parse_or()
+    if pos != len(tokens):
+        raise ValueError(f"Unexpected {tokens[pos]!r} in tag query")
+    return tree
+
+
+# ----------------------------------------------------------------------
+# Index
+# ----------------------------------------------------------------------
+
+class TagIndex:
+    """Tag -> bitmap of note ids, for every tag of a vault.
+
+    ``counts`` maps each tag to its number of notes. ``alive`` is the
+    bitmap of ids that hold a note (not a tombstone).
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.size = 0
+        self.counts: Dict[str, int] = {}
+        self.alive = 0
+        self._bitmaps: Dict[str, int] = {}
+        self._stored: Dict[str, Tuple[str, int, int]] = {}
+        self._blob = b""
+        self._raw_paths = b""
+        self._raw_state = b""
+        self._paths: Optional[List[Optional[str]]] = None
+        self._ids: Optional[Dict[str, int]] = None
+        self._state: Optional[Dict[str, Any]] = None
+
+    @property
+    def path(self) -> Path:
+        return state_path(self.root, TAGS_FILE)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def load(cls, root: Path) -> "TagIndex":
+        """Load a vault's tag index (empty if none has been built yet).
+
+        Only the tag directory is parsed here; tags, paths and the per-note
+        state are decoded on first use.
+        """
+        index = cls(root)
+        try:
+            data = index.path.read_bytes()
+        except OSError:
+            return index
+        if not data.startswith(TAGS_MAGIC):
+            return index
+        pos = len(TAGS_MAGIC)
+        lengths = struct.unpack_from("<4Q", data, pos)
+        pos += 32
+        sections = []
+        for length in lengths:
+            sections.append(data[pos:pos + length])
+            pos += length
+        directory, index._raw_paths, index._raw_state, index._blob = sections
+        header = json.loads(directory)
+        index.size = header["size"]
+        index._stored = {tag: (kind, offset, length) for tag, (_, kind, offset, length) in header["tags"].items()}
+        index.counts = {tag: entry[0] for tag, entry in header["tags"].items()}
+        index.alive = index._decode(*header["alive"])
+        return index
+
+    def _decode(self, kind: str, offset: int, length: int) -> int:
+        raw = self._blob[offset:offset + length]
+        if kind == "bits":
+            return int.from_bytes(raw, "little")
+        ids = array("I")
+        ids.frombytes(raw)
+        return ids_to_bits(ids, self.size)
+
+    def _encode(self, bits: int, blob: bytearray) -> Tuple[str, int, int]:
+        offset = len(blob)
+        count = popcount(bits)
+        if 4 * count < (self.size + 7) // 8:
+            blob += array("I", bits_to_ids(bits)).tobytes()
+            return "ids", offset, len(blob) - offset
+        blob += bits.to_bytes((self.size + 7) // 8, "little")
+        return "bits", offset, len(blob) - offset
+
+    def save(self):
+        """Persist the index atomically."""
+        state_path(self.root, TAGS_FILE, create=True)
+        blob = bytearray()
+        tags = {}
+        for tag in sorted(self.counts):
+            stored = self._stored.get(tag)
+            if tag not in self._bitmaps and stored is not None:
+                # Untouched tag: copy its encoded form
+                kind, offset, length = stored
+                tags[tag] = [self.counts[tag], kind, len(blob), length]
+                blob += self._blob[offset:offset + length]
+            else:
+                tags[tag] = [self.counts[tag], *self._encode(self.bitmap(tag), blob)]
+        alive = self._encode(self.alive, blob)
+        directory = json.dumps({"size": self.size, "tags": tags, "alive": alive},
+                               separators=(",", ":")).encode("utf-8")
+        paths = "\n".join(p or "" for p in self.paths).encode("utf-8")
+        state = json.dumps(self.state, separators=(",", ":")).encode("utf-8")
+        parts = [TAGS_MAGIC, struct.pack("<4Q", len(directory), len(paths), len(state), len(blob)),
+                 directory, paths, state, bytes(blob)]
+        atomic_write_bytes(self.path, b"".join(parts))
+
+    @property
+    def paths(self) -> List[Optional[str]]:
+        """Note path of each id (None for tombstones)."""
+        if self._paths is None:
+            self._paths = [p or None for p in self._raw_paths.decode("utf-8").split("\n")] if self.size else []
+        return self._paths
+
+    def id_of(self, path: str) -> Optional[int]:
+        """Return the id of a note (None if it is not indexed)."""
+        if self._ids is None:
+            self._ids = {p: i for i, p in enumerate(self.paths) if p is not None}
+        return self._ids.get(path)
+
+    @property
+    def state(self) -> Dict[str, Any]:
+        """Per-id content hash and tags, used to apply catalog changes."""
+        if self._state is None:
+            self._state = json.loads(self._raw_state) if self._raw_state else {"hashes": [], "tags": []}
+        return self._state
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def update(self, catalog: Catalog) -> Dict[str, int]:
+        """Apply the notes that changed in the catalog since the last update.
+
+        Returns:
+            dict with 'added', 'updated' and 'removed' counts
+        """
+        counts = {"added": 0, "updated": 0, "removed": 0}
+        paths, hashes, note_tags = self.paths, self.state["hashes"], self.state["tags"]
+        ids = {p: i for i, p in enumerate(paths) if p is not None}
+        changes: Dict[int, Tuple[List[str], List[str]]] = {}
+
+        for path, i in ids.items():
+            if path not in catalog.notes:
+                changes[i] = (note_tags[i], [])
+                paths[i], hashes[i], note_tags[i] = None, None, []
+                counts["removed"] += 1
+        for path, record in catalog.notes.items():
+            i = ids.get(path)
+            if i is None:
+                i = len(paths)
+                paths.append(path)
+                hashes.append(None)
+                note_tags.append([])
+                counts["added"] += 1
+            elif hashes[i] == record["hash"]:
+                continue
+            else:
+                counts["updated"] += 1
+            if note_tags[i] != record["tags"]:
+                changes[i] = (note_tags[i], record["tags"])
+            hashes[i], note_tags[i] = record["hash"], record["tags"]
+
+        grown = len(paths) != self.size
+        self._ids = None
+        self.size = len(paths)
+        tombstones = self.size - len(catalog.notes)
+        if tombstones > max(MIN_TOMBSTONES, self.size // 8) or len(changes) > MAX_INCREMENTAL:
+            self._rebuild()
+        elif changes or grown:
+            self._apply(changes)
+        if any(counts.values()) or not self.path.exists():
+            self.save()
+        return counts
+
+    def _apply(self, changes: Dict[int, Tuple[List[str], List[str]]]):
+        """Flip the bits of the notes whose tags changed."""
+        for i, (old, new) in changes.items():
+            for tag in set(old) - set(new):
+                self._bitmaps[tag] = self.bitmap(tag) & ~(1 << i)
+                self.counts[tag] -= 1
+                if not self.counts[tag]:
+                    del self.counts[tag], self._bitmaps[tag]
+                    self._stored.pop(tag, None)
+            for tag in set(new) - set(old):
+                self._bitmaps[tag] = self.bitmap(tag) | (1 << i)
+                self.counts[tag] = self.counts.get(tag, 0) + 1
+        self.alive = ids_to_bits((i for i, p in enumerate(self.paths) if p is not None), self.size)
+
+    def _rebuild(self):
+        """Drop tombstones and rebuild every bitmap from the per-note tags."""
+        keep = [i for i, p in enumerate(self.paths) if p is not None]
+        state = self.state
+        self._paths = [self.paths[i] for i in keep]
+        state["hashes"] = [state["hashes"][i] for i in keep]
+        state["tags"] = [state["tags"][i] for i in keep]
+        self.size = len(keep)
+        members: Dict[str, List[int]] = {}
+        for i, tags in enumerate(state["tags"]):
+            for tag in tags:
+                members.setdefault(tag, []).append(i)
+        self._bitmaps = {tag: ids_to_bits(ids, self.size) for tag, ids in members.items()}
+        self.counts = {tag: len(ids) for tag, ids in members.items()}
+        self._stored = {}
+        self.alive = (1 << self.size) - 1
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def bitmap(self, tag: str) -> int:
+        """Return the bitmap of the notes carrying ``tag`` (0 if none)."""
+        bits = self._bitmaps.get(tag)
+        if bits is None:
+            stored = self._stored.get(tag)
+            if stored is None:
+                return 0
+            bits = self._bitmaps[tag] = self._decode(*stored)
+        return bits
+
+    def evaluate(self, query) -> int:
+        """Return the bitmap of the notes matching a query string or tree."""
+        node = parse_tag_query(query) if isinstance(query, str) else query
+        kind = node[0]
+        if kind == "tag":
+            return self.bitmap(node[1])
+        if kind == "prefix":
+            bits = 0
+            for tag in self.counts:
+                if tag.startswith(node[1]):
+                    bits |= self.bitmap(tag)
+            return bits
+        if kind == "not":
+            return self.alive & ~self.evaluate(node[1])
+        if kind == "and":
+            # Rarest operand first: later ANDs work on a sparser result
+            operands = sorted(node[1], key=self._estimate)
+            bits = self.evaluate(operands[0])
+            for operand in operands[1:]:
+                if not bits:
+                    break
+                bits &= self.evaluate(operand)
+            return bits
+        bits = 0
+        for operand in node[1]:
+            bits |= self.evaluate(operand)
+        return bits
+
+    def _estimate(self, node) -> int:
+        if node[0] == "tag":
+            return self.counts.get(node[1], 0)
+        return self.size
+
+    def notes(self, bits: int) -> List[str]:
+        """Return the paths of the notes in a bitmap, sorted."""
+        paths = self.paths
+        return sorted(paths[i] for i in bits_to_ids(bits) if paths[i] is not None)
+
+    def cooccurrence(self, bits: Optional[int] = None, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Count how many notes of a bitmap (default: all) carry each tag.
+
+        Returns:
+            ``(tag, count)`` pairs, most frequent first
+        """
+        if bits is None:
+            pairs = list(self.counts.items())
+        else:
+            pairs = [(tag, popcount(bits & self.bitmap(tag))) for tag in self.counts]
+        pairs = sorted((p for p in pairs if p[1]), key=lambda p: (-p[1], p[0]))
+        return pairs[:limit] if limit else pairs
+
+    def __len__(self) -> int:
+        return popcount(self.alive)
+
+
+def load_tags(root: Path) -> TagIndex:
+    """Return a vault's tag index, brought up to date with the vault.
+
+    While ``slatekore watch`` keeps the index current it is loaded as is,
+    without touching the catalog.
+    """
+    index = TagIndex.load(root)
+    if watcher_running(root) and index.path.exists():
+        return index
+    index.update(refresh_catalog(root))
+    return index
+
+
+def query_tags(root: Path, query: str, stats: bool = False, limit: Optional[int] = None) -> Dict[str, Any]:
+    """Run a boolean tag query.
+
+    Returns:
+        dict with the 'query', the matching 'count' and 'notes' (at most
+        ``limit``), the co-occurring tags in 'tags' when ``stats`` is set,
+        and the time the query itself took in 'ms' (index loading excluded)
+
+    Raises:
+        ValueError: if the query is malformed
+    """
+    tree = parse_tag_query(query)
+    index = load_tags(root)
+    start = time.perf_counter()
+    bits = index.evaluate(tree)
+    count = popcount(bits)
+    elapsed = time.perf_counter() - start
+    notes = index.notes(bits)
+    result = {"query": query, "count": count, "notes": notes[:limit] if limit else notes}
+    if stats:
+        result["tags"] = index.cooccurrence(bits, limit=20)
+    result["ms"] = round(elapsed * 1000, 3)
+    return result
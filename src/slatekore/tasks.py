@@ -0,0 +1,310 @@
+"""Vault-wide index of Cardboard tasks.
+
+Tasks use the format GEMINI.md prescribes, in project kanban boards, daily
+notes or anywhere else:
+
+    - [ ] Task description #tag @due(YYYY-MM-DD)
+
+``.slatekore/tasks.json`` stores the parsed tasks of every note (checkbox
+state, text, due date, tags and the kanban column they sit under) with the
+note's content hash, so only edited notes are re-parsed. In memory, dated
+tasks are kept in a due-date ordered structure (a sorted list of dates and
+the tasks due on each), so "due today", "overdue" and date-range queries
+are a bisect away.
+
+A task's project is the ``01-Projects/<project>/`` folder its note lives
+in; ``--project`` also matches tasks tagged with the project name, such as
+``#project-name`` tasks in daily notes.
+"""
+
+import bisect
+import datetime
+import itertools
+import json
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .frontmatter import extract_tags, normalize_tag
+from .index import Catalog, refresh_catalog
+from .vault import atomic_write_bytes, state_path, watcher_running
+
+TASKS_FILE = "tasks.json"
+TASKS_VERSION = 1
+
+# Folder holding one subfolder per project
+PROJECTS_FOLDER = "01-Projects"
+
+_TASK = re.compile(r"^\s*[-*+] \[([ xX])\] (.+?)\s*$")
+_DUE = re.compile(r"@due\((\d{4}-\d{2}-\d{2})\)")
+_HEADING = re.compile(r"^#{1,6}\s+(.+?)\s*#*\s*$")
+
+# Relative dates accepted by ``parse_day``
+_RELATIVE_DAYS = {"yesterday": -1, "today": 0, "tomorrow": 1}
+
+
+def parse_day(value: str, today: Optional[datetime.date] = None) -> str:
+    """Turn 'today', 'tomorrow', 'yesterday' or YYYY-MM-DD into an ISO date.
+
+    Raises:
+        ValueError: for anything else
+    """
+    today = today or datetime.date.today()
+    offset = _RELATIVE_DAYS.get(value.strip().lower())
+    if offset is not None:
+        return (today + datetime.timedelta(days=offset)).isoformat()
+    return datetime.date.fromisoformat(value.strip()).isoformat()
+
+
+def project_of(rel_path: str) -> str:
+    """Return the project a note belongs to ('' outside 01-Projects)."""
+    parts = rel_path.split("/")
+    if parts[0] != PROJECTS_FOLDER or len(parts) < 2:
+        return ""
+    return parts[1] if len(parts) > 2 else parts[1][:-3]
+
+
+def parse_tasks(text: str) -> List[list]:
+    """Parse the checkbox tasks of a note.
+
+    Tasks inside fenced code blocks are ignored.
+
+    Returns:
+        ``[line, done, text, due, tags, column]`` per task: the 1-based line
+        number, whether it is checked, the task text, its ``@due`` date
+        ('' if none), its inline tags and the heading it sits under
+    """
+    if "[" not in text:
+        return []
+    tasks = []
+    column = ""
+    fenced = False
+    for number, line in enumerate(text.split("\n"), 1):
+        if line.lstrip().startswith("```"):
+            fenced = not fenced
+            continue
+        if fenced:
+            continue
+        if line.startswith("#"):
+            heading = _HEADING.match(line)
+            if heading:
+                column = heading.group(1)
+            continue
+        match = _TASK.match(line)
+        if match is None:
+            continue
+        task = match.group(2)
+        due = _DUE.search(task)
+        tasks.append([number, match.group(1) != " ", task, due.group(1) if due else "",
+                      extract_tags({}, task), column])
+    return tasks
+
+
+def task_dict(path: str, task: list) -> Dict[str, Any]:
+    """Expand a stored task into a dict."""
+    line, done, text, due, tags, column = task
+    return {
+        "path": path,
+        "line": line,
+        "done": done,
+        "text": text,
+        "due": due or None,
+        "tags": tags,
+        "project": project_of(path),
+        "column": column,
+    }
+
+
+def _file_order(item: Tuple[str, list]) -> Tuple[str, int]:
+    return item[0], item[1][0]
+
+
+class TaskIndex:
+    """Parsed tasks of every note, ordered by due date.
+
+    ``notes`` maps a path to ``[hash, tasks]`` (see ``parse_tasks``);
+    ``dates`` is the sorted list of due dates and ``due`` maps each date to
+    the ``(path, position)`` of the tasks due that day.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.notes: Dict[str, list] = {}
+        self.dates: List[str] = []
+        self.due: Dict[str, List[Tuple[str, int]]] = {}
+
+    @property
+    def path(self) -> Path:
+        return state_path(self.root, TASKS_FILE)
+
+    @classmethod
+    def load(cls, root: Path) -> "TaskIndex":
+        """Load a vault's task index (empty if none has been built yet)."""
+        index = cls(root)
+        try:
+            data = json.loads(index.path.read_bytes())
+        except (OSError, ValueError):
+            return index
+        if data.get("version") != TASKS_VERSION:
+            return index
+        index.notes = data["notes"]
+        for path, (_, tasks) in index.notes.items():
+            for position, task in enumerate(tasks):
+                if task[3]:
+                    index.due.setdefault(task[3], []).append((path, position))
+        index.dates = sorted(index.due)
+        return index
+
+    def save(self):
+        """Persist the index atomically."""
+        state_path(self.root, TASKS_FILE, create=True)
+        payload = {"version": TASKS_VERSION, "notes": self.notes}
+        atomic_write_bytes(self.path, json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+
+    def update(self, catalog: Catalog) -> Dict[str, int]:
+        """Re-parse the notes whose catalog hash differs from the index.
+
+        Returns:
+            dict with 'indexed' and 'removed' counts
+        """
+        indexed = removed = 0
+        for path in list(self.notes):
+            if path not in catalog.notes:
+                self._remove(path)
+                removed += 1
+        for path, record in catalog.notes.items():
+            entry = self.notes.get(path)
+            if entry is not None and entry[0] == record["hash"]:
+                continue
+            try:
+                text = (self.root / path).read_text(encoding="utf-8", errors="replace")
+            except OSError:
+                continue
+            if entry is not None:
+                self._remove(path)
+            self._add(path, record["hash"], parse_tasks(text))
+            indexed += 1
+        if indexed or removed or not self.path.exists():
+            self.save()
+        return {"indexed": indexed, "removed": removed}
+
+    def _add(self, path: str, digest: str, tasks: List[list]):
+        self.notes[path] = [digest, tasks]
+        for position, task in enumerate(tasks):
+            due = task[3]
+            if not due:
+                continue
+            if due not in self.due:
+                bisect.insort(self.dates, due)
+                self.due[due] = []
+            self.due[due].append((path, position))
+
+    def _remove(self, path: str):
+        _, tasks = self.notes.pop(path)
+        for task in tasks:
+            due = task[3]
+            if not due or due not in self.due:
+                continue
+            entries = [entry for entry in self.due[due] if entry[0] != path]
+            if entries:
+                self.due[due] = entries
+            else:
+                del self.due[due]
+                del self.dates[bisect.bisect_left(self.dates, due)]
+
+    def __len__(self) -> int:
+        return sum(len(tasks) for _, tasks in self.notes.values())
+
+    def tasks_of(self, path: str) -> List[Dict[str, Any]]:
+        """Return the tasks of one note, in file order."""
+        entry = self.notes.get(path)
+        return [task_dict(path, task) for task in entry[1]] if entry else []
+
+    def _between(self, start: str, end: str) -> Iterator[List[Tuple[str, list]]]:
+        lo = bisect.bisect_left(self.dates, start)
+        hi = bisect.bisect_right(self.dates, end)
+        for date in self.dates[lo:hi]:
+            yield [(path, self.notes[path][1][position]) for path, position in self.due[date]]
+
+    def _undated(self) -> Iterator[List[Tuple[str, list]]]:
+        yield [(path, task) for path, (_, tasks) in self.notes.items() for task in tasks if not task[3]]
+
+    def due_between(self, start: str = "", end: str = "9999-12-31") -> List[Tuple[str, list]]:
+        """Return ``(path, task)`` for tasks due in ``[start, end]``, by due date."""
+        return [item for day in self._between(start, end) for item in sorted(day, key=_file_order)]
+
+    def query(self, due: Optional[str] = None, overdue: bool = False, project: Optional[str] = None,
+              tag: Optional[str] = None, include_done: bool = False, today: Optional[str] = None,
+              limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Select tasks.
+
+        Args:
+            due: Only tasks due on this ISO date
+            overdue: Only open tasks due before ``today``; combined with
+                ``due``, tasks matching either are returned
+            project: Only tasks of this project (folder or tag)
+            tag: Only tasks with this tag
+            include_done: Include checked tasks
+            today: ISO date 'overdue' is relative to (default: today)
+            limit: Maximum number of tasks to return
+
+        Returns:
+            Task dicts (see ``task_dict``), dated tasks by due date first
+        """
+        today = today or datetime.date.today().isoformat()
+        if due is not None or overdue:
+            ranges = []
+            if overdue:
+                ranges.append(("", (datetime.date.fromisoformat(today) - datetime.timedelta(days=1)).isoformat()))
+            if due is not None and not (overdue and due < today):
+                ranges.append((due, due))
+            groups = (day for start, end in ranges for day in self._between(start, end))
+        else:
+            groups = itertools.chain(self._between("", "9999-12-31"), self._undated())
+
+        project = normalize_tag(project) if project else None
+        folder = f"{PROJECTS_FOLDER}/{project}/" if project else None
+        board = f"{PROJECTS_FOLDER}/{project}.md" if project else None
+        tag = normalize_tag(tag) if tag else None
+        results = []
+        # One group per due date, in date order (undated tasks last)
+        for group in groups:
+            matches = []
+            for path, task in group:
+                if task[1] and (not include_done or (overdue and task[3] < today)):
+                    continue
+                if project and project not in task[4] and not path.startswith(folder) and path != board:
+                    continue
+                if tag and tag not in task[4]:
+                    continue
+                matches.append((path, task))
+            matches.sort(key=_file_order)
+            results += [task_dict(path, task) for path, task in matches]
+            if limit is not None and len(results) >= limit:
+                return results[:limit]
+        return results
+
+
+def load_tasks(root: Path) -> TaskIndex:
+    """Return a vault's task index, brought up to date with the vault.
+
+    While ``slatekore watch`` keeps the index current it is loaded as is,
+    without touching the catalog.
+    """
+    index = TaskIndex.load(root)
+    if watcher_running(root) and index.path.exists():
+        return index
+    index.update(refresh_catalog(root))
+    return index
+
+
+def find_tasks(root: Path, **query) -> Dict[str, Any]:
+    """Load the task index and run a query (see ``TaskIndex.query``).
+
+    Returns:
+        dict with the matching 'tasks' and the elapsed time in 'ms'
+    """
+    start = time.perf_counter()
+    tasks = load_tasks(root).query(**query)
+    return {"tasks": tasks, "ms": round((time.perf_counter() - start) * 1000, 2)}
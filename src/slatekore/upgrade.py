@@ -0,0 +1,164 @@
+"""Incremental upgrades of the files ``slatekore init`` installs.
+
+``init`` records the shipped content of every template, GEMINI.md and
+workflow it installs in ``.slatekore/manifest.json``. ``upgrade_vault``
+compares three versions of each file: the one recorded there (what was
+shipped), the one in the vault (what the user has) and the one this
+version ships:
+
+- shipped content unchanged: nothing to do, the file is not even read
+- file untouched since it was installed: replaced by the new version
+- file customized: the user's edits and the new version are merged line
+  by line; overlapping edits are written with conflict markers
+- file deleted by the user: left deleted
+
+Files the manifest does not know (vaults initialized before it existed)
+are only replaced when identical to the new version or with ``force``.
+"""
+
+import difflib
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from . import __version__
+from .index import content_hash
+from .init import load_manifest, save_manifest, shipped_files
+from .vault import atomic_write_bytes
+
+CONFLICT_START = "<<<<<<< installed\n"
+CONFLICT_SEPARATOR = "=======\n"
+CONFLICT_END = ">>>>>>> slatekore {version}\n"
+
+
+def merge3(base: str, ours: str, theirs: str, version: str = __version__) -> Tuple[str, int]:
+    """Merge the changes from ``base`` to ``ours`` and ``theirs`` (diff3).
+
+    Lines unchanged in all three versions split the texts into chunks; a
+    chunk changed on one side only takes that side, one changed the same
+    way on both sides is taken once, and anything else is a conflict
+    written as ``<<<<<<< installed / ======= / >>>>>>> slatekore``.
+
+    Returns:
+        the merged text and the number of conflicts
+    """
+    a = base.splitlines(keepends=True)
+    b = ours.splitlines(keepends=True)
+    c = theirs.splitlines(keepends=True)
+    in_b = _matches(a, b)
+    in_c = _matches(a, c)
+    # Base lines kept by both sides, in order
+    stable = [i for i in range(len(a)) if i in in_b and i in in_c]
+    stable.append(len(a))
+    in_b[len(a)] = len(b)
+    in_c[len(a)] = len(c)
+
+    merged: List[str] = []
+    conflicts = 0
+    i = j = k = 0
+    for s in stable:
+        if s < i:
+            continue
+        base_chunk, our_chunk, their_chunk = a[i:s], b[j:in_b[s]], c[k:in_c[s]]
+        if our_chunk == base_chunk or our_chunk == their_chunk:
+            merged += their_chunk
+        elif their_chunk == base_chunk:
+            merged += our_chunk
+        else:
+            conflicts += 1
+            merged.append(CONFLICT_START)
+            merged += _terminated(our_chunk)
+            merged.append(CONFLICT_SEPARATOR)
+            merged += _terminated(their_chunk)
+            merged.append(CONFLICT_END.format(version=version))
+        if s < len(a):
+            merged.append(a[s])
+        i, j, k = s + 1, in_b[s] + 1, in_c[s] + 1
+    return "".join(merged), conflicts
+
+
+def _matches(a: List[str], b: List[str]) -> Dict[int, int]:
+    """Map lines of ``a`` to the lines of ``b`` they are matched with."""
+    matcher = difflib.SequenceMatcher(None, a, b, autojunk=False)
+    return {ai + n: bi + n for ai, bi, size in matcher.get_matching_blocks() for n in range(size)}
+
+
+def _terminated(lines: List[str]) -> List[str]:
+    if lines and not lines[-1].endswith("\n"):
+        return lines[:-1] + [lines[-1] + "\n"]
+    return lines
+
+
+def upgrade_vault(root: Path, dry_run: bool = False, force: bool = False) -> Dict[str, Any]:
+    """Bring the installed templates, GEMINI.md and workflows up to date.
+
+    Args:
+        root: Vault directory
+        dry_run: Only report what would be done
+        force: Replace customized and untracked files with the new version
+            instead of merging
+
+    Returns:
+        dict of paths (relative to the vault) by outcome: 'created',
+        'updated' (untouched, replaced), 'merged' (customized, merged
+        cleanly), 'conflicts' (merged with conflict markers), 'untracked'
+        (not in the manifest and different, kept), 'deleted' (removed by
+        the user, kept removed), 'obsolete' (no longer shipped, kept) and
+        'unchanged'; plus 'dry_run' and the elapsed time in 'ms'
+    """
+    start = time.perf_counter()
+    root = Path(root)
+    manifest = load_manifest(root)
+    result: Dict[str, Any] = {key: [] for key in (
+        "created", "updated", "merged", "conflicts", "untracked", "deleted", "obsolete", "unchanged")}
+    writes: List[Tuple[str, str]] = []
+    recorded = dict(manifest)
+    shipped = shipped_files()
+
+    for rel, new in shipped.items():
+        new_hash = content_hash(new.encode("utf-8"))
+        entry = manifest.get(rel)
+        path = root / rel
+        if entry is not None and entry.get("hash") == new_hash:
+            # Nothing shipped changed; whatever the user did stands
+            result["unchanged" if path.exists() else "deleted"].append(rel)
+            continue
+        try:
+            installed = path.read_bytes()
+        except (FileNotFoundError, NotADirectoryError):
+            if entry is not None:
+                result["deleted"].append(rel)
+            else:
+                result["created"].append(rel)
+                writes.append((rel, new))
+            recorded[rel] = {"hash": new_hash, "text": new}
+            continue
+        installed_hash = content_hash(installed)
+        if installed_hash == new_hash:
+            result["unchanged"].append(rel)
+        elif force or (entry is not None and installed_hash == entry.get("hash")):
+            result["updated"].append(rel)
+            writes.append((rel, new))
+        elif entry is None:
+            result["untracked"].append(rel)
+            continue
+        else:
+            merged, conflicts = merge3(entry["text"], installed.decode("utf-8", errors="replace"), new)
+            result["conflicts" if conflicts else "merged"].append(rel)
+            writes.append((rel, merged))
+        recorded[rel] = {"hash": new_hash, "text": new}
+
+    for rel in manifest:
+        if rel not in shipped:
+            result["obsolete"].append(rel)
+            del recorded[rel]
+
+    result["dry_run"] = dry_run
+    if not dry_run:
+        for rel, text in writes:
+            (root / rel).parent.mkdir(parents=True, exist_ok=True)
+            atomic_write_bytes(root / rel, text.encode("utf-8"))
+        if recorded != manifest:
+            save_manifest(root, recorded)
+    result["ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return result
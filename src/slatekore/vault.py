@@ -0,0 +1,209 @@
+"""Vault layout helpers shared by Slatekore's indexing commands."""
+
+import json
+import os
+import stat
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Directory (inside the vault) holding Slatekore's indexes and caches
+STATE_DIR = ".slatekore"
+
+# Written by ``slatekore watch`` while it keeps the indexes current
+WATCH_PID_FILE = "watch.pid"
+
+# Vault folder structure to create
+VAULT_FOLDERS = [
+    "00-Inbox/papers",
+    "00-Inbox/repos",
+    "00-Inbox/models",
+    "00-Inbox/datasets",
+    "00-Inbox/spaces",
+    "00-Inbox/websites",
+    "01-Projects",
+    "02-Papers",
+    "03-Codebases",
+    "04-Concepts",
+    "05-Books",
+    "06-Resources/pdfs/papers",
+    "06-Resources/pdfs/books",
+    "06-Resources/pdfs/reports",
+    "06-Resources/videos",
+    "06-Resources/datasets",
+    "06-Resources/models",
+    "07-Daily",
+    "08-Maps",
+    "09-Models",
+    "10-Implementations",
+    "11-Datasets",
+    "12-Websites",
+]
+
+# Markdown files at the vault root that are configuration, not notes
+IGNORED_FILES = {"GEMINI.md"}
+
+# Note type implied by the folder a note lives in (longest prefix wins)
+FOLDER_TYPES = {
+    "00-Inbox": "inbox",
+    "00-Inbox/papers": "paper",
+    "00-Inbox/repos": "repo",
+    "00-Inbox/models": "model",
+    "00-Inbox/datasets": "dataset",
+    "00-Inbox/spaces": "space",
+    "00-Inbox/websites": "website",
+    "01-Projects": "project",
+    "02-Papers": "paper",
+    "03-Codebases": "repo",
+    "04-Concepts": "concept",
+    "05-Books": "book",
+    "06-Resources": "resource",
+    "06-Resources/videos": "video",
+    "07-Daily": "daily",
+    "08-Maps": "moc",
+    "09-Models": "model",
+    "10-Implementations": "space",
+    "11-Datasets": "dataset",
+    "12-Websites": "website",
+}
+
+
+def folder_of(rel_path: str) -> str:
+    """Return the top-level vault folder of a note ('' for root notes)."""
+    head, sep, _ = rel_path.partition("/")
+    return head if sep else ""
+
+
+def folder_type(rel_path: str) -> str:
+    """Return the note type implied by a note's folder ('' if unknown)."""
+    parent = rel_path.rsplit("/", 1)[0] if "/" in rel_path else ""
+    while parent:
+        if parent in FOLDER_TYPES:
+            return FOLDER_TYPES[parent]
+        parent = parent.rsplit("/", 1)[0] if "/" in parent else ""
+    return ""
+
+
+def note_type(rel_path: str, frontmatter: Dict[str, Any]) -> str:
+    """Return a note's type: frontmatter ``type`` first, then its folder."""
+    declared = frontmatter.get("type")
+    if isinstance(declared, str) and declared:
+        return declared
+    return folder_type(rel_path)
+
+
+def note_name(rel_path: str) -> str:
+    """Return the wikilink name of a note (file name without ``.md``)."""
+    name = rel_path.rsplit("/", 1)[-1]
+    return name[:-3] if name.endswith(".md") else name
+
+
+def list_dir(root: Path, rel_dir: str) -> Tuple[List[str], List[Tuple[str, os.stat_result]]]:
+    """List one vault directory.
+
+    Hidden entries (``.obsidian``, ``.agent``, ``.slatekore``, ...) are
+    skipped, as are the configuration files listed in ``IGNORED_FILES``.
+
+    Returns:
+        (relative subdirectory paths, ``(relative note path, stat)`` pairs)
+    """
+    prefix = rel_dir + "/" if rel_dir else ""
+    subdirs: List[str] = []
+    notes: List[Tuple[str, os.stat_result]] = []
+    try:
+        entries = os.scandir(os.path.join(str(root), rel_dir) if rel_dir else str(root))
+    except OSError:
+        return subdirs, notes
+    with entries:
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            rel = prefix + entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(rel)
+                elif entry.name.endswith(".md") and rel not in IGNORED_FILES:
+                    notes.append((rel, entry.stat()))
+            except OSError:
+                continue
+    return subdirs, notes
+
+
+def state_path(root: Path, name: str, create: bool = False) -> Path:
+    """Return the path of a file inside the vault's ``.slatekore`` directory."""
+    state_dir = Path(root) / STATE_DIR
+    if create:
+        state_dir.mkdir(parents=True, exist_ok=True)
+    return state_dir / name
+
+
+def atomic_write_bytes(path: Path, data: bytes, mode: Optional[int] = None):
+    """Write ``data`` to ``path`` via a temp file and rename.
+
+    Readers never observe a half-written file: they see either the old
+    content or the new one. The file gets ``mode``, by default that of
+    ``file_mode`` (the replaced file's, or what ``open()`` would give a new
+    one), rather than the 0o600 of the temp file.
+    """
+    path = Path(path)
+    if mode is None:
+        mode = file_mode(path)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+_umask: Optional[int] = None
+
+
+def file_mode(path: Path) -> int:
+    """Return the permission bits to give ``path`` when replacing it.
+
+    An existing file keeps its mode; a new one gets what ``open()`` would
+    give it (0o666 less the umask).
+    """
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        return 0o666 & ~_current_umask()
+
+
+def _current_umask() -> int:
+    global _umask
+    if _umask is None:
+        try:
+            # Reading it from /proc avoids setting it, which races with
+            # files other threads create meanwhile
+            with open("/proc/self/status") as fh:
+                _umask = next(int(line.split()[1], 8) for line in fh if line.startswith("Umask:"))
+        except (OSError, StopIteration, ValueError, IndexError):
+            _umask = os.umask(0o022)
+            os.umask(_umask)
+    return _umask
+
+
+def watcher_running(root: Path) -> bool:
+    """Check whether a ``slatekore watch`` daemon is alive for this vault."""
+    try:
+        info = json.loads(state_path(root, WATCH_PID_FILE).read_text())
+    except (OSError, ValueError):
+        return False
+    import socket  # slow to import, and only needed while a watcher may run
+    if info.get("host") != socket.gethostname():
+        return False
+    try:
+        os.kill(int(info["pid"]), 0)
+    except PermissionError:
+        return True
+    except (OSError, KeyError, TypeError, ValueError):
+        return False
+    return True
@@ -0,0 +1,350 @@
+"""Offline semantic search over hashed n-gram vectors.
+
+No embeddings API is involved: each note is turned into a fixed-size
+vector by feature hashing (the "hashing trick") of its words, word bigrams
+and character n-grams of its words, which is a random signed projection of
+its sparse n-gram counts to ``DIM`` dimensions. Character n-grams make
+"transformer" and "transformers" (or "diffusion" and "diffusers") land
+close to each other; bigrams keep some word order. Counts are damped with
+``log(1 + tf)`` and vectors are L2-normalized, so a dot product is a
+cosine similarity.
+
+Vectors do not depend on the rest of the vault (there is no IDF), so only
+notes whose content hash changed are re-vectorized. They are stored as a
+float16 matrix in ``.slatekore/vectors/vectors.npy``, memory-mapped when
+loaded, with the note paths and hashes in ``meta.json``. Queries are
+answered with batched matrix products over blocks of rows, keeping the
+running top k of every query.
+
+NumPy is an optional dependency: ``pip install "slatekore[similarity]"``.
+"""
+
+import itertools
+import json
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+from .frontmatter import SCAFFOLD_LINE, split_frontmatter
+from .graph import LinkGraph
+from .index import Catalog, refresh_catalog
+from .related import STOPWORDS
+from .search import tokenize
+from .vault import atomic_write_bytes, state_path
+
+VECTORS_DIR = "vectors"
+VECTORS_VERSION = 1
+
+# Vector size, and the weights of bigrams and character n-grams next to words
+DIM = 256
+BIGRAM_WEIGHT = 0.5
+CHAR_WEIGHT = 0.5
+CHAR_NGRAMS = (3, 4)
+
+# Title words count this many times
+TITLE_WEIGHT = 3
+
+# Rows multiplied per block when scoring
+BLOCK_ROWS = 16384
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError(
+            "Semantic search needs NumPy. Install it with: pip install \"slatekore[similarity]\""
+        )
+
+
+class _Vocabulary:
+    """Per-process cache of the features of every word seen so far.
+
+    Words get small ids; each id has the hashed (dimension, signed weight)
+    pairs of the word and its character n-grams, and the crc32 of the word
+    that bigram features are derived from. Whitespace-separated chunks of
+    text are mapped to word ids once, so a long note costs a ``split`` and
+    a few array operations rather than a regex pass.
+    """
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.chunks: Dict[str, Tuple[int, ...]] = {}
+        self.dims: List["np.ndarray"] = []
+        self.weights: List["np.ndarray"] = []
+        self.hashes = np.zeros(1024, dtype=np.uint64)
+
+    def word(self, word: str) -> int:
+        i = self.ids.get(word)
+        if i is None:
+            i = self.ids[word] = len(self.dims)
+            padded = f"<{word}>"
+            grams = [padded[j:j + n] for n in CHAR_NGRAMS for j in range(len(padded) - n + 1)]
+            hashes = np.array([zlib.crc32(f.encode("utf-8")) for f in [word] + ["\x01" + g for g in grams]],
+                              dtype=np.uint64)
+            weights = np.array([1.0] + [CHAR_WEIGHT / len(grams)] * len(grams))
+            self.dims.append((hashes % DIM).astype(np.intp))
+            self.weights.append(np.where(hashes & 0x80000000, -weights, weights))
+            if i == len(self.hashes):
+                self.hashes = np.concatenate([self.hashes, np.zeros_like(self.hashes)])
+            self.hashes[i] = hashes[0]
+        return i
+
+    def split(self, chunk: str) -> Tuple[int, ...]:
+        """Word ids of a lowercase chunk, without stopwords and numbers."""
+        ids = self.chunks.get(chunk)
+        if ids is None:
+            ids = self.chunks[chunk] = tuple(self.word(w) for w in tokenize(chunk)
+                                             if w not in STOPWORDS and not w.isdigit())
+        return ids
+
+    def sequence(self, chunks: List[str]) -> "np.ndarray":
+        """Word ids of a list of chunks, in order.
+
+        Only distinct chunks go through Python code; the sequence itself is
+        assembled with array operations.
+        """
+        distinct = list(dict.fromkeys(chunks))
+        positions = dict(zip(distinct, range(len(distinct))))
+        codes = np.fromiter(map(positions.__getitem__, chunks), dtype=np.intp, count=len(chunks))
+        parts = [self.split(chunk) for chunk in distinct]
+        lengths = np.fromiter(map(len, parts), dtype=np.intp, count=len(parts))
+        flat = np.fromiter(itertools.chain.from_iterable(parts), dtype=np.intp, count=int(lengths.sum()))
+        starts = np.cumsum(lengths) - lengths
+        sizes = lengths[codes]
+        ends = np.cumsum(sizes)
+        return flat[np.repeat(starts[codes] - (ends - sizes), sizes) + np.arange(ends[-1] if len(ends) else 0)]
+
+
+_VOCABULARY: Optional[_Vocabulary] = None
+
+
+def vectorize(text: str, title: str = "") -> "np.ndarray":
+    """Return the unit ``float32[DIM]`` vector of a text (zeros if it has no words)."""
+    global _VOCABULARY
+    if _VOCABULARY is None:
+        _VOCABULARY = _Vocabulary()
+    vocabulary = _VOCABULARY
+    chunks = (f"{title} " * TITLE_WEIGHT + SCAFFOLD_LINE.sub(" ", text)).lower().split()
+    ids = vocabulary.sequence(chunks)
+    if not len(ids):
+        return np.zeros(DIM, dtype=np.float32)
+    words, counts = np.unique(ids, return_counts=True)
+    damped = np.log1p(counts).tolist()
+    dims = [vocabulary.dims[i] for i in words.tolist()]
+    weights = [vocabulary.weights[i] * d for i, d in zip(words.tolist(), damped)]
+    if len(ids) > 1:
+        # Bigram keys mixed from the two word hashes (multiply-shift)
+        hashes = vocabulary.hashes[ids]
+        keys = ((hashes[:-1] << np.uint64(32)) | hashes[1:]) * np.uint64(0x9E3779B97F4A7C15) >> np.uint64(32)
+        pairs, counts = np.unique(keys, return_counts=True)
+        dims.append((pairs % DIM).astype(np.intp))
+        weights.append(np.where(pairs & 0x80000000, -BIGRAM_WEIGHT, BIGRAM_WEIGHT) * np.log1p(counts))
+    vector = np.bincount(np.concatenate(dims), weights=np.concatenate(weights), minlength=DIM)
+    norm = np.linalg.norm(vector)
+    return (vector / norm if norm else vector).astype(np.float32)
+
+
+def top_k(matrix: "np.ndarray", queries: "np.ndarray", k: int,
+          allowed: Optional["np.ndarray"] = None) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Best ``k`` rows of ``matrix`` for each query, by dot product.
+
+    Rows are scored ``BLOCK_ROWS`` at a time (one float32 matrix product per
+    block for all queries) and merged into a running top k, so memory stays
+    bounded whatever the matrix size.
+
+    Args:
+        matrix: ``(n, DIM)`` row vectors (any float dtype, e.g. a float16 memmap)
+        queries: ``(q, DIM)`` query vectors
+        k: Results per query
+        allowed: Optional boolean mask of the rows that may be returned
+
+    Returns:
+        ``(ids, scores)``, both ``(q, k')`` with ``k' <= k``, best first
+    """
+    queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+    best_ids = np.zeros((len(queries), 0), dtype=np.int64)
+    best_scores = np.zeros((len(queries), 0), dtype=np.float32)
+    for start in range(0, len(matrix), BLOCK_ROWS):
+        block = np.asarray(matrix[start:start + BLOCK_ROWS], dtype=np.float32)
+        scores = queries @ block.T
+        if allowed is not None:
+            scores[:, ~allowed[start:start + len(block)]] = -np.inf
+        ids = np.broadcast_to(np.arange(start, start + len(block)), scores.shape)
+        scores = np.concatenate([best_scores, scores], axis=1)
+        ids = np.concatenate([best_ids, ids], axis=1)
+        if scores.shape[1] > k:
+            keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            scores = np.take_along_axis(scores, keep, axis=1)
+            ids = np.take_along_axis(ids, keep, axis=1)
+        best_scores, best_ids = scores, ids
+    order = np.argsort(-best_scores, axis=1, kind="stable")
+    best_scores = np.take_along_axis(best_scores, order, axis=1)
+    best_ids = np.take_along_axis(best_ids, order, axis=1)
+    # Drop masked-out rows that filled the list
+    width = int((best_scores > -np.inf).sum(axis=1).max()) if best_scores.size else 0
+    return best_ids[:, :width], best_scores[:, :width]
+
+
+class VectorIndex:
+    """Hashed n-gram vector of every note, as a float16 matrix.
+
+    Row ``i`` of ``vectors`` belongs to ``paths[i]`` (sorted); all-zero rows
+    are notes without words.
+    """
+
+    def __init__(self, root: Path):
+        _require_numpy()
+        self.root = Path(root)
+        self.paths: List[str] = []
+        self.hashes: List[str] = []
+        self.vectors = np.zeros((0, DIM), dtype=np.float16)
+        self._ids: Dict[str, int] = {}
+
+    @property
+    def directory(self) -> Path:
+        return state_path(self.root, VECTORS_DIR)
+
+    @classmethod
+    def load(cls, root: Path) -> "VectorIndex":
+        """Load a vault's vector index (empty if never built); the matrix is
+        memory-mapped, not read."""
+        index = cls(root)
+        directory = index.directory
+        try:
+            meta = json.loads((directory / "meta.json").read_bytes())
+            if meta.get("version") != VECTORS_VERSION or meta.get("dim") != DIM:
+                return index
+            vectors = np.load(directory / "vectors.npy", mmap_mode="r")
+        except (OSError, ValueError):
+            return index
+        if vectors.shape != (len(meta["paths"]), DIM) or vectors.dtype != np.float16:
+            return index
+        index.paths, index.hashes, index.vectors = meta["paths"], meta["hashes"], vectors
+        index._ids = {p: i for i, p in enumerate(index.paths)}
+        return index
+
+    def save(self):
+        """Persist the index (matrix first, metadata last)."""
+        directory = self.directory
+        directory.mkdir(parents=True, exist_ok=True)
+        with open(directory / "vectors.npy.tmp", "wb") as fh:
+            np.save(fh, np.ascontiguousarray(self.vectors))
+        (directory / "vectors.npy.tmp").replace(directory / "vectors.npy")
+        meta = {"version": VECTORS_VERSION, "dim": DIM, "paths": self.paths, "hashes": self.hashes}
+        atomic_write_bytes(directory / "meta.json", json.dumps(meta).encode("utf-8"))
+
+    def update(self, catalog: Catalog) -> Dict[str, int]:
+        """Re-vectorize the notes whose catalog hash changed.
+
+        Returns:
+            dict with 'vectorized' and 'removed' counts
+        """
+        paths = sorted(catalog.notes)
+        hashes = [catalog.notes[p]["hash"] for p in paths]
+        old = self._ids
+        kept_new, kept_old, changed = [], [], []
+        for i, (path, digest) in enumerate(zip(paths, hashes)):
+            j = old.get(path)
+            if j is not None and self.hashes[j] == digest:
+                kept_new.append(i)
+                kept_old.append(j)
+            else:
+                changed.append(i)
+        removed = len(old) - len(kept_old)
+        if not changed and not removed and self.directory.exists():
+            return {"vectorized": 0, "removed": 0}
+
+        vectors = np.zeros((len(paths), DIM), dtype=np.float16)
+        if kept_new:
+            vectors[kept_new] = self.vectors[kept_old]
+        for i in changed:
+            vectors[i] = self._vectorize(paths[i], catalog.notes[paths[i]]["title"])
+        self.paths, self.hashes, self.vectors = paths, hashes, vectors
+        self._ids = {p: i for i, p in enumerate(paths)}
+        self.save()
+        return {"vectorized": len(changed), "removed": removed}
+
+    def _vectorize(self, path: str, title: str) -> "np.ndarray":
+        try:
+            text = (self.root / path).read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            return np.zeros(DIM, dtype=np.float32)
+        _, body = split_frontmatter(text)
+        return vectorize(body, title)
+
+    def search(self, queries: "np.ndarray", k: int = 10,
+               allowed: Optional["np.ndarray"] = None) -> List[List[Tuple[str, float]]]:
+        """Return the ``k`` most similar notes for each query vector."""
+        ids, scores = top_k(self.vectors, queries, k, allowed)
+        return [[(self.paths[i], round(float(s), 4)) for i, s in zip(row_ids, row_scores) if s > 0]
+                for row_ids, row_scores in zip(ids.tolist(), scores.tolist())]
+
+    def similar(self, path: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Return the ``k`` notes most similar to an indexed note."""
+        i = self._ids[path]
+        allowed = np.ones(len(self.paths), dtype=bool)
+        allowed[i] = False
+        return self.search(np.asarray(self.vectors[i], dtype=np.float32), k, allowed)[0]
+
+
+def load_vectors(root: Path, catalog: Optional[Catalog] = None) -> VectorIndex:
+    """Return a vault's vector index, brought up to date with the vault."""
+    _require_numpy()
+    index = VectorIndex.load(root)
+    index.update(catalog if catalog is not None else refresh_catalog(root))
+    return index
+
+
+def semantic_search(root: Path, query: str, note_type: Optional[str] = None,
+                    folder: Optional[str] = None, limit: int = 10) -> Dict[str, Any]:
+    """Refresh the vector index and rank notes by similarity to ``query``.
+
+    Returns:
+        dict with the 'query', its 'results' (``{path, title, type, score}``
+        dicts) and the elapsed time in 'ms', like ``search_vault``
+    """
+    start = time.perf_counter()
+    catalog = refresh_catalog(root)
+    index = load_vectors(root, catalog)
+    allowed = None
+    if note_type or folder:
+        prefix = folder.strip("/") + "/" if folder else ""
+        allowed = np.fromiter(((not note_type or catalog.notes[p]["type"] == note_type) and p.startswith(prefix)
+                               for p in index.paths), dtype=bool, count=len(index.paths))
+    hits = index.search(vectorize(query), limit, allowed)[0]
+    return {
+        "query": query,
+        "results": [{"path": path, "title": catalog.notes[path]["title"], "type": catalog.notes[path]["type"],
+                     "score": score} for path, score in hits],
+        "ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+
+
+def similar_notes(root: Path, note: str, k: int = 10) -> Dict[str, Any]:
+    """Return the notes whose text is most similar to ``note``.
+
+    Returns:
+        dict with the resolved 'note' path and its 'similar' list of
+        ``{path, title, score}`` dicts
+
+    Raises:
+        KeyError: if ``note`` does not name a note in the vault
+    """
+    _require_numpy()
+    catalog = refresh_catalog(root)
+    graph = LinkGraph.load(root)
+    graph.update(catalog)
+    path = graph.nodes[graph.node(note)]
+    if path not in catalog.notes:
+        raise KeyError(f"Note not found: {note}")
+    index = load_vectors(root, catalog)
+    return {
+        "note": path,
+        "similar": [{"path": other, "title": catalog.notes[other]["title"], "score": score}
+                    for other, score in index.similar(path, k)],
+    }
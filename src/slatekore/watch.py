@@ -0,0 +1,283 @@
+"""Long-running watcher that keeps a vault's catalog and indexes current.
+
+On Linux the watcher subscribes to inotify events for every (non-hidden)
+directory of the vault; elsewhere, or when inotify is unavailable, it falls
+back to polling with the catalog's stat sweep. Events are debounced and
+coalesced, so an Obsidian sync dropping hundreds of files at once results
+in a single catalog update.
+
+While the watcher runs it advertises itself in ``.slatekore/watch.pid`` and
+query commands skip their own rescan of the vault.
+"""
+
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import socket
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+
+from .fields import FieldIndex
+from .graph import LinkGraph
+from .identity import IdentityIndex
+from .index import Catalog
+from .search import SearchIndex
+from .tags import TagIndex
+from .tasks import TaskIndex
+from .scanner import scan_vault
+from .vault import IGNORED_FILES, WATCH_PID_FILE, state_path
+
+# Indexes derived from the catalog, kept loaded and updated after each batch
+DERIVED_INDEXES = (SearchIndex, LinkGraph, IdentityIndex, TaskIndex, TagIndex, FieldIndex)
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+              | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+_EVENT = struct.Struct("iIII")
+
+
+class Batch:
+    """Coalesced set of changes waiting to be applied to the catalog."""
+
+    def __init__(self):
+        self.files: Set[str] = set()
+        self.trees: Set[str] = set()
+        self.full = False
+
+    def __bool__(self) -> bool:
+        return bool(self.files or self.trees or self.full)
+
+    def __len__(self) -> int:
+        return len(self.files) + len(self.trees)
+
+
+class InotifySource:
+    """Recursive inotify subscription over the vault's directories."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs: Dict[int, str] = {}
+        self.add_tree("")
+
+    def close(self):
+        os.close(self.fd)
+
+    def add_tree(self, rel_dir: str):
+        """Watch ``rel_dir`` and every non-hidden directory below it."""
+        stack = [rel_dir]
+        while stack:
+            rel = stack.pop()
+            wd = self._add_watch(self.fd, os.fsencode(os.path.join(str(self.root), rel)), WATCH_MASK)
+            if wd < 0:
+                continue
+            self.dirs[wd] = rel
+            try:
+                with os.scandir(os.path.join(str(self.root), rel)) as entries:
+                    for entry in entries:
+                        if not entry.name.startswith(".") and entry.is_dir(follow_symlinks=False):
+                            stack.append(f"{rel}/{entry.name}" if rel else entry.name)
+            except OSError:
+                continue
+
+    def read(self, timeout: float, batch: Batch) -> bool:
+        """Wait up to ``timeout`` seconds and add pending events to ``batch``.
+
+        Returns:
+            True if any relevant event was received
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        try:
+            data = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return False
+        received = False
+        pos = 0
+        while pos < len(data):
+            wd, mask, _cookie, length = _EVENT.unpack_from(data, pos)
+            pos += _EVENT.size
+            name = data[pos:pos + length].rstrip(b"\0").decode("utf-8", errors="surrogateescape")
+            pos += length
+            if mask & IN_Q_OVERFLOW:
+                batch.full = True
+                received = True
+                continue
+            parent = self.dirs.get(wd)
+            if parent is None:
+                continue
+            if mask & IN_IGNORED:
+                del self.dirs[wd]
+                continue
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                batch.trees.add(parent)
+                received = True
+                continue
+            if not name or name.startswith("."):
+                continue
+            rel = f"{parent}/{name}" if parent else name
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self.add_tree(rel)
+                batch.trees.add(rel)
+                received = True
+            elif name.endswith(".md") and rel not in IGNORED_FILES:
+                batch.files.add(rel)
+                received = True
+        return received
+
+
+def inotify_available() -> bool:
+    """Check whether the platform supports inotify."""
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6")
+        return hasattr(libc, "inotify_init1")
+    except OSError:
+        return False
+
+
+class VaultWatcher:
+    """Apply file changes to the catalog and derived indexes as they happen.
+
+    Args:
+        root: Vault directory
+        debounce: Quiet period (seconds) before a batch of events is applied
+        max_delay: Apply a batch after this long even if events keep coming
+        poll: Force the polling backend
+        interval: Seconds between stat sweeps in polling mode
+        on_batch: Called with each applied change summary
+    """
+
+    def __init__(self, root: Path, debounce: float = 0.5, max_delay: float = 5.0,
+                 poll: bool = False, interval: float = 2.0,
+                 on_batch: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.root = Path(root)
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.interval = interval
+        self.on_batch = on_batch
+        self.backend = "poll" if poll or not inotify_available() else "inotify"
+        self.catalog = Catalog.load(self.root)
+        self.indexes = [cls.load(self.root) for cls in DERIVED_INDEXES]
+        self._running = False
+
+    def _affected(self, batch: Batch) -> Iterable[str]:
+        """Expand a batch into the note paths that need re-checking."""
+        paths = set(batch.files)
+        for tree in batch.trees:
+            prefix = tree + "/" if tree else ""
+            paths.update(p for p in self.catalog if p.startswith(prefix))
+            paths.update(rel for rel, _, _ in scan_vault(self.root, subdir=tree))
+        return paths
+
+    def apply(self, batch: Batch) -> Dict[str, Any]:
+        """Apply a batch of changes and update the derived indexes."""
+        if batch.full:
+            result = self.catalog.refresh()
+        else:
+            result = self.catalog.update_paths(self._affected(batch))
+        if result["added"] or result["updated"] or result["removed"]:
+            for index in self.indexes:
+                index.update(self.catalog)
+        result["events"] = len(batch)
+        return result
+
+    def _publish(self, result: Dict[str, Any]):
+        if self.on_batch and (result["added"] or result["updated"] or result["removed"]):
+            self.on_batch(result)
+
+    def run(self):
+        """Watch the vault until interrupted."""
+        self._running = True
+        pid_path = state_path(self.root, WATCH_PID_FILE, create=True)
+        pid_path.write_text(json.dumps({
+            "pid": os.getpid(),
+            "host": socket.gethostname(),
+            "backend": self.backend,
+            "started": time.time(),
+        }))
+        try:
+            if self.backend == "inotify":
+                self._run_inotify()
+            else:
+                self._run_polling()
+        finally:
+            self._running = False
+            try:
+                pid_path.unlink()
+            except OSError:
+                pass
+
+    def stop(self):
+        self._running = False
+
+    def _initial_sync(self) -> Dict[str, Any]:
+        batch = Batch()
+        batch.full = True
+        result = self.apply(batch)
+        # Indexes may lag the catalog if they were never built
+        for index in self.indexes:
+            index.update(self.catalog)
+        return result
+
+    def _run_inotify(self):
+        source = InotifySource(self.root)
+        # Catch changes made between the initial sync and the subscription
+        self._publish(self._initial_sync())
+        try:
+            batch = Batch()
+            first = last = 0.0
+            while self._running:
+                if batch:
+                    now = time.monotonic()
+                    timeout = max(0.0, min(last + self.debounce, first + self.max_delay) - now)
+                else:
+                    timeout = 1.0
+                if source.read(timeout, batch):
+                    now = time.monotonic()
+                    first = first or now
+                    last = now
+                if batch:
+                    now = time.monotonic()
+                    if now - last >= self.debounce or now - first >= self.max_delay:
+                        self._publish(self.apply(batch))
+                        batch = Batch()
+                        first = last = 0.0
+        finally:
+            source.close()
+
+    def _run_polling(self):
+        self._publish(self._initial_sync())
+        while self._running:
+            time.sleep(self.interval)
+            batch = Batch()
+            batch.full = True
+            self._publish(self.apply(batch))